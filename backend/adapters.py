@@ -0,0 +1,199 @@
+from urllib.parse import urlparse
+
+from models import ProductData, Price
+from parsed_page import ParsedPage
+import patterns
+from selector_stats import get_selector_stats
+
+
+# ProductData fields an adapter may fill by name (price is assembled from mrp/deal/discount)
+PRODUCT_FIELDS = tuple(
+    name for name in ProductData.model_fields if name not in ("url", "price", "timestamp")
+)
+
+
+def text_of(node) -> str:
+    return node.get_text(strip=True)
+
+
+class FieldSpec:
+    """
+    How an adapter fills one field, as data:
+    - selectors: fallbacks tried in declared order until one matches. CSS
+      selectors, or strategy functions (page, values) -> value (None = no
+      match) for lookups that are not a single selector. Each attempt is
+      recorded per domain (see selector_stats); one that keeps missing on a
+      domain is tried after the others there until it matches again
+    - read: node -> raw value (default: its stripped text); with many=True
+      it is applied to every matched node and post gets the list
+    - extract: (page, values) -> value, for fields that are not a selector
+      lookup (None = not found)
+    - post: value -> value, applied in order to a found value
+    - fallback: (page, values) -> value when nothing was found
+    """
+
+    def __init__(self, selectors=(), read=text_of, extract=None, many: bool = False,
+                 post=(), fallback=None):
+        self.selectors = tuple(selectors)
+        self.read = read
+        self.extract = extract
+        self.many = many
+        self.post = tuple(post)
+        self.fallback = fallback
+        self.names: list[str] = []
+
+    def compile(self, prefix: str):
+        """Turn CSS strings into registered, pre-parsed patterns.Selector objects."""
+        compiled = []
+        for i, sel in enumerate(self.selectors):
+            if isinstance(sel, str):
+                sel = patterns.registry.selector(f"{prefix}.{i}", sel)
+            compiled.append(sel)
+        self.selectors = tuple(compiled)
+        self.names = [getattr(sel, "name", None) or sel.__name__ for sel in self.selectors]
+
+    def _try(self, sel, page: ParsedPage, values: dict) -> tuple[bool, object]:
+        if callable(sel):
+            value = sel(page, values)
+            return value is not None, value
+        if self.many:
+            nodes = sel.all(page.doc)
+            if nodes:
+                return True, [self.read(n) for n in nodes]
+            return False, None
+        node = sel.one(page.doc)
+        if node is not None:
+            return True, self.read(node)
+        return False, None
+
+    def resolve(self, page: ParsedPage, values: dict, domain: str | None = None,
+                field: str | None = None) -> tuple[bool, object]:
+        """(found, value) for this field; fallback attempts are recorded per domain."""
+        if self.extract is not None:
+            value = self.extract(page, values)
+            found = value is not None
+        else:
+            found, value = False, None
+            stats = get_selector_stats() if domain else None
+            order = stats.order(domain, field, self.names) if stats else range(len(self.selectors))
+            for i in order:
+                found, value = self._try(self.selectors[i], page, values)
+                if stats:
+                    stats.record(domain, field, self.names[i], found)
+                if found:
+                    break
+
+        if found:
+            for fn in self.post:
+                value = fn(value)
+        return found, value
+
+
+class SiteAdapter:
+    """
+    One site's scraper, declared as data: the domains it serves, a FieldSpec
+    per field (in evaluation order; names starting with "_" are scratch
+    values for later fields) and finalize steps that see all values.
+
+    With base=..., the base adapter scrapes first and this adapter's fields
+    only override what they find. scrape=... plugs in a hand-written scraper.
+    """
+
+    def __init__(self, name: str, domains=(), fields: dict | None = None,
+                 finalize=(), base: "SiteAdapter | None" = None, scrape=None):
+        self.name = name
+        self.domains = tuple(domains)
+        self.fields = dict(fields or {})
+        self.finalize = tuple(finalize)
+        self.base = base
+        self._scrape = scrape
+
+    def compile(self):
+        for field, spec in self.fields.items():
+            spec.compile(f"{self.name}.{field.lstrip('_')}")
+
+    def scrape(self, url: str, page) -> ProductData:
+        page = ParsedPage.ensure(page)
+        if self._scrape is not None:
+            return self._scrape(url, page)
+
+        values = {}
+        if self.base is not None:
+            product = self.base.scrape(url, page)
+            # Base answered from structured data alone; not worth a DOM
+            if not page.dom_built:
+                return product
+            values = product_values(product)
+
+        domain = _stats_domain(page.url or url)
+        for field, spec in self.fields.items():
+            found, value = spec.resolve(page, values, domain, field)
+            if found:
+                values[field] = value
+            elif spec.fallback is not None:
+                values[field] = spec.fallback(page, values)
+            elif self.base is None:
+                values[field] = None
+
+        for fn in self.finalize:
+            fn(page, values)
+        return build_product(url, values)
+
+
+def _stats_domain(url: str) -> str:
+    host = (urlparse(url).hostname or "").lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+def product_values(product: ProductData) -> dict:
+    values = {name: getattr(product, name) for name in PRODUCT_FIELDS}
+    values["mrp"] = product.price.mrp
+    values["deal"] = product.price.deal
+    values["discount"] = product.price.discount
+    return values
+
+
+def build_product(url: str, values: dict) -> ProductData:
+    data = {name: values.get(name) for name in PRODUCT_FIELDS}
+    data["title"] = (data["title"] or "No title found")[:150]
+    return ProductData(
+        url=url,
+        price=Price(mrp=values.get("mrp"), deal=values.get("deal"), discount=values.get("discount")),
+        **data,
+    )
+
+
+# ---------- DOMAIN DISPATCH ----------
+
+class AdapterRegistry:
+    """
+    Adapters compiled once: selectors pre-parsed and domains put in a
+    suffix trie keyed by reversed host labels, so a lookup costs one dict
+    step per label no matter how many adapters are registered.
+    """
+
+    def __init__(self, adapters, default: SiteAdapter):
+        self.default = default
+        self.adapters = {a.name: a for a in [*adapters, default]}
+        self._trie: dict = {}
+        for adapter in self.adapters.values():
+            adapter.compile()
+            for domain in adapter.domains:
+                node = self._trie
+                for label in reversed(domain.lower().split(".")):
+                    node = node.setdefault(label, {})
+                node[None] = adapter
+
+    def lookup(self, host: str) -> SiteAdapter:
+        """Adapter for the longest registered suffix of host (else the default)."""
+        node = self._trie
+        found = self.default
+        for label in reversed(host.lower().rstrip(".").split(".")):
+            node = node.get(label)
+            if node is None:
+                break
+            found = node.get(None, found)
+        return found
+
+    def for_url(self, url: str) -> SiteAdapter:
+        return self.lookup(urlparse(url).hostname or "")
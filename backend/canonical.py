@@ -0,0 +1,216 @@
+import os
+import re
+import sqlite3
+import threading
+import time
+from urllib.parse import urlparse, urlunparse, parse_qsl, urlencode
+
+
+# ---------- CONFIG ----------
+
+SHORT_LINK_DB = os.getenv(
+    "SCRAPER_SHORT_LINK_DB",
+    os.path.join(os.getenv("SCRAPER_CACHE_DIR", ".cache"), "links.db"),
+)
+# Short links are stable, but re-resolve once in a while in case one is reused
+SHORT_LINK_TTL = float(os.getenv("SCRAPER_SHORT_LINK_TTL", str(30 * 24 * 3600)))
+
+# Hosts that only redirect to a product page
+SHORT_LINK_HOSTS = {
+    "amzn.in",
+    "amzn.to",
+    "amzn.eu",
+    "a.co",
+    "fkrt.it",
+    "fkrt.cc",
+    "fkrt.co",
+    "myntr.it",
+}
+
+# Query parameters that only track the visitor, never select the product
+TRACKING_PARAMS = {
+    "gclid", "fbclid", "msclkid", "dclid", "igshid", "srsltid", "si",
+    "ref", "ref_", "tag", "linkcode", "linkid", "creative", "creativeasin",
+    "ascsubtag", "camp", "pd_rd_i", "pd_rd_r", "pd_rd_w", "pd_rd_wg",
+    "pf_rd_i", "pf_rd_m", "pf_rd_p", "pf_rd_r", "pf_rd_s", "pf_rd_t",
+    "qid", "sr", "keywords", "crid", "sprefix", "content-id", "dib", "dib_tag",
+    "spla", "sp_csd",
+    "otracker", "otracker1", "srno", "fm",
+    "iid", "ppt", "ppn", "ssid", "affid", "affextparam1", "affextparam2",
+    "cmpid", "_refid", "_appid", "spm", "mc_cid", "mc_eid",
+}
+TRACKING_PREFIXES = ("utm_", "pf_rd_", "pd_rd_")
+
+# Query parameters that pick the listing, seller, marketplace or variant of
+# a product page. The Amazon and Flipkart forms below keep these and drop
+# the rest; elsewhere they simply aren't tracking params.
+LISTING_PARAMS = {"smid", "psc", "th", "lid", "marketplace", "store"}
+
+_ASIN_RE = re.compile(
+    r"/(?:dp|gp/product|gp/aw/d|product|exec/obidos/asin|o/asin)/([A-Z0-9]{10})(?:[/?]|$)",
+    re.I,
+)
+
+
+def _host_matches(host: str, suffix: str) -> bool:
+    return host == suffix or host.endswith("." + suffix)
+
+
+def is_short_link(url: str) -> bool:
+    host = (urlparse(url).hostname or "").lower()
+    return host in SHORT_LINK_HOSTS
+
+
+def _clean_query(query: str) -> str:
+    params = [
+        (k, v) for k, v in parse_qsl(query, keep_blank_values=True)
+        if k.lower() not in TRACKING_PARAMS and not k.lower().startswith(TRACKING_PREFIXES)
+    ]
+    return urlencode(sorted(params))
+
+
+def _listing_params(query: str) -> list[tuple[str, str]]:
+    return sorted(
+        (k.lower(), v) for k, v in parse_qsl(query, keep_blank_values=True) if k.lower() in LISTING_PARAMS
+    )
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    One URL per product listing, the key for caches, dedup and history:
+    - Amazon: https://www.amazon.<tld>/dp/<ASIN>[?<listing params>]
+    - Flipkart: https://www.flipkart.com/<path>?pid=<PID>[&<listing params>]
+    - everything else: lowercased host, no fragment, tracking params dropped
+    Short links are returned cleaned but unresolved (see resolve_cached).
+    Pages are fetched from the URL as given, not from this key.
+    """
+    parsed = urlparse(url.strip())
+    scheme = (parsed.scheme or "https").lower()
+    host = (parsed.hostname or "").lower()
+    port = parsed.port
+    if port and not ((scheme == "http" and port == 80) or (scheme == "https" and port == 443)):
+        netloc = f"{host}:{port}"
+    else:
+        netloc = host
+    path = parsed.path or "/"
+
+    if _host_matches(host, "amazon.in") or _host_matches(host, "amazon.com"):
+        m = _ASIN_RE.search(path)
+        if m:
+            tld = "amazon.in" if _host_matches(host, "amazon.in") else "amazon.com"
+            listing = urlencode(_listing_params(parsed.query))
+            return f"https://www.{tld}/dp/{m.group(1).upper()}" + (f"?{listing}" if listing else "")
+
+    if _host_matches(host, "flipkart.com"):
+        # dl.flipkart.com/dl/<path> is the app deep-link form of www.flipkart.com/<path>
+        if host == "dl.flipkart.com" and path.startswith("/dl/"):
+            path = path[3:]
+        pid = dict((k.lower(), v) for k, v in parse_qsl(parsed.query)).get("pid")
+        if pid:
+            query = urlencode([("pid", pid.upper())] + _listing_params(parsed.query))
+            return f"https://www.flipkart.com{path}?{query}"
+        return urlunparse(("https", "www.flipkart.com", path, "", _clean_query(parsed.query), ""))
+
+    return urlunparse((scheme, netloc, path, parsed.params, _clean_query(parsed.query), ""))
+
+
+# ---------- SHORT-LINK RESOLUTION CACHE ----------
+
+class ShortLinkCache:
+    """
+    Persistent short link -> the product URL it redirects to (local SQLite).
+    The canonical_url column holds that redirect target as fetched.
+    """
+
+    def __init__(self, path: str = SHORT_LINK_DB, ttl: float = SHORT_LINK_TTL):
+        self.path = path
+        self.ttl = ttl
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "stores": 0}
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn().execute(
+            "CREATE TABLE IF NOT EXISTS short_links ("
+            " short_url TEXT PRIMARY KEY, canonical_url TEXT NOT NULL, resolved_at REAL)"
+        )
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def _count(self, name: str):
+        with self._lock:
+            self._counters[name] += 1
+
+    def get(self, short_url: str) -> str | None:
+        row = self._conn().execute(
+            "SELECT canonical_url, resolved_at FROM short_links WHERE short_url = ?",
+            (short_url,),
+        ).fetchone()
+        if row is None or time.time() - row[1] >= self.ttl:
+            self._count("misses")
+            return None
+        self._count("hits")
+        return row[0]
+
+    def put(self, short_url: str, canonical_url: str):
+        self._conn().execute(
+            "INSERT OR REPLACE INTO short_links (short_url, canonical_url, resolved_at)"
+            " VALUES (?, ?, ?)",
+            (short_url, canonical_url, time.time()),
+        )
+        self._count("stores")
+
+    def stats(self) -> dict:
+        with self._lock:
+            counters = dict(self._counters)
+        counters["entries"] = self._conn().execute(
+            "SELECT COUNT(*) FROM short_links"
+        ).fetchone()[0]
+        return counters
+
+
+_links: ShortLinkCache | None = None
+_links_lock = threading.Lock()
+
+
+def get_short_link_cache() -> ShortLinkCache:
+    global _links
+    if _links is None:
+        with _links_lock:
+            if _links is None:
+                _links = ShortLinkCache()
+    return _links
+
+
+def resolve_link(url: str) -> str:
+    """
+    The URL to fetch for an input: the input itself, or for a known short
+    link the page it redirected to, so amzn.in/... links skip their
+    redirect round trip. Unknown short links come back unchanged;
+    record_resolution() fills them in after a fetch.
+    """
+    if is_short_link(url):
+        return get_short_link_cache().get(canonicalize_url(url)) or url
+    return url
+
+
+def resolve_cached(url: str) -> str:
+    """Canonical URL for any input, with known short links resolved (the lookup key, not what to fetch)."""
+    return canonicalize_url(resolve_link(url))
+
+
+def record_resolution(requested_url: str, final_url: str) -> str:
+    """Remember where a short link redirected to; returns the canonical target."""
+    canonical = canonicalize_url(final_url)
+    requested = canonicalize_url(requested_url)
+    if is_short_link(requested) and not is_short_link(canonical):
+        get_short_link_cache().put(requested, final_url)
+    return canonical
@@ -1,8 +1,21 @@
-import re
+from abc import ABC, abstractmethod
 from typing import List
-from bs4 import BeautifulSoup
 
+from dom import INVISIBLE_TAGS, is_hidden
+from keyword_automaton import KeywordAutomaton, KeywordMatch
 from models import ProductData
+from parsed_page import ParsedPage
+from patterns import (
+    RUPEE_PRICE,
+    UP_TO_PERCENT_OFF,
+    SCARCITY_COUNT,
+    COUNTDOWN_TIME,
+    COUNTDOWN_ATTR,
+    ADDON_ATTR,
+    ADDON_TEXT,
+    HIDDEN_FEE,
+    AUTO_ADDED_PRICE,
+)
 
 class DarkPatternFinding:
     def __init__(self, code: str, message: str, severity: str = "medium"):
@@ -19,61 +32,585 @@ class DarkPatternFinding:
         }
 
 
-def detect_dark_patterns(product: ProductData, html: str) -> List[DarkPatternFinding]:
-    findings: List[DarkPatternFinding] = []
+# =====================================================
+# DETECTOR FRAMEWORK
+# =====================================================
 
-    soup = BeautifulSoup(html, "lxml")
-    full_text = soup.get_text(separator=" ", strip=True)
+class Detector(ABC):
+    """
+    One dark pattern. A detector declares what it wants to look at and the
+    engine does the looking, once per page for all detectors together:
 
-    # ---------- 1) Drip pricing keywords ----------
-    # Look for extra fees like "convenience fee", "internet handling fee", etc. [web:63]
-    drip_keywords = [
+    - keywords: lowercase phrases, matched in one shared automaton pass
+      over the visible page text (hidden and noscript subtrees left out);
+      the hits (with positions) arrive in detect()
+    - dom_tags: element names whose nodes go to on_element() during the
+      page's one DOM walk ("*" = every element, empty = no DOM)
+    - detect(ctx): turns the collected hits/evidence into a finding
+
+    Detectors that need more than one element at a time subclass
+    StreamingDetector.
+    """
+
+    code = ""
+    severity = "medium"
+    keywords: tuple = ()
+    dom_tags: tuple = ()
+
+    def on_element(self, node):
+        """Evidence from one element (None = nothing here)."""
+        return None
+
+    @abstractmethod
+    def detect(self, ctx: "DetectionContext") -> DarkPatternFinding | None:
+        """The finding for this page, or None."""
+
+    def finding(self, message: str) -> DarkPatternFinding:
+        return DarkPatternFinding(code=self.code, message=message, severity=self.severity)
+
+
+class StreamingDetector(Detector):
+    """
+    A detector for which one element at a time is not enough (text near an
+    input, text inside a collapsed block): its walker gets the walk's full
+    start / text / end stream for the page, hidden parts included.
+    """
+
+    @abstractmethod
+    def walker(self, found: list):
+        """Fresh per-page visitor (start/text/end) appending evidence to found."""
+
+
+class DetectionContext:
+    """
+    What the engine's two passes found on one page, for detect(), plus the
+    product's stored price history when the caller loaded it
+    (price_history.PriceHistory; None = not available).
+    """
+
+    def __init__(self, product: ProductData, text: str, match: KeywordMatch, evidence: dict,
+                 price_history=None):
+        self.product = product
+        self.price_history = price_history
+        # Lowercased visible page text (no hidden subtrees); keyword
+        # positions index into it
+        self.text = text
+        self.match = match
+        self.evidence = evidence
+
+    def hits(self, detector: Detector) -> list[tuple[int, str]]:
+        """(start, keyword) of the detector's keywords, in text order."""
+        return self.match.by_label.get(detector.code, [])
+
+    def elements(self, detector: Detector) -> list:
+        """Whatever on_element() / the walker found for this detector, in document order."""
+        return self.evidence.get(detector.code, [])
+
+
+class DetectorVisitor:
+    """
+    dom walk visitor handing each element to the detectors that asked for
+    its tag, and the whole event stream to the streaming detectors' walkers.
+    Also collects the visible text runs the keyword pass reads.
+    """
+
+    def __init__(self, registry: "DetectorRegistry"):
+        self.by_tag = registry.by_tag
+        self.every = registry.every_element
+        self.evidence: dict[str, list] = {}
+        # Open elements inside a hidden subtree (0 = visible here)
+        self._hidden = 0
+        self._runs: list[str] = []
+        walkers = [
+            detector.walker(self.evidence.setdefault(detector.code, []))
+            for detector in registry.streaming
+        ]
+        self._starts = [w.start for w in walkers]
+        self._ends = [w.end for w in walkers]
+        self._texts = [w.text for w in walkers]
+
+    def start(self, node):
+        if self._hidden or node.name in INVISIBLE_TAGS or is_hidden(node.get):
+            self._hidden += 1
+        detectors = self.by_tag.get(node.name, ())
+        for group in (detectors, self.every):
+            for detector in group:
+                found = detector.on_element(node)
+                if found is not None:
+                    self.evidence.setdefault(detector.code, []).append(found)
+        for fn in self._starts:
+            fn(node)
+
+    def end(self, node):
+        for fn in self._ends:
+            fn(node)
+        if self._hidden:
+            self._hidden -= 1
+
+    def text(self, value: str):
+        if not self._hidden:
+            run = value.strip()
+            if run:
+                self._runs.append(run)
+        for fn in self._texts:
+            fn(value)
+
+    def visible_text(self) -> str:
+        """Lowercased text a shopper can see, joined like ParsedPage.text."""
+        return " ".join(self._runs).lower()
+
+
+class DetectorRegistry:
+    """
+    Registered detectors, in report order. Their keywords are compiled into
+    one KeywordAutomaton and their DOM interests into a tag -> detectors
+    table, so each extra detector adds table entries, not page passes.
+    """
+
+    def __init__(self):
+        self.detectors: list[Detector] = []
+        self._automaton: KeywordAutomaton | None = None
+        self.by_tag: dict[str, list[Detector]] = {}
+        self.every_element: list[Detector] = []
+        self.streaming: list[Detector] = []
+
+    def register(self, detector: Detector) -> Detector:
+        if any(d.code == detector.code for d in self.detectors):
+            raise ValueError(f"Duplicate detector code: {detector.code}")
+        self.detectors.append(detector)
+        self._automaton = None
+        for tag in detector.dom_tags:
+            if tag == "*":
+                self.every_element.append(detector)
+            else:
+                self.by_tag.setdefault(tag, []).append(detector)
+        if isinstance(detector, StreamingDetector):
+            self.streaming.append(detector)
+        return detector
+
+    @property
+    def automaton(self) -> KeywordAutomaton:
+        if self._automaton is None:
+            self._automaton = KeywordAutomaton(
+                {d.code: list(d.keywords) for d in self.detectors if d.keywords}
+            )
+        return self._automaton
+
+    def dom_visitor(self) -> DetectorVisitor:
+        return DetectorVisitor(self)
+
+    def run(self, product: ProductData, page: ParsedPage,
+            visitor: DetectorVisitor | None = None, price_history=None) -> List[DarkPatternFinding]:
+        if visitor is None:
+            visitor = page.attach(self.dom_visitor())
+        # Runs the page's DOM walk (and the attached visitor) if not done yet
+        page.text_index
+        text = visitor.visible_text()
+        ctx = DetectionContext(
+            product, text, self.automaton.search(text), visitor.evidence, price_history
+        )
+
+        findings = []
+        for detector in self.detectors:
+            found = detector.detect(ctx)
+            if found is not None:
+                findings.append(found)
+        return findings
+
+
+DETECTORS = DetectorRegistry()
+
+
+def _with_curly_quotes(phrases) -> tuple:
+    """Each phrase as typed and with typographic apostrophes (don’t)."""
+    return tuple(dict.fromkeys(
+        variant for p in phrases for variant in (p, p.replace("'", "\u2019"))
+    ))
+
+
+# =====================================================
+# DETECTORS
+# =====================================================
+
+# ---------- 1) Drip pricing keywords ----------
+# Look for extra fees like "convenience fee", "internet handling fee", etc. [web:63]
+class DripPricing(Detector):
+    code = "DARK_DRIP_PRICING"
+    severity = "high"
+    keywords = (
         "convenience fee",
         "platform fee",
         "internet handling fee",
         "handling charges",
         "processing fee",
         "service charge",
-    ]
-    if any(kw.lower() in full_text.lower() for kw in drip_keywords):
-        findings.append(
-            DarkPatternFinding(
-                code="DARK_DRIP_PRICING",
-                message=(
-                    "Additional charges like convenience/platform/handling fees are mentioned "
-                    "separately from the main price, indicating possible drip pricing."
-                ),
-                severity="high",
+    )
+
+    def detect(self, ctx):
+        if ctx.hits(self):
+            return self.finding(
+                "Additional charges like convenience/platform/handling fees are mentioned "
+                "separately from the main price, indicating possible drip pricing."
             )
-        )
+        return None
 
-    # ---------- 2) Exaggerated 'up to X% off' ----------
-    # If text says "up to 80% off" but actual discount is far lower, flag it. [web:61][web:63]
-    up_to_match = re.search(r"up to\s+(\d+)%\s*off", full_text, re.I)
-    if up_to_match and product.price and product.price.mrp and product.price.deal:
+
+# ---------- 2) Exaggerated 'up to X% off' ----------
+# If text says "up to 80% off" but actual discount is far lower, flag it. [web:61][web:63]
+class ExaggeratedDiscount(Detector):
+    code = "DARK_EXAGGERATED_DISCOUNT"
+    keywords = ("up to",)
+
+    def detect(self, ctx):
+        price = ctx.product.price
+        if not (price and price.mrp and price.deal):
+            return None
+        for start, _ in ctx.hits(self):
+            up_to_match = UP_TO_PERCENT_OFF.match(ctx.text, start)
+            if up_to_match:
+                break
+        else:
+            return None
         try:
             claimed = int(up_to_match.group(1))
-            mrp = float(product.price.mrp)
-            deal = float(product.price.deal)
-            if mrp > deal:
-                actual_pct = round((mrp - deal) / mrp * 100)
-                # If actual is less than half of claimed "up to", mark as exaggerated
-                if actual_pct < claimed / 2:
-                    findings.append(
-                        DarkPatternFinding(
-                            code="DARK_EXAGGERATED_DISCOUNT",
-                            message=(
-                                f"Page claims 'up to {claimed}% off' but this product's "
-                                f"actual discount is about {actual_pct}%."
-                            ),
-                            severity="medium",
-                        )
-                    )
+            mrp = float(price.mrp)
+            deal = float(price.deal)
         except Exception:
-            pass
+            return None
+        if mrp > deal:
+            actual_pct = round((mrp - deal) / mrp * 100)
+            # If actual is less than half of claimed "up to", mark as exaggerated
+            if actual_pct < claimed / 2:
+                return self.finding(
+                    f"Page claims 'up to {claimed}% off' but this product's "
+                    f"actual discount is about {actual_pct}%."
+                )
+        return None
+
+
+# ---------- 3) Countdown timers ----------
+# "Deal ends in 02:14:33" text, or a countdown/timer widget in the markup.
+# Widgets are containers or inline text elements with a class/id naming them
+COUNTDOWN_TAGS = ("div", "span", "p", "section", "ul", "li", "strong", "b", "small", "time", "label")
+
+
+class CountdownTimer(Detector):
+    code = "DARK_COUNTDOWN_TIMER"
+    keywords = (
+        "ends in",
+        "expires in",
+        "offer ends",
+        "deal ends",
+        "sale ends",
+        "time left",
+        "hurry",
+    )
+    dom_tags = COUNTDOWN_TAGS
+
+    def on_element(self, node):
+        cls, ident = node.get("class"), node.get("id")
+        if (cls or ident) and COUNTDOWN_ATTR.search(f"{cls or ''} {ident or ''}"):
+            return node.name
+        return None
+
+    def detect(self, ctx):
+        for start, keyword in ctx.hits(self):
+            m = COUNTDOWN_TIME.match(ctx.text, start + len(keyword))
+            if m:
+                return self.finding(
+                    f"Urgency countdown on the page ('{keyword} … {m.group(1)}') "
+                    "may pressure the purchase decision."
+                )
+        if ctx.elements(self):
+            return self.finding(
+                "A countdown/timer element on the page may create false urgency."
+            )
+        return None
+
+
+# ---------- 4) Fake scarcity ----------
+# "Only 2 left in stock!"
+class FakeScarcity(Detector):
+    code = "DARK_FAKE_SCARCITY"
+    keywords = ("only ",)
+
+    def detect(self, ctx):
+        for start, _ in ctx.hits(self):
+            m = SCARCITY_COUNT.match(ctx.text, start)
+            if m:
+                return self.finding(
+                    f"Low-stock claim ('{m.group(0)}') may be used to create artificial scarcity."
+                )
+        return None
+
+
+# ---------- 5) Pre-selected add-ons ----------
+# A checked checkbox/radio beside an insurance/warranty/donation offer or a
+# price: "[x] Add 1 year protection for ₹199". "Beside" = the text of the
+# input's nearest container (label, list item, row, div) within
+# NEAR_TEXT_CHARS on either side, collected as the walk streams past.
+NEAR_CONTAINERS = frozenset({"label", "li", "tr", "td", "p", "div", "fieldset", "dd"})
+NEAR_TEXT_CHARS = 120
+
+
+class _CheckedInputWalker:
+    def __init__(self, found: list):
+        self.found = found
+        self.depth = 0
+        # Characters of page text so far, and the last NEAR_TEXT_CHARS of them
+        self.seen = 0
+        self.tail = ""
+        # (depth, seen at start) of the open near-containers; the root element is the fallback
+        self.containers = [(1, 0)]
+        # [kind, attrs, text before, text after, container depth] of checked inputs
+        self.pending = []
+
+    def start(self, node):
+        self.depth += 1
+        name = node.name
+        if name in NEAR_CONTAINERS:
+            self.containers.append((self.depth, self.seen))
+        elif name == "input" and node.get("checked") is not None:
+            kind = (node.get("type") or "").lower()
+            if kind in ("checkbox", "radio"):
+                depth, opened_at = self.containers[-1]
+                inside = self.seen - opened_at
+                before = self.tail[-inside:] if inside else ""
+                attrs = " ".join(filter(None, (node.get("name"), node.get("id"), node.get("value"))))
+                self.pending.append([kind, attrs, before, "", depth])
+
+    def text(self, value: str):
+        self.seen += len(value)
+        self.tail = (self.tail + value)[-NEAR_TEXT_CHARS:]
+        for item in self.pending:
+            if len(item[3]) < NEAR_TEXT_CHARS:
+                item[3] = (item[3] + value)[:NEAR_TEXT_CHARS]
+
+    def end(self, node):
+        if self.containers[-1][0] == self.depth:
+            if self.pending:
+                done = [item for item in self.pending if item[4] == self.depth]
+                self.pending = [item for item in self.pending if item[4] != self.depth]
+                for item in done:
+                    self._check(*item[:4])
+            if len(self.containers) > 1:
+                self.containers.pop()
+        self.depth -= 1
+
+    def _check(self, kind: str, attrs: str, before: str, after: str):
+        near = f"{before} {after}"
+        # A checked radio with a price is usually just the chosen variant
+        if not (ADDON_TEXT.search(near) or ADDON_ATTR.search(attrs)
+                or (kind == "checkbox" and RUPEE_PRICE.search(near))):
+            return
+        label = " ".join(after.split()) or " ".join(before.split()) or attrs
+        self.found.append(f"{kind} '{label[:60]}'")
+
+
+class PreselectedAddOn(StreamingDetector):
+    code = "DARK_PRESELECTED_ADDON"
+    severity = "high"
+
+    def walker(self, found):
+        return _CheckedInputWalker(found)
+
+    def detect(self, ctx):
+        found = ctx.elements(self)
+        if found:
+            return self.finding(
+                f"Optional add-on pre-selected by default (checked {found[0]}); "
+                "the buyer has to opt out to avoid paying for it."
+            )
+        return None
+
+
+# ---------- 6) Confirmshaming ----------
+# Opt-out links worded to guilt the user
+class Confirmshaming(Detector):
+    code = "DARK_CONFIRMSHAMING"
+    keywords = _with_curly_quotes((
+        "no thanks, i don't",
+        "no thanks, i do not",
+        "no, i don't want",
+        "no, i do not want",
+        "i don't want to save",
+        "i prefer paying full price",
+        "i'd rather pay full price",
+        "i don't like discounts",
+        "i don't care about",
+    ))
+
+    def detect(self, ctx):
+        hits = ctx.hits(self)
+        if hits:
+            return self.finding(
+                f"Opt-out wording ('{hits[0][1]}…') shames the user for declining."
+            )
+        return None
+
+
+# ---------- 7) Forced continuity ----------
+# Free trial that silently turns into a paid subscription
+class ForcedContinuity(Detector):
+    code = "DARK_FORCED_CONTINUITY"
+    keywords = (
+        "auto-renew",
+        "auto renew",
+        "automatically renew",
+        "renews automatically",
+        "will be charged after",
+        "charged automatically",
+        "after the free trial",
+        "after your free trial",
+    )
+
+    def detect(self, ctx):
+        hits = ctx.hits(self)
+        if hits:
+            return self.finding(
+                f"Subscription terms ('{hits[0][1]}') suggest a trial or plan that "
+                "renews into paid billing unless cancelled."
+            )
+        return None
+
+
+# ---------- 8) Sneak into basket ----------
+# "Protection plan automatically added: ₹299"
+class SneakIntoBasket(Detector):
+    code = "DARK_SNEAK_INTO_BASKET"
+    severity = "high"
+    keywords = _with_curly_quotes((
+        "automatically added",
+        "added automatically",
+        "auto-added",
+        "auto added",
+        "pre-added",
+        "we've added",
+        "we have added",
+    ))
+
+    def detect(self, ctx):
+        for start, keyword in ctx.hits(self):
+            m = AUTO_ADDED_PRICE.match(ctx.text, start + len(keyword))
+            if m:
+                return self.finding(
+                    f"A paid item appears to be added to the cart without the buyer "
+                    f"choosing it ('{keyword} … {m.group(1)}')."
+                )
+        return None
+
+
+# ---------- 9) Fees hidden in collapsed sections ----------
+# A fee with an amount inside a closed <details>, a collapse/accordion
+# panel or a hidden element: part of the price the buyer never sees unless
+# they expand it. Only collapsed text is buffered, at most HIDDEN_TEXT_CHARS
+# per section.
+COLLAPSED_CLASSES = frozenset({"collapse", "accordion-collapse", "collapsible-content"})
+HIDDEN_TEXT_CHARS = 2000
+
+
+def _is_collapsed(node) -> bool:
+    if node.name == "details":
+        return node.get("open") is None
+    if is_hidden(node.get):
+        return True
+    cls = node.get("class")
+    if not cls or "collaps" not in cls:
+        return False
+    classes = node.classes
+    return not COLLAPSED_CLASSES.isdisjoint(classes) and "show" not in classes
+
+
+class _CollapsedFeeWalker:
+    def __init__(self, found: list):
+        self.found = found
+        self.depth = 0
+        # Depth of the collapsed section being buffered (0 = none), and of
+        # its <summary>, which stays visible when a <details> is closed
+        self.root = 0
+        self.summary = 0
+        self.parts: list[str] = []
+        self.size = 0
+
+    def start(self, node):
+        self.depth += 1
+        if self.root:
+            if node.name == "summary" and not self.summary:
+                self.summary = self.depth
+        elif _is_collapsed(node):
+            self.root = self.depth
+            self.parts = []
+            self.size = 0
+
+    def text(self, value: str):
+        if self.root and not self.summary and self.size < HIDDEN_TEXT_CHARS:
+            self.parts.append(value)
+            self.size += len(value)
+
+    def end(self, node):
+        if self.depth == self.summary:
+            self.summary = 0
+        elif self.depth == self.root:
+            self.root = 0
+            self._check("".join(self.parts)[:HIDDEN_TEXT_CHARS])
+        self.depth -= 1
+
+    def _check(self, text: str):
+        fee = HIDDEN_FEE.search(text)
+        while fee:
+            window = text[max(0, fee.start() - 80):fee.end() + 80]
+            price = RUPEE_PRICE.search(window)
+            if price:
+                self.found.append(f"{' '.join(fee.group(0).split())} {price.group(0)}")
+                return
+            fee = HIDDEN_FEE.search(text, fee.end())
+
+
+class HiddenCost(StreamingDetector):
+    code = "DARK_HIDDEN_COST"
+    severity = "high"
+
+    def walker(self, found):
+        return _CollapsedFeeWalker(found)
+
+    def detect(self, ctx):
+        found = ctx.elements(self)
+        if found:
+            return self.finding(
+                f"A charge ('{found[0]}') is only shown inside a collapsed or hidden "
+                "section, so it is not visible next to the price."
+            )
+        return None
+
+
+for _detector in (
+    DripPricing(),
+    ExaggeratedDiscount(),
+    CountdownTimer(),
+    FakeScarcity(),
+    PreselectedAddOn(),
+    Confirmshaming(),
+    ForcedContinuity(),
+    SneakIntoBasket(),
+    HiddenCost(),
+):
+    DETECTORS.register(_detector)
+
 
-    # OPTIONAL: 3) Pre-selected add-ons (requires HTML)
-    # For now, you can skip or leave placeholder.
+def detect_dark_patterns(product: ProductData, page: ParsedPage | str,
+                         visitor: DetectorVisitor | None = None,
+                         price_history=None) -> List[DarkPatternFinding]:
+    """
+    Run every registered detector on the page: one keyword pass over the
+    text and one DOM walk. Pass the visitor from attach_detectors() to
+    share the walk the scraper already triggers, and the product's
+    price_history.load_price_history() for the history-based detectors.
+    """
+    # Reuse the scraper's parse when given a ParsedPage; raw HTML still works
+    page = ParsedPage.ensure(page)
+    return DETECTORS.run(product, page, visitor, price_history)
 
-    return findings
 
+def attach_detectors(page: ParsedPage) -> DetectorVisitor:
+    """Ride the detectors' DOM predicates on the page's one walk (call before scraping)."""
+    return page.attach(DETECTORS.dom_visitor())
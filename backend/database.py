@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine, Column, Integer, String, DateTime, Text, JSON
+from sqlalchemy import create_engine, inspect, text, Column, Integer, Float, String, DateTime, Text, JSON, UniqueConstraint
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from datetime import datetime
@@ -14,14 +14,92 @@ class ScanRecord(Base):
     
     id = Column(Integer, primary_key=True, index=True)
     url = Column(String, index=True)
+    canonical_url = Column(String, index=True)  # same product, any tracking params
     risk_score = Column(Integer)
+    rule_version = Column(String)  # rule pack version the violations were scored with
     timestamp = Column(DateTime, default=datetime.utcnow)
     # Storing complex objects as JSON strings for simplicity in this hackathon
     product_data = Column(JSON) 
     violations_data = Column(JSON)
 
+
+class ScanRescore(Base):
+    """A stored scan re-evaluated offline against a later ruleset (see rescore.py)."""
+    __tablename__ = "scan_rescores"
+    __table_args__ = (UniqueConstraint("scan_id", "rule_version", name="uq_scan_rescores_scan_version"),)
+
+    id = Column(Integer, primary_key=True)
+    scan_id = Column(Integer)  # scans.id; leads the unique index
+    rule_version = Column(String, index=True)
+    risk_score = Column(Integer)
+    violations_data = Column(JSON)
+    rescored_at = Column(DateTime, default=datetime.utcnow)
+
+
+class PricePoint(Base):
+    """
+    One observed price of a product (see price_history.py). WITHOUT ROWID,
+    so rows are stored clustered by (product_key, ts): one product's series
+    is a contiguous range of the primary key B-tree.
+    """
+    __tablename__ = "price_points"
+    __table_args__ = {"sqlite_with_rowid": False}
+
+    product_key = Column(Integer, primary_key=True, autoincrement=False)  # 64-bit hash of canonical_url
+    ts = Column(Integer, primary_key=True, autoincrement=False)  # unix seconds, UTC
+    mrp = Column(Float)
+    deal = Column(Float)
+
+# Columns added after the first release: create_all() does not alter
+# existing tables, so add them to older scans.db files here.
+_ADDED_COLUMNS = {
+    "scans": {
+        "canonical_url": "VARCHAR",
+        "rule_version": "VARCHAR",
+    },
+}
+_ADDED_INDEXES = {
+    "ix_scans_canonical_url": "CREATE INDEX IF NOT EXISTS ix_scans_canonical_url ON scans (canonical_url)",
+}
+BACKFILL_CHUNK_SIZE = 1000
+
+
+def _migrate():
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table, columns in _ADDED_COLUMNS.items():
+            existing = {c["name"] for c in inspector.get_columns(table)}
+            for name, sql_type in columns.items():
+                if name not in existing:
+                    conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {name} {sql_type}"))
+        for ddl in _ADDED_INDEXES.values():
+            conn.execute(text(ddl))
+    _backfill_canonical_urls()
+
+
+def _backfill_canonical_urls():
+    """Fill canonical_url on scans saved before it existed, so /history?url= finds them."""
+    from canonical import resolve_cached
+
+    select = text(
+        "SELECT id, url FROM scans WHERE canonical_url IS NULL AND url IS NOT NULL"
+        " AND id > :after ORDER BY id LIMIT :limit"
+    )
+    update = text("UPDATE scans SET canonical_url = :canonical WHERE id = :id")
+    last_id = 0
+    while True:
+        with engine.begin() as conn:
+            rows = conn.execute(select, {"after": last_id, "limit": BACKFILL_CHUNK_SIZE}).all()
+            if not rows:
+                break
+            conn.execute(update, [
+                {"id": scan_id, "canonical": resolve_cached(url)} for scan_id, url in rows
+            ])
+        last_id = rows[-1][0]
+
 def init_db():
     Base.metadata.create_all(bind=engine)
+    _migrate()
 
 def get_db():
     db = SessionLocal()
@@ -0,0 +1,551 @@
+import os
+import re
+
+from bs4 import BeautifulSoup, CData, NavigableString, Tag
+from cssselect import HTMLTranslator
+from lxml import etree
+
+
+# Which DOM implementation the scrapers run on:
+# - "lxml": libxml2 tree + compiled XPath (default, fast)
+# - "soup": BeautifulSoup, kept as a compatibility fallback
+DOM_BACKEND = os.getenv("SCRAPER_DOM_BACKEND", "lxml")
+
+# Strings inside these tags are not page text (same list as BeautifulSoup's
+# DEFAULT_STRING_CONTAINERS), and whitespace is kept verbatim in these.
+STRING_CONTAINERS = frozenset({"script", "style", "template", "rt", "rp"})
+PRESERVE_WHITESPACE = frozenset({"pre", "textarea"})
+_ASCII_SPACES = "\x20\x0a\x09\x0c\x0d"
+
+
+def _names(names) -> tuple:
+    if names is None:
+        return ()
+    if isinstance(names, str):
+        return (names,)
+    return tuple(names)
+
+
+def _attr_matches(value, rule) -> bool:
+    """BeautifulSoup attribute matching: exact string or regex .search()."""
+    if value is None:
+        return False
+    if isinstance(rule, str):
+        return value == rule
+    return rule.search(value) is not None
+
+
+# =====================================================
+# LXML BACKEND
+# =====================================================
+
+_START, _END, _TEXT = 0, 1, 2
+
+# Subtrees never shown to the shopper (for visible-text extraction)
+INVISIBLE_TAGS = STRING_CONTAINERS | {"noscript"}
+_HIDDEN_STYLE_RE = re.compile(r"display\s*:\s*none|visibility\s*:\s*hidden", re.I)
+
+
+def is_hidden(get) -> bool:
+    """hidden / aria-hidden / inline display:none, given an attribute getter."""
+    if get("hidden") is not None or get("aria-hidden") == "true":
+        return True
+    style = get("style")
+    return bool(style) and _HIDDEN_STYLE_RE.search(style) is not None
+
+_translator = HTMLTranslator()
+_xpath_cache: dict[tuple[str, str], etree.XPath] = {}
+
+
+def compile_css(css: str, prefix: str = "descendant::") -> etree.XPath:
+    key = (css, prefix)
+    xpath = _xpath_cache.get(key)
+    if xpath is None:
+        xpath = etree.XPath(_translator.css_to_xpath(css, prefix=prefix))
+        _xpath_cache[key] = xpath
+    return xpath
+
+
+def _is_element(el) -> bool:
+    return isinstance(el.tag, str)
+
+
+def _container_of(el):
+    """Nearest string-container tag name among el and its ancestors."""
+    while el is not None:
+        if el.tag in STRING_CONTAINERS:
+            return el.tag
+        el = el.getparent()
+    return None
+
+
+def _in_preserved(el) -> bool:
+    while el is not None:
+        if el.tag in PRESERVE_WHITESPACE:
+            return True
+        el = el.getparent()
+    return False
+
+
+def _normalize_ws(s: str, preserve: bool) -> str:
+    # BeautifulSoup collapses whitespace-only strings to "\n" or " "
+    if preserve or s.strip(_ASCII_SPACES):
+        return s
+    return "\n" if "\n" in s else " "
+
+
+def _lxml_strings(root, strip: bool):
+    """
+    Yield the text strings under root in document order, with the same
+    selection rules as BeautifulSoup's get_text(): comments are skipped and
+    script/style/template text only counts when asked for on that tag.
+    """
+    wanted = root.tag if root.tag in STRING_CONTAINERS else None
+    container = wanted or _container_of(root.getparent())
+
+    # (element, None, ...) entries are visited; (None, text, ...) entries are
+    # tail strings, which belong to the parent's context
+    stack = [(root, None, container, _in_preserved(root))]
+    while stack:
+        el, tail, container, keep_ws = stack.pop()
+        if el is None:
+            value = tail
+        else:
+            value = el.text
+            # Push in reverse so children come out in document order,
+            # each followed by its own tail
+            for child in reversed(el):
+                if child.tail is not None:
+                    stack.append((None, child.tail, container, keep_ws))
+                if _is_element(child):
+                    stack.append((
+                        child,
+                        None,
+                        child.tag if child.tag in STRING_CONTAINERS else container,
+                        keep_ws or child.tag in PRESERVE_WHITESPACE,
+                    ))
+
+        if value is None or container != wanted:
+            continue
+        s = value.strip() if strip else _normalize_ws(value, keep_ws)
+        if s:
+            yield s
+
+
+def _lxml_string(el):
+    """BeautifulSoup's Tag.string: the only child string, recursively."""
+    while True:
+        children = list(el)
+        count = (1 if el.text is not None else 0) + len(children)
+        count += sum(1 for c in children if c.tail is not None)
+        if count != 1:
+            return None
+        if el.text is not None:
+            return _normalize_ws(el.text, _in_preserved(el))
+        child = children[0]
+        if not _is_element(child):
+            # Comments are strings too
+            return child.text
+        el = child
+
+
+def _lxml_all_strings(root):
+    """Every string (including script and comment text) with its parent element."""
+    for el in root.iter():
+        if el.text is not None:
+            yield el.text, (el if _is_element(el) else el.getparent())
+        if el is not root and el.tail is not None:
+            yield el.tail, el.getparent()
+
+
+class LxmlNode:
+    __slots__ = ("el",)
+
+    def __init__(self, el):
+        self.el = el
+
+    def __eq__(self, other):
+        return isinstance(other, LxmlNode) and other.el is self.el
+
+    def __hash__(self):
+        return hash(self.el)
+
+    @property
+    def name(self) -> str:
+        return self.el.tag
+
+    @property
+    def classes(self) -> list[str]:
+        return (self.el.get("class") or "").split()
+
+    def get(self, attr: str, default=None):
+        return self.el.get(attr, default)
+
+    def get_text(self, separator: str = "", strip: bool = False) -> str:
+        return separator.join(_lxml_strings(self.el, strip))
+
+    @property
+    def text(self) -> str:
+        return self.get_text()
+
+    @property
+    def string(self):
+        return _lxml_string(self.el)
+
+    def select(self, css: str) -> list["LxmlNode"]:
+        return [LxmlNode(e) for e in compile_css(css)(self.el)]
+
+    def select_one(self, css: str):
+        found = compile_css(css)(self.el)
+        return LxmlNode(found[0]) if found else None
+
+    def find_all(self, names) -> list["LxmlNode"]:
+        wanted = set(_names(names))
+        return [LxmlNode(e) for e in self.el.iterdescendants() if e.tag in wanted]
+
+    def find_parent(self):
+        parent = self.el.getparent()
+        return LxmlNode(parent) if parent is not None else None
+
+    def find_next(self, names):
+        """First matching element after this one's start tag (descendants included)."""
+        test = " or ".join(f"self::{n}" for n in _names(names))
+        found = self.el.xpath(f"(descendant::*[{test}] | following::*[{test}])[1]")
+        return LxmlNode(found[0]) if found else None
+
+
+class LxmlDocument(LxmlNode):
+    __slots__ = ()
+
+    def __init__(self, html: str):
+        parser = etree.HTMLParser(encoding="utf-8")
+        root = None
+        if html:
+            root = etree.fromstring(html.encode("utf-8", errors="replace"), parser)
+        if root is None:
+            root = etree.fromstring(b"<html></html>", parser)
+        super().__init__(root)
+
+    def select(self, css: str) -> list[LxmlNode]:
+        return [LxmlNode(e) for e in compile_css(css, "descendant-or-self::")(self.el)]
+
+    def select_one(self, css: str):
+        found = compile_css(css, "descendant-or-self::")(self.el)
+        return LxmlNode(found[0]) if found else None
+
+    def _elements(self, name=None):
+        if name:
+            return self.el.iter(*_names(name))
+        return (e for e in self.el.iter() if _is_element(e))
+
+    def find(self, name=None, attrs: dict | None = None, string=None):
+        """
+        soup.find(name, attrs, string=...) for elements: attribute rules are
+        exact strings or regexes, string= tests the element's .string.
+        For a bare string search use find_string().
+        """
+        for node in self._find_iter(name, attrs, string):
+            return node
+        return None
+
+    def find_all(self, name=None, attrs: dict | None = None, string=None) -> list[LxmlNode]:
+        return list(self._find_iter(name, attrs, string))
+
+    def _find_iter(self, name, attrs, string):
+        attrs = attrs or {}
+        for el in self._elements(name):
+            ok = True
+            for attr, rule in attrs.items():
+                value = el.get(attr)
+                if attr == "class" and value is not None:
+                    tokens = value.split()
+                    if not any(_attr_matches(t, rule) for t in tokens) and not (
+                        len(tokens) != 1 and _attr_matches(" ".join(tokens), rule)
+                    ):
+                        ok = False
+                        break
+                elif not _attr_matches(value, rule):
+                    ok = False
+                    break
+            if not ok:
+                continue
+            if string is not None:
+                s = _lxml_string(el)
+                if s is None or not _attr_matches(s, string):
+                    continue
+            yield LxmlNode(el)
+
+    def find_string(self, pattern: re.Pattern):
+        """Parent element of the first string (any kind) matching pattern."""
+        for s, parent in _lxml_all_strings(self.el):
+            if pattern.search(s):
+                return LxmlNode(parent) if parent is not None else None
+        return None
+
+    def find_by_text(self, names, pattern: re.Pattern):
+        """First element named in names whose get_text() matches pattern."""
+        wanted = set(_names(names))
+        for el in self.el.iter():
+            if el.tag in wanted and pattern.search(LxmlNode(el).get_text()):
+                return LxmlNode(el)
+        return None
+
+    @property
+    def title(self):
+        return self.find("title")
+
+    def visible_strings(self):
+        """
+        Stripped text strings in document order, skipping script/style/
+        noscript and hidden subtrees. Lazy: stop iterating and the walk stops.
+        """
+        if self.el.text is not None and self.el.text.strip():
+            yield self.el.text.strip()
+        # (children iterator, element whose tail follows its subtree)
+        stack = [(iter(self.el), None)]
+        while stack:
+            children, owner = stack[-1]
+            child = next(children, None)
+            if child is None:
+                stack.pop()
+                if owner is not None and owner.tail is not None and owner.tail.strip():
+                    yield owner.tail.strip()
+                continue
+            if (_is_element(child) and child.tag not in INVISIBLE_TAGS
+                    and not is_hidden(child.get)):
+                if child.text is not None and child.text.strip():
+                    yield child.text.strip()
+                stack.append((iter(child), child))
+            elif child.tail is not None and child.tail.strip():
+                yield child.tail.strip()
+
+    def walk(self, visitors):
+        """
+        One document-order pass over the tree. Each visitor gets
+        start(node) / end(node) for every element and text(value) for every
+        page-text string (the strings get_text() would return, unstripped).
+        """
+        starts = [v.start for v in visitors]
+        ends = [v.end for v in visitors]
+        texts = [v.text for v in visitors]
+
+        stack = [(_START, self.el, _container_of(self.el))]
+        while stack:
+            kind, item, container = stack.pop()
+            if kind == _TEXT:
+                for fn in texts:
+                    fn(item)
+                continue
+            if kind == _END:
+                for fn in ends:
+                    fn(item)
+                continue
+
+            node = LxmlNode(item)
+            for fn in starts:
+                fn(node)
+            if item.text is not None and container is None:
+                for fn in texts:
+                    fn(item.text)
+            stack.append((_END, node, None))
+            for child in reversed(item):
+                if child.tail is not None and container is None:
+                    stack.append((_TEXT, child.tail, None))
+                if _is_element(child):
+                    child_container = child.tag if child.tag in STRING_CONTAINERS else container
+                    stack.append((_START, child, child_container))
+
+
+# =====================================================
+# BEAUTIFULSOUP BACKEND (compatibility fallback)
+# =====================================================
+
+# Strings BeautifulSoup counts as page text (not Comment, Script, ...)
+_PAGE_TEXT_TYPES = (NavigableString, CData)
+
+
+class SoupNode:
+    __slots__ = ("tag",)
+
+    def __init__(self, tag):
+        self.tag = tag
+
+    def __eq__(self, other):
+        return isinstance(other, SoupNode) and other.tag is self.tag
+
+    def __hash__(self):
+        return id(self.tag)
+
+    @property
+    def name(self) -> str:
+        return self.tag.name
+
+    @property
+    def classes(self) -> list[str]:
+        return list(self.tag.get("class", []))
+
+    def get(self, attr: str, default=None):
+        value = self.tag.get(attr, default)
+        if isinstance(value, list):
+            return " ".join(value)
+        return value
+
+    def get_text(self, separator: str = "", strip: bool = False) -> str:
+        return self.tag.get_text(separator=separator, strip=strip)
+
+    @property
+    def text(self) -> str:
+        return self.tag.get_text()
+
+    @property
+    def string(self):
+        return self.tag.string
+
+    def select(self, css: str) -> list["SoupNode"]:
+        return [SoupNode(t) for t in self.tag.select(css)]
+
+    def select_one(self, css: str):
+        found = self.tag.select_one(css)
+        return SoupNode(found) if found is not None else None
+
+    def find_all(self, names) -> list["SoupNode"]:
+        return [SoupNode(t) for t in self.tag.find_all(list(_names(names)))]
+
+    def find_parent(self):
+        parent = self.tag.find_parent()
+        return SoupNode(parent) if parent is not None else None
+
+    def find_next(self, names):
+        found = self.tag.find_next(list(_names(names)))
+        return SoupNode(found) if found is not None else None
+
+
+class SoupDocument(SoupNode):
+    __slots__ = ()
+
+    def __init__(self, html: str):
+        super().__init__(BeautifulSoup(html, "lxml"))
+
+    def find(self, name=None, attrs: dict | None = None, string=None):
+        found = self.tag.find(name, attrs=attrs or {}, string=string)
+        return SoupNode(found) if found is not None else None
+
+    def find_all(self, name=None, attrs: dict | None = None, string=None) -> list[SoupNode]:
+        return [SoupNode(t) for t in self.tag.find_all(name, attrs=attrs or {}, string=string)]
+
+    def find_string(self, pattern: re.Pattern):
+        found = self.tag.find(string=pattern)
+        if found is None:
+            return None
+        parent = found.find_parent()
+        return SoupNode(parent) if parent is not None else None
+
+    def find_by_text(self, names, pattern: re.Pattern):
+        wanted = set(_names(names))
+        found = self.tag.find(
+            lambda tag: tag.name in wanted and pattern.search(tag.get_text())
+        )
+        return SoupNode(found) if found is not None else None
+
+    @property
+    def title(self):
+        return SoupNode(self.tag.title) if self.tag.title is not None else None
+
+    def visible_strings(self):
+        """Same contract as LxmlDocument.visible_strings."""
+        stack = [iter(self.tag.contents)]
+        while stack:
+            item = next(stack[-1], None)
+            if item is None:
+                stack.pop()
+            elif isinstance(item, Tag):
+                if item.name not in INVISIBLE_TAGS and not is_hidden(self._attr_getter(item)):
+                    stack.append(iter(item.contents))
+            elif type(item) in _PAGE_TEXT_TYPES:
+                text = item.strip()
+                if text:
+                    yield str(text)
+
+    @staticmethod
+    def _attr_getter(tag):
+        def get(attr):
+            value = tag.get(attr)
+            return " ".join(value) if isinstance(value, list) else value
+        return get
+
+    def walk(self, visitors):
+        """Same contract as LxmlDocument.walk."""
+        starts = [v.start for v in visitors]
+        ends = [v.end for v in visitors]
+        texts = [v.text for v in visitors]
+
+        stack = [(_START, child) for child in reversed(self.tag.contents)]
+        while stack:
+            kind, item = stack.pop()
+            if kind == _END:
+                for fn in ends:
+                    fn(item)
+                continue
+            if isinstance(item, Tag):
+                node = SoupNode(item)
+                for fn in starts:
+                    fn(node)
+                stack.append((_END, node))
+                stack.extend((_START, child) for child in reversed(item.contents))
+            elif type(item) in _PAGE_TEXT_TYPES:
+                for fn in texts:
+                    fn(str(item))
+
+
+BACKENDS = {
+    "lxml": LxmlDocument,
+    "soup": SoupDocument,
+}
+
+
+def parse_document(html: str, backend: str | None = None):
+    return BACKENDS[backend or DOM_BACKEND](html)
+
+
+def compare_backends(html: str, selectors: list[str] | None = None) -> list[str]:
+    """
+    Parity check between the lxml and soup backends on one page: whole-page
+    text, plus text of every element matched by the given CSS selectors.
+    Returns human-readable differences (empty list = identical).
+    """
+    fast, slow = LxmlDocument(html), SoupDocument(html)
+    diffs = []
+    if fast.get_text(" ", True) != slow.get_text(" ", True):
+        diffs.append("page text differs")
+    for css in selectors or []:
+        a = [n.get_text(" ", True) for n in fast.select(css)]
+        b = [n.get_text(" ", True) for n in slow.select(css)]
+        if a != b:
+            diffs.append(f"{css}: {len(a)} vs {len(b)} nodes, text differs")
+        a = [n.string for n in fast.select(css)]
+        b = [n.string for n in slow.select(css)]
+        if a != b:
+            diffs.append(f"{css}: .string differs")
+    return diffs
+
+
+if __name__ == "__main__":
+    # python dom.py <url> <saved page.html> [<url> <page.html> ...]
+    # Checks that both backends produce identical ProductData and DOM text.
+    import sys
+    import time
+
+    from scraper import compare_dom_backends
+
+    args = sys.argv[1:]
+    for url, path in zip(args[::2], args[1::2]):
+        with open(path, encoding="utf-8", errors="replace") as f:
+            html = f.read()
+        diffs = compare_backends(html, ["span", "div", "li", "td", "script", "p"])
+        diffs += compare_dom_backends(url, html)
+        timings = {}
+        for name, cls in BACKENDS.items():
+            start = time.perf_counter()
+            cls(html).get_text(" ", True)
+            timings[name] = round((time.perf_counter() - start) * 1000, 2)
+        print(path, "OK" if not diffs else diffs, timings)
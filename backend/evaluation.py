@@ -0,0 +1,398 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from models import ProductData, AiNormalizedProduct, Violation
+from rule_engine import RuleEngine, SEVERITY_WEIGHTS
+from rules import RULE_PACKS_DIR, RulePackError, load_rules, pack_files
+
+
+# ---------- CONFIG ----------
+
+# Memoized evaluations kept in memory (LRU)
+EVAL_CACHE_SIZE = int(os.getenv("EVAL_CACHE_SIZE", "4096"))
+
+# How often the rule pack directory is checked for changes (seconds, 0 = never)
+RULE_PACKS_POLL_SECONDS = float(os.getenv("RULE_PACKS_POLL_SECONDS", "10"))
+
+# Scans take the category from the normalized product and only gate these
+# categories' rules on it; every other category's rules always apply.
+SCAN_GATED_CATEGORIES = ("electronics", "food", "health")
+
+
+# ---------- SCORING ----------
+
+def risk_score(violations) -> int:
+    """100 minus HIGH 20 / MEDIUM 10 / LOW 5 per violation, floored at 0."""
+    return max(0, 100 - sum(SEVERITY_WEIGHTS.get(v.severity.upper(), 0) for v in violations))
+
+
+# ---------- FIELD INDEX ----------
+
+def build_field_index(product: ProductData, ai: AiNormalizedProduct) -> dict:
+    """
+    Rule field -> present, from the AI-normalized product with the raw
+    scraped data filling its gaps.
+    """
+    tech = (product.technical_details or "").lower()
+
+    seller = ai.seller or product.seller
+    price = ai.price if ai.price is not None else (product.price.deal if product.price else None)
+    returns = ai.returns or product.returns
+    delivery = ai.delivery or product.delivery
+    origin = ai.origin
+    brand = ai.brand or product.brand
+    quantity = ai.quantity
+    images = ai.images if ai.images is not None else True
+
+    return {
+        "seller": bool(seller),
+        "seller_contact": bool(ai.seller_contact),
+        "seller_address": bool(ai.seller_address),
+        "price": price is not None,
+        "charges": bool(ai.charges),
+        "returns": bool(returns),
+        "delivery": bool(delivery),
+        "origin": bool(origin),
+        "grievance": bool(ai.grievance),
+        "description": bool(ai.description or product.title or tech),
+        "reviews": bool(ai.reviews),
+        "title": bool(ai.title or product.title),
+        "brand": bool(brand),
+        "quantity": bool(quantity),
+        "images": bool(images),
+        # electronics
+        "warranty": bool(ai.warranty or product.warranty or ("warranty" in tech)),
+        "specifications": bool(ai.specifications or product.technical_details),
+        "voltage": bool(ai.voltage),
+        "safety": bool(ai.safety),
+        "energy_rating": bool(ai.energy_rating),
+        "model_number": bool(ai.model_number),
+        "compatibility": bool(ai.compatibility),
+        # food
+        "expiry": bool(ai.expiry),
+        "ingredients": bool(ai.ingredients),
+        "fssai": bool(ai.fssai),
+        "allergen": bool(ai.allergen),
+        "veg_nonveg": bool(ai.veg_nonveg),
+        "storage": bool(ai.storage),
+        "manufacturer": bool(ai.manufacturer or ("manufacturer" in tech)),
+        "nutrition": bool(ai.nutrition),
+        # health
+        "disclaimer": bool(ai.disclaimer),
+        "dosage": bool(ai.dosage),
+        "guaranteed": bool(ai.guaranteed),
+        "100%": "100%" in (ai.guaranteed or ""),
+        "usage": bool(ai.usage),
+        "warning": bool(ai.warning),
+        "age_limit": bool(ai.age_limit),
+        "prescription_required": bool(ai.prescription_required),
+    }
+
+
+def rule_violation(rule, missing: list[str]) -> Violation:
+    return Violation(
+        rule_id=rule.id,
+        severity=rule.severity,
+        description=f"{rule.title} – missing or unclear: {', '.join(missing)}",
+        suggestion=f"Ensure the following field(s) are clearly disclosed: {', '.join(missing)}.",
+    )
+
+
+# ---------- RULESET ----------
+
+def ruleset_version(rules: list[dict]) -> str:
+    """Content hash of a rule list: changes whenever any rule does."""
+    raw = json.dumps(rules, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    return hashlib.sha256(raw).hexdigest()[:12]
+
+
+class Ruleset:
+    """A rule list compiled once per category mode, tagged with its version."""
+
+    def __init__(self, rules: list[dict], packs: list[dict] | None = None):
+        self.rules = rules
+        self.packs = packs or []
+        self.version = ruleset_version(rules)
+        self.loaded_at = time.time()
+        self.engines = {
+            # Pipeline scans: AI category, only SCAN_GATED_CATEGORIES gated
+            "scan": RuleEngine(rules, gated=SCAN_GATED_CATEGORIES),
+            # Inferred category: 'all' rules plus that category's
+            "inferred": RuleEngine(rules),
+        }
+
+
+class Evaluation:
+    """One product's compliance result. Cached and shared: treat as read-only."""
+
+    def __init__(self, category: str, score: int, violations: tuple, ruleset_version: str):
+        self.category = category
+        self.score = score
+        self.violations = violations
+        self.ruleset_version = ruleset_version
+        self._violation_dicts = None
+
+    def violation_dicts(self) -> list[dict]:
+        """violations as plain dicts (dumped once per cached result)."""
+        if self._violation_dicts is None:
+            self._violation_dicts = [v.model_dump() for v in self.violations]
+        return list(self._violation_dicts)
+
+
+# ---------- SERVICE ----------
+
+class EvaluationService:
+    """
+    The one place products are checked against the rules. Results are
+    memoized on a hash of the normalized product, its category, the mode
+    and the ruleset version, so a rescan of an unchanged product (or a
+    ruleset swap) never serves a stale result.
+    """
+
+    def __init__(self, ruleset: Ruleset, max_entries: int = EVAL_CACHE_SIZE):
+        self.ruleset = ruleset
+        self.max_entries = max_entries
+        self._cache: OrderedDict[str, Evaluation] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def swap_ruleset(self, ruleset: Ruleset):
+        """
+        Switch to a compiled ruleset in one assignment. Calls already running
+        keep the ruleset they started with; entries of the old version are
+        never hit again and age out of the LRU.
+        """
+        self.ruleset = ruleset
+
+    def _key(self, ruleset: Ruleset, mode: str, category: str,
+             product: ProductData, ai: AiNormalizedProduct | None) -> str:
+        h = hashlib.sha256()
+        h.update(f"{ruleset.version}\0{mode}\0{category}\0".encode("utf-8"))
+        # URL and scrape time do not change the result
+        h.update(product.model_dump_json(exclude={"url", "timestamp"}).encode("utf-8"))
+        if ai is not None:
+            h.update(b"\0")
+            h.update(ai.model_dump_json().encode("utf-8"))
+        return h.hexdigest()
+
+    def _get(self, key: str) -> Evaluation | None:
+        with self._lock:
+            found = self._cache.get(key)
+            if found is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._cache.move_to_end(key)
+            return found
+
+    def _put(self, key: str, evaluation: Evaluation):
+        with self._lock:
+            self._cache[key] = evaluation
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+                self.evictions += 1
+
+    @staticmethod
+    def _category(ai: AiNormalizedProduct | None, category: str | None) -> str:
+        if category is not None:
+            return category
+        return ((ai.category if ai is not None else None) or "all").lower()
+
+    def check(self, product: ProductData, ai: AiNormalizedProduct | None = None,
+              category: str | None = None, mode: str = "scan") -> Evaluation:
+        """
+        Evaluate one product. mode="scan" takes the category from the
+        AI-normalized product; mode="inferred" expects the caller's
+        inferred category.
+        """
+        ruleset = self.ruleset  # one consistent snapshot for this call
+        category = self._category(ai, category)
+        key = self._key(ruleset, mode, category, product, ai)
+        found = self._get(key)
+        if found is not None:
+            return found
+
+        engine = ruleset.engines[mode]
+        if ai is None:
+            # No normalized product: a field is present when the product has it
+            present = engine.mask_of(product)
+        else:
+            present = engine.mask(build_field_index(product, ai))
+        failed = engine.failures(category, present)
+        evaluation = Evaluation(
+            category,
+            RuleEngine.score(failed),
+            tuple(rule_violation(rule, rule.missing(present)) for rule in failed),
+            ruleset.version,
+        )
+        self._put(key, evaluation)
+        return evaluation
+
+    def check_batch(self, items: list[tuple[ProductData, AiNormalizedProduct]],
+                    mode: str = "scan") -> list[Evaluation]:
+        """
+        check() for many products (catalog audits): cached ones are served
+        from the memo, the rest evaluated together in one NumPy pass.
+        """
+        ruleset = self.ruleset
+        engine = ruleset.engines[mode]
+        results: list[Evaluation | None] = []
+        pending = []
+        for i, (product, ai) in enumerate(items):
+            category = self._category(ai, None)
+            key = self._key(ruleset, mode, category, product, ai)
+            found = self._get(key)
+            results.append(found)
+            if found is None:
+                pending.append((i, key, category, build_field_index(product, ai)))
+
+        if pending:
+            presence = engine.presence_matrix([fields for _, _, _, fields in pending])
+            scores, failed_lists = engine.evaluate_batch([c for _, _, c, _ in pending], presence)
+            for (i, key, category, _), score, failed, row in zip(pending, scores, failed_lists, presence):
+                evaluation = Evaluation(
+                    category,
+                    score,
+                    tuple(rule_violation(rule, rule.missing_in_row(row)) for rule in failed),
+                    ruleset.version,
+                )
+                self._put(key, evaluation)
+                results[i] = evaluation
+        return results
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "ruleset_version": self.ruleset.version,
+                "entries": len(self._cache),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            }
+
+
+_service: EvaluationService | None = None
+_service_lock = threading.Lock()
+
+
+def get_evaluation_service() -> EvaluationService:
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                loaded = load_rules()
+                _service = EvaluationService(Ruleset(loaded.rules, loaded.packs))
+    return _service
+
+
+# ---------- RULE PACK HOT RELOAD ----------
+
+class RulePackReloader:
+    """
+    Watches the rule pack directory and, when a pack file changes, loads,
+    validates and compiles the new rules on its own thread before swapping
+    them into the evaluation service. An invalid update is reported in
+    status() and the running ruleset stays in place.
+    """
+
+    def __init__(self, service: EvaluationService, directory: str = RULE_PACKS_DIR,
+                 interval: float = RULE_PACKS_POLL_SECONDS):
+        self.service = service
+        self.directory = directory
+        self.interval = interval
+        self._fingerprint = self._current_fingerprint()
+        self._reload_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self.reloads = 0
+        self.last_error: str | None = None
+        self.last_checked_at: float | None = None
+
+    def _current_fingerprint(self) -> tuple:
+        fingerprint = []
+        for path in pack_files(self.directory):
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            fingerprint.append((os.path.basename(path), st.st_mtime_ns, st.st_size))
+        return tuple(fingerprint)
+
+    def reload(self, force: bool = False) -> bool:
+        """Recompile and swap if the packs changed (or force). True if swapped."""
+        with self._reload_lock:
+            self.last_checked_at = time.time()
+            fingerprint = self._current_fingerprint()
+            if not force and fingerprint == self._fingerprint:
+                return False
+            try:
+                loaded = load_rules(self.directory)
+                ruleset = Ruleset(loaded.rules, loaded.packs)
+            except (RulePackError, ValueError) as e:
+                self.last_error = str(e)
+                # Remember the broken state so it is not re-parsed every poll
+                self._fingerprint = fingerprint
+                raise
+            self._fingerprint = fingerprint
+            self.last_error = None
+            if ruleset.version == self.service.ruleset.version:
+                return False
+            self.service.swap_ruleset(ruleset)
+            self.reloads += 1
+            return True
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.reload()
+            except (RulePackError, ValueError):
+                pass  # kept in last_error, old ruleset still serving
+
+    def start(self):
+        if self.interval <= 0 or self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="rule-pack-reloader", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def status(self) -> dict:
+        ruleset = self.service.ruleset
+        return {
+            "version": ruleset.version,
+            "rules": len(ruleset.rules),
+            "packs": ruleset.packs,
+            "loaded_at": ruleset.loaded_at,
+            "directory": self.directory,
+            "reloads": self.reloads,
+            "last_checked_at": self.last_checked_at,
+            "last_error": self.last_error,
+        }
+
+
+_reloader: RulePackReloader | None = None
+_reloader_lock = threading.Lock()
+
+
+def get_rule_reloader() -> RulePackReloader:
+    global _reloader
+    if _reloader is None:
+        with _reloader_lock:
+            if _reloader is None:
+                _reloader = RulePackReloader(get_evaluation_service())
+    return _reloader
@@ -0,0 +1,335 @@
+import asyncio
+import os
+import threading
+import time
+from http.cookiejar import DefaultCookiePolicy
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3 import PoolManager
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util.retry import Retry
+
+
+# ---------- CONFIG ----------
+
+HTTP_TIMEOUT = float(os.getenv("SCRAPER_HTTP_TIMEOUT", "15"))
+HTTP_CONNECT_TIMEOUT = float(os.getenv("SCRAPER_HTTP_CONNECT_TIMEOUT", "5"))
+HTTP_RETRIES = int(os.getenv("SCRAPER_HTTP_RETRIES", "2"))
+HTTP_BACKOFF = float(os.getenv("SCRAPER_HTTP_BACKOFF", "0.5"))
+# Responses worth another try (both clients)
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# Max keep-alive connections per host. Hosts are matched by suffix, so
+# "amazon.in" covers "www.amazon.in" too.
+DEFAULT_POOL_SIZE = int(os.getenv("SCRAPER_POOL_SIZE", "4"))
+HOST_POOL_SIZES = {
+    "amazon.in": 16,
+    "amazon.com": 8,
+    "flipkart.com": 16,
+    "amzn.in": 4,
+}
+# Number of distinct hosts kept in the pool manager
+MAX_HOSTS = int(os.getenv("SCRAPER_POOL_HOSTS", "32"))
+
+
+def pool_size_for(host: str) -> int:
+    host = (host or "").lower()
+    for suffix, size in HOST_POOL_SIZES.items():
+        if host == suffix or host.endswith("." + suffix):
+            return size
+    return DEFAULT_POOL_SIZE
+
+
+# ---------- POOL STATS ----------
+
+class PoolStats:
+    """
+    Thread-safe per-host counters:
+    - requests: connections checked out of the pool
+    - new_connections: real TCP(+TLS) connects
+    - hits: requests served on an already open keep-alive connection
+    - waits: checkouts that had to block because the pool was exhausted
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._hosts: dict[str, dict] = {}
+
+    def _host(self, host: str) -> dict:
+        if host not in self._hosts:
+            self._hosts[host] = {
+                "pool_size": pool_size_for(host),
+                "requests": 0,
+                "new_connections": 0,
+                "waits": 0,
+                "wait_seconds": 0.0,
+            }
+        return self._hosts[host]
+
+    def record_checkout(self, host: str, waited: bool, wait_seconds: float):
+        with self._lock:
+            h = self._host(host)
+            h["requests"] += 1
+            if waited:
+                h["waits"] += 1
+                h["wait_seconds"] += wait_seconds
+
+    def record_connect(self, host: str):
+        with self._lock:
+            self._host(host)["new_connections"] += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            hosts = {}
+            for host, h in self._hosts.items():
+                data = dict(h)
+                data["hits"] = max(0, h["requests"] - h["new_connections"])
+                data["wait_seconds"] = round(h["wait_seconds"], 3)
+                hosts[host] = data
+
+        totals = {"requests": 0, "new_connections": 0, "hits": 0, "waits": 0}
+        for data in hosts.values():
+            for key in totals:
+                totals[key] += data[key]
+        return {"totals": totals, "hosts": hosts}
+
+
+_stats = PoolStats()
+
+
+class _CountingHTTPConnection(HTTPConnection):
+    def connect(self):
+        _stats.record_connect(self.host)
+        super().connect()
+
+
+class _CountingHTTPSConnection(HTTPSConnection):
+    def connect(self):
+        _stats.record_connect(self.host)
+        super().connect()
+
+
+class _CountingPoolMixin:
+    def _get_conn(self, timeout=None):
+        waited = bool(self.block and self.pool is not None and self.pool.empty())
+        start = time.monotonic()
+        conn = super()._get_conn(timeout=timeout)
+        _stats.record_checkout(self.host, waited, time.monotonic() - start)
+        return conn
+
+
+class _CountingHTTPPool(_CountingPoolMixin, HTTPConnectionPool):
+    ConnectionCls = _CountingHTTPConnection
+
+
+class _CountingHTTPSPool(_CountingPoolMixin, HTTPSConnectionPool):
+    ConnectionCls = _CountingHTTPSConnection
+
+
+class _PerHostPoolManager(PoolManager):
+    """PoolManager that sizes each host's pool from HOST_POOL_SIZES."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.pool_classes_by_scheme = {
+            "http": _CountingHTTPPool,
+            "https": _CountingHTTPSPool,
+        }
+
+    def _new_pool(self, scheme, host, port, request_context=None):
+        if request_context is None:
+            request_context = self.connection_pool_kw.copy()
+        request_context["maxsize"] = pool_size_for(host)
+        return super()._new_pool(scheme, host, port, request_context)
+
+
+class _PooledAdapter(HTTPAdapter):
+    def init_poolmanager(self, connections, maxsize, block=False, **pool_kwargs):
+        self._pool_connections = connections
+        self._pool_maxsize = maxsize
+        self._pool_block = block
+
+        self.poolmanager = _PerHostPoolManager(
+            num_pools=connections,
+            maxsize=maxsize,
+            block=block,
+            **pool_kwargs,
+        )
+
+
+# ---------- CLIENT ----------
+
+class HttpClient:
+    """
+    Shared keep-alive HTTP client for the scraper.
+    One requests.Session with per-host connection pools; safe to call from
+    FastAPI's threadpool (pools block instead of opening extra sockets).
+    """
+
+    def __init__(
+        self,
+        timeout: float = HTTP_TIMEOUT,
+        connect_timeout: float = HTTP_CONNECT_TIMEOUT,
+        retries: int = HTTP_RETRIES,
+        backoff: float = HTTP_BACKOFF,
+    ):
+        self.timeout = (connect_timeout, timeout)
+
+        retry = Retry(
+            total=retries,
+            connect=retries,
+            read=retries,
+            status=retries,
+            backoff_factor=backoff,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=frozenset(["GET", "HEAD"]),
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        adapter = _PooledAdapter(
+            pool_connections=MAX_HOSTS,
+            pool_maxsize=DEFAULT_POOL_SIZE,
+            pool_block=True,
+            max_retries=retry,
+        )
+
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        # Each scan stays stateless (like a bare requests.get): never keep
+        # cookies from one product page for the next.
+        self.session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+
+    def get(self, url: str, headers: dict | None = None, timeout=None) -> requests.Response:
+        return self.session.get(url, headers=headers, timeout=timeout or self.timeout)
+
+    def close(self):
+        self.session.close()
+
+
+_client: HttpClient | None = None
+_client_lock = threading.Lock()
+
+
+def get_http_client() -> HttpClient:
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = HttpClient()
+    return _client
+
+
+def pool_stats() -> dict:
+    return _stats.snapshot()
+
+
+# ---------- ASYNC CLIENT ----------
+
+ASYNC_MAX_CONNECTIONS = int(os.getenv("SCRAPER_ASYNC_MAX_CONNECTIONS", "64"))
+ASYNC_MAX_KEEPALIVE = int(os.getenv("SCRAPER_ASYNC_MAX_KEEPALIVE", "32"))
+
+
+def _retry_after(resp: httpx.Response) -> float | None:
+    value = resp.headers.get("retry-after")
+    try:
+        return max(0.0, float(value)) if value else None
+    except ValueError:  # HTTP-date form; fall back to our own backoff
+        return None
+
+
+class AsyncHttpClient:
+    """
+    asyncio counterpart of HttpClient, used by the async scan engine, with
+    the same behaviour:
+    - at most pool_size_for(host) requests in flight per host (httpx only
+      caps connections globally, so a per-host semaphore does it)
+    - connect errors retried by the transport, RETRY_STATUSES retried here
+      with exponential backoff (Retry-After respected)
+    - checkouts and new connections recorded in the shared PoolStats
+    """
+
+    def __init__(
+        self,
+        timeout: float = HTTP_TIMEOUT,
+        connect_timeout: float = HTTP_CONNECT_TIMEOUT,
+        retries: int = HTTP_RETRIES,
+        backoff: float = HTTP_BACKOFF,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ):
+        self.retries = retries
+        self.backoff = backoff
+        self._host_slots: dict[str, asyncio.Semaphore] = {}
+        if transport is None:
+            transport = httpx.AsyncHTTPTransport(
+                retries=retries,
+                limits=httpx.Limits(
+                    max_connections=ASYNC_MAX_CONNECTIONS,
+                    max_keepalive_connections=ASYNC_MAX_KEEPALIVE,
+                ),
+            )
+        self.client = httpx.AsyncClient(
+            timeout=httpx.Timeout(timeout, connect=connect_timeout),
+            transport=transport,
+            follow_redirects=True,
+        )
+        # Same stateless-cookie policy as the sync client
+        self.client.cookies.jar.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+
+    def _slots(self, host: str) -> asyncio.Semaphore:
+        slots = self._host_slots.get(host)
+        if slots is None:
+            slots = self._host_slots[host] = asyncio.Semaphore(pool_size_for(host))
+        return slots
+
+    async def _send(self, url: str, headers: dict | None) -> httpx.Response:
+        host = httpx.URL(url).host
+
+        async def trace(event: str, info: dict):
+            # httpcore reports each real TCP connect; reused keep-alive
+            # connections never get here
+            if event == "connection.connect_tcp.complete":
+                _stats.record_connect(host)
+
+        slots = self._slots(host)
+        waited = slots.locked()
+        start = time.monotonic()
+        async with slots:
+            _stats.record_checkout(host, waited, time.monotonic() - start)
+            return await self.client.get(url, headers=headers, extensions={"trace": trace})
+
+    async def get(self, url: str, headers: dict | None = None) -> httpx.Response:
+        for attempt in range(self.retries + 1):
+            resp = await self._send(url, headers)
+            if resp.status_code not in RETRY_STATUSES or attempt == self.retries:
+                return resp
+            delay = _retry_after(resp)
+            if delay is None:
+                delay = self.backoff * (2 ** attempt)
+            await resp.aclose()
+            await asyncio.sleep(delay)
+        return resp
+
+    async def aclose(self):
+        await self.client.aclose()
+
+
+_async_client: AsyncHttpClient | None = None
+
+
+def get_async_http_client() -> AsyncHttpClient:
+    # Only ever touched from the event loop thread, so no lock needed
+    global _async_client
+    if _async_client is None:
+        _async_client = AsyncHttpClient()
+    return _async_client
+
+
+async def close_async_http_client():
+    global _async_client
+    if _async_client is not None:
+        await _async_client.aclose()
+        _async_client = None
@@ -0,0 +1,89 @@
+import re
+
+
+class KeywordMatch:
+    """Every keyword hit in one text (in the order they end), grouped by label."""
+
+    def __init__(self, hits: list[tuple[int, str, str]]):
+        # (start, keyword, label)
+        self.hits = hits
+        self.by_label: dict[str, list[tuple[int, str]]] = {}
+        for start, keyword, label in hits:
+            self.by_label.setdefault(label, []).append((start, keyword))
+
+    def labels(self) -> list[str]:
+        return list(self.by_label)
+
+    def first(self, priority, default: str = "all") -> str:
+        """First label in priority order that has any hit."""
+        for label in priority:
+            if label in self.by_label:
+                return label
+        return default
+
+    def confidence(self, label: str) -> float:
+        """Share of all keyword hits that belong to label (0.0 if none)."""
+        if not self.hits:
+            return 0.0
+        return len(self.by_label.get(label, ())) / len(self.hits)
+
+
+def _trie_regex(node: dict) -> str:
+    """Regex for a keyword trie; greedy, so it matches the longest keyword at a position."""
+    alternatives = [re.escape(ch) + _trie_regex(child) for ch, child in node.items() if ch]
+    if not alternatives:
+        return ""
+    body = alternatives[0] if len(alternatives) == 1 else "(?:" + "|".join(alternatives) + ")"
+    return f"(?:{body})?" if "" in node else body
+
+
+class KeywordAutomaton:
+    """
+    Keyword matcher over {label: keywords}, built once. One pass over the
+    text finds every occurrence of every keyword, overlapping ones
+    included, so it answers the same question as `kw in text` for each
+    keyword at once.
+
+    The keywords are compiled into one trie-shaped regex, so the scan runs
+    in the regex engine instead of a Python loop per character. At each
+    position it matches the longest keyword; the shorter keywords starting
+    there are exactly its prefixes, looked up from a table.
+    """
+
+    def __init__(self, keywords: dict[str, list[str]]):
+        self.keywords = {label: tuple(words) for label, words in keywords.items()}
+
+        pairs = [(word, label) for label, words in self.keywords.items() for word in words if word]
+        trie: dict = {}
+        for word, _ in pairs:
+            node = trie
+            for ch in word:
+                node = node.setdefault(ch, {})
+            node[""] = {}
+        self._regex = re.compile(_trie_regex(trie)) if pairs else None
+
+        # keyword -> (keyword, label) of every keyword it starts with, shortest
+        # first, so hits at one position come out in the order they end
+        self._prefixes: dict[str, list[tuple[str, str]]] = {}
+        for word in dict.fromkeys(word for word, _ in pairs):
+            self._prefixes[word] = sorted(
+                (pair for pair in pairs if word.startswith(pair[0])), key=lambda pair: len(pair[0])
+            )
+
+    def search(self, text: str) -> KeywordMatch:
+        if self._regex is None:
+            return KeywordMatch([])
+        search, prefixes = self._regex.search, self._prefixes
+        hits = []
+        m = search(text)
+        while m is not None:
+            start = m.start()
+            for word, label in prefixes[m.group()]:
+                hits.append((start, word, label))
+            # Restart one character on, so overlapping keywords are found too
+            m = search(text, start + 1)
+        if len(hits) > 1:
+            # Found in start order; KeywordMatch lists them in the order they
+            # end (stable, so equal ends stay in start order)
+            hits.sort(key=lambda hit: hit[0] + len(hit[1]))
+        return KeywordMatch(hits)
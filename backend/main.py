@@ -1,30 +1,66 @@
+import asyncio
 from datetime import datetime
 import json
+import logging
 import os
-import re
 
 from dotenv import load_dotenv
-from fastapi import FastAPI, Depends
+from fastapi import FastAPI, Depends, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
-from scraper import scrape_product, _fetch_html
-from dark_patterns import detect_dark_patterns
+from scraper import (
+    fetch_page,
+    fetch_page_async,
+    scrape_product_from_page,
+    FetchedPage,
+    parse_executor,
+)
+from http_client import pool_stats, close_async_http_client
+from rate_limit import get_rate_limiter, bucket_for
+from page_cache import get_page_cache
+from canonical import canonicalize_url, resolve_cached, get_short_link_cache
+from dark_patterns import attach_detectors, detect_dark_patterns
+from parsed_page import ParsedPage
+from patterns import pattern_stats
+from structured_data import fast_path_stats
+from selector_stats import get_selector_stats
 from models import (
     ScanRequest,
+    BatchScanRequest,
     ScanResult,
     ProductData,
     Violation,
     AiNormalizedProduct,
 )
-from database import get_db, init_db, ScanRecord
-from rules import RULES
+from database import get_db, init_db, ScanRecord, SessionLocal
+from evaluation import get_evaluation_service, get_rule_reloader, risk_score
+from rules import RulePackError
+from normalizer import normalize_product
+from price_history import (
+    PriceHistory,
+    from_ts,
+    load_price_history,
+    price_range,
+    product_key,
+    record_price_point,
+    to_ts,
+)
 
 load_dotenv()
 
-# We still call ai_normalize_product, but it is now heuristic-only (no external AI)
+logger = logging.getLogger(__name__)
+
+# We still call the normalizer, but it is heuristic-only (no external AI)
 USE_AI = True
 
+# Batch scans: max pages in flight overall and per domain
+BATCH_MAX_URLS = int(os.getenv("SCAN_BATCH_MAX_URLS", "5000"))
+BATCH_CONCURRENCY = int(os.getenv("SCAN_BATCH_CONCURRENCY", "16"))
+BATCH_PER_DOMAIN_CONCURRENCY = int(os.getenv("SCAN_BATCH_PER_DOMAIN_CONCURRENCY", "4"))
+
 
 app = FastAPI(title="Compliance API")
 
@@ -40,87 +76,14 @@ app.add_middleware(
 @app.on_event("startup")
 def on_startup():
     init_db()
+    get_rule_reloader().start()
 
 
-def build_field_index(product: ProductData) -> dict:
-    """
-    Legacy helper (not used by the new AI-based engine, kept for reference).
-    """
-    tech = (product.technical_details or "").lower()
-
-    field_values: dict[str, bool] = {
-        "seller": bool(product.seller),
-        "seller_contact": False,
-        "seller_address": False,
-        "price": bool(product.price),
-        "charges": "convenience fee" in tech or "handling fee" in tech,
-        "returns": bool(product.returns),
-        "delivery": bool(product.delivery),
-        "origin": "country of origin" in tech,
-        "grievance": "grievance" in tech,
-        "description": bool(getattr(product, "description", None) or tech),
-        "reviews": "reviews" in tech or "rating" in tech,
-        "title": bool(product.title),
-        "brand": bool(product.brand) or "brand name" in tech,
-        "quantity": (
-            "net quantity" in tech
-            or "unit count" in tech
-            or " g" in tech
-            or " kg" in tech
-        ),
-        "images": True,
-        # electronics
-        "warranty": bool(product.warranty) or "warranty" in tech,
-        "specifications": bool(product.technical_details),
-        "voltage": "volt" in tech or " w" in tech,
-        "safety": "safety" in tech or "warning" in tech,
-        "energy_rating": "star" in tech or "energy" in tech,
-        "model_number": "model" in tech,
-        "compatibility": "compatible" in tech,
-        # food
-        "expiry": "expiry" in tech or "best before" in tech,
-        "ingredients": "ingredients" in tech,
-        "fssai": "fssai" in tech,
-        "allergen": "allergen" in tech,
-        "veg_nonveg": "vegetarian" in tech or "non-vegetarian" in tech,
-        "storage": "store in" in tech or "storage" in tech,
-        "manufacturer": "manufacturer" in tech,
-        "nutrition": "nutrition" in tech or "nutritional" in tech,
-        # health
-        "disclaimer": "disclaimer" in tech,
-        "dosage": "dosage" in tech or "dose" in tech,
-        "guaranteed": "guaranteed" in tech,
-        "100%": "100%" in tech,
-        "usage": "usage" in tech or "use:" in tech,
-        "warning": "warning" in tech,
-        "age_limit": "age" in tech,
-        "prescription_required": "prescription" in tech,
-    }
-
-    return field_values
-
-
-def parse_technical_details(tech: str) -> dict:
-    """
-    Parse 'Key: Value | Key2: Value2' style technical_details into a dict.
-    Very simple heuristic split.
-    """
-    result: dict[str, str] = {}
-    if not tech:
-        return result
-
-    # Your scraper joins entries with " | "
-    parts = [p.strip() for p in tech.split("|") if p.strip()]
-
-    for part in parts:
-        if ":" in part:
-            key, val = part.split(":", 1)
-            key = key.strip().lower()
-            val = val.strip()
-            if key and val:
-                result[key] = val
-
-    return result
+@app.on_event("shutdown")
+async def on_shutdown():
+    await close_async_http_client()
+    get_selector_stats().flush()
+    get_rule_reloader().stop()
 
 
 def fallback_ai(product: ProductData) -> AiNormalizedProduct:
@@ -140,92 +103,6 @@ def fallback_ai(product: ProductData) -> AiNormalizedProduct:
     )
 
 
-def ai_normalize_product(product: ProductData) -> AiNormalizedProduct:
-    """
-    Heuristic 'AI' using only scraped data:
-    - parses technical_details for known keys
-    - fills AiNormalizedProduct fields accordingly
-    """
-    tech_map = parse_technical_details(product.technical_details or "")
-
-    # Brand
-    brand = product.brand
-    if not brand:
-        brand = tech_map.get("brand") or tech_map.get("brand name")
-
-    # Origin
-    origin = product.country_of_origin
-    if not origin:
-        origin = tech_map.get("country of origin") or tech_map.get("country as labeled")
-
-    # Manufacturer
-    manufacturer = product.manufacturer
-    if not manufacturer:
-        manufacturer = tech_map.get("manufacturer")
-
-    # Model number
-    model_number = tech_map.get("item model number") or tech_map.get("model number")
-
-    # Quantity: try to detect "100 ml", "50 g", etc.
-    quantity = None
-    text_for_qty = (product.technical_details or "") + " " + (product.description or "")
-    m_qty = re.search(r"(\d+(\.\d+)?)\s*(ml|g|kg|l|L)", text_for_qty)
-    if m_qty:
-        quantity = f"{m_qty.group(1)} {m_qty.group(3)}"
-
-    # Basic category guess from title
-    title_lower = (product.title or "").lower()
-    if any(w in title_lower for w in ["laptop", "phone", "tv", "headphone", "earbud"]):
-        category = "electronics"
-    elif any(w in title_lower for w in ["biscuit", "chips", "juice", "chocolate", "snack"]):
-        category = "food"
-    elif any(w in title_lower for w in ["sunscreen", "cream", "lotion", "tablet", "capsule", "syrup"]):
-        category = "health"
-    else:
-        category = "all"
-
-    return AiNormalizedProduct(
-        category=category,
-        seller=product.seller,
-        seller_contact=None,
-        seller_address=None,
-        price=product.price.deal if product.price else None,
-        charges=None,
-        returns=product.returns,
-        delivery=product.delivery,
-        origin=origin,
-        grievance=None,
-        description=product.description,
-        reviews=None,
-        title=product.title,
-        brand=brand,
-        quantity=quantity,
-        images=True,
-        warranty=product.warranty,
-        specifications=product.technical_details,
-        voltage=None,
-        safety=None,
-        energy_rating=None,
-        model_number=model_number,
-        compatibility=None,
-        expiry=None,
-        ingredients=None,
-        fssai=None,
-        allergen=None,
-        veg_nonveg=None,
-        storage=None,
-        manufacturer=manufacturer,
-        nutrition=None,
-        disclaimer=None,
-        dosage=None,
-        guaranteed=None,
-        usage=None,
-        warning=None,
-        age_limit=None,
-        prescription_required=None,
-    )
-
-
 def merge_ai_into_product(product: ProductData, ai: AiNormalizedProduct) -> ProductData:
     """
     Combine raw scraped ProductData with AI-normalized fields to get a richer,
@@ -286,121 +163,6 @@ def merge_ai_into_product(product: ProductData, ai: AiNormalizedProduct) -> Prod
     return data
 
 
-def build_field_index_ai(product: ProductData, ai: AiNormalizedProduct) -> dict:
-    """
-    Build field index using AI-normalized product, but fall back to raw scraped data
-    where AI fields are missing.
-    """
-    tech = (product.technical_details or "").lower()
-
-    seller = ai.seller or product.seller
-    price = ai.price if ai.price is not None else (product.price.deal if product.price else None)
-    returns = ai.returns or product.returns
-    delivery = ai.delivery or product.delivery
-    origin = ai.origin
-    brand = ai.brand or product.brand
-    quantity = ai.quantity
-    images = ai.images if ai.images is not None else True
-
-    return {
-        "seller": bool(seller),
-        "seller_contact": bool(ai.seller_contact),
-        "seller_address": bool(ai.seller_address),
-        "price": price is not None,
-        "charges": bool(ai.charges),
-        "returns": bool(returns),
-        "delivery": bool(delivery),
-        "origin": bool(origin),
-        "grievance": bool(ai.grievance),
-        "description": bool(ai.description or product.title or tech),
-        "reviews": bool(ai.reviews),
-        "title": bool(ai.title or product.title),
-        "brand": bool(brand),
-        "quantity": bool(quantity),
-        "images": bool(images),
-        # electronics
-        "warranty": bool(ai.warranty or product.warranty or ("warranty" in tech)),
-        "specifications": bool(ai.specifications or product.technical_details),
-        "voltage": bool(ai.voltage),
-        "safety": bool(ai.safety),
-        "energy_rating": bool(ai.energy_rating),
-        "model_number": bool(ai.model_number),
-        "compatibility": bool(ai.compatibility),
-        # food
-        "expiry": bool(ai.expiry),
-        "ingredients": bool(ai.ingredients),
-        "fssai": bool(ai.fssai),
-        "allergen": bool(ai.allergen),
-        "veg_nonveg": bool(ai.veg_nonveg),
-        "storage": bool(ai.storage),
-        "manufacturer": bool(ai.manufacturer or ("manufacturer" in tech)),
-        "nutrition": bool(ai.nutrition),
-        # health
-        "disclaimer": bool(ai.disclaimer),
-        "dosage": bool(ai.dosage),
-        "guaranteed": bool(ai.guaranteed),
-        "100%": "100%" in (ai.guaranteed or ""),
-        "usage": bool(ai.usage),
-        "warning": bool(ai.warning),
-        "age_limit": bool(ai.age_limit),
-        "prescription_required": bool(ai.prescription_required),
-    }
-
-
-def run_compliance_check(product: ProductData, ai_product: AiNormalizedProduct) -> dict:
-    """
-    Apply RULES from rules.py to the product, using AI-normalized fields.
-    Filter rules by category from AI (electronics/food/health/all).
-    """
-    field_values = build_field_index_ai(product, ai_product)
-    violations: list[Violation] = []
-
-    category = (ai_product.category or "all").lower()
-    is_electronics = category == "electronics"
-    is_food = category == "food"
-    is_health = category == "health"
-
-    for rule in RULES:
-        rule_id = rule["id"]
-        severity = rule["severity"]
-        title_text = rule["title"]
-        required_fields = rule.get("required_fields", [])
-        rule_cat = rule.get("category", "all")
-
-        if rule_cat == "electronics" and not is_electronics:
-            continue
-        if rule_cat == "food" and not is_food:
-            continue
-        if rule_cat == "health" and not is_health:
-            continue
-
-        missing = [f for f in required_fields if not field_values.get(f, False)]
-
-        if missing:
-            description = f"{title_text} – missing or unclear: {', '.join(missing)}"
-            suggestion = f"Ensure the following field(s) are clearly disclosed: {', '.join(missing)}."
-            violations.append(
-                Violation(
-                    rule_id=rule_id,
-                    severity=severity,
-                    description=description,
-                    suggestion=suggestion,
-                )
-            )
-
-    score = 100
-    for v in violations:
-        if v.severity.upper() == "HIGH":
-            score -= 20
-        elif v.severity.upper() == "MEDIUM":
-            score -= 10
-        elif v.severity.upper() == "LOW":
-            score -= 5
-
-    score = max(0, score)
-    return {"score": score, "violations": violations}
-
-
 def compute_trust_index(product: ProductData, violations: list[Violation]) -> dict:
     score = 100
     reasons: list[str] = []
@@ -437,31 +199,41 @@ def compute_trust_index(product: ProductData, violations: list[Violation]) -> di
     return {"score": score, "reasons": reasons}
 
 
-@app.post("/scan", response_model=ScanResult)
-def scan_endpoint(request: ScanRequest, db: Session = Depends(get_db)):
-    url = request.url
-
-    # 1. Scrape real product data
-    html = _fetch_html(url)
-    product = scrape_product(url)
+def run_scan_pipeline(
+    url: str, page: FetchedPage | None = None, use_cache: bool = True,
+    price_history: PriceHistory | None = None,
+) -> ScanResult:
+    """
+    Full scan for one URL. The page is fetched once and the same response
+    is handed to every stage (scraper, dark-pattern detector). Without a
+    price_history (load_price_history()) the MRP-inflation check is skipped.
+    """
+    # 1. Fetch once, scrape real product data
+    if page is None:
+        page = fetch_page(url, use_cache=use_cache)
+    # Parse once; scraper and dark-pattern detector share the DOM and text
+    parsed = ParsedPage(page.text, page.final_url)
+    # Dark-pattern DOM checks ride along the walk the scraper triggers
+    dark_visitor = attach_detectors(parsed)
+    product = scrape_product_from_page(url, parsed, final_url=page.final_url)
 
     # 1.5 Heuristic-normalized product
     if USE_AI:
-        ai_product = ai_normalize_product(product)
+        ai_product = normalize_product(product)
     else:
         ai_product = fallback_ai(product)
 
-    print("AI PRODUCT:", ai_product.dict())
+    logger.debug("AI PRODUCT: %s", ai_product.model_dump())
 
     # 1.6 Merge into product for rich view
     normalized_product = merge_ai_into_product(product, ai_product)
 
     # 2. Rule-based compliance
-    compliance_result = run_compliance_check(product, ai_product)
-    base_violations = compliance_result["violations"]
+    evaluation = get_evaluation_service().check(product, ai_product)
+    base_violations = list(evaluation.violations)
 
     # 3. Dark patterns
-    dark_findings = detect_dark_patterns(product, html)
+    dark_findings = detect_dark_patterns(product, parsed, dark_visitor, price_history)
     dark_violations: list[Violation] = [
         Violation(
             rule_id=f.code,
@@ -475,40 +247,54 @@ def scan_endpoint(request: ScanRequest, db: Session = Depends(get_db)):
     all_violations = base_violations + dark_violations
 
     # 4. Risk score
-    risk = 100
-    for v in all_violations:
-        if v.severity.upper() == "HIGH":
-            risk -= 20
-        elif v.severity.upper() == "MEDIUM":
-            risk -= 10
-        elif v.severity.upper() == "LOW":
-            risk -= 5
-    risk = max(0, risk)
+    risk = risk_score(all_violations)
 
     # 5. Trust index
     trust_index = compute_trust_index(product, all_violations)
 
     # 6. Build result
-    result = ScanResult(
+    return ScanResult(
+        canonical_url=page.canonical_url,
         timestamp=datetime.utcnow(),
         product=normalized_product,
         risk_score=risk,
         violations=all_violations,
         trust_index=trust_index,
         ai_product=ai_product,
+        rule_version=evaluation.ruleset_version,
+    )
+
+
+async def run_scan_pipeline_async(url: str, use_cache: bool = True) -> ScanResult:
+    """
+    Async scan: non-blocking fetch, then the CPU-bound parse/evaluate
+    stages on the parse executor so the event loop stays free.
+    """
+    page = await fetch_page_async(url, use_cache=use_cache)
+    # Database read on the threadpool, so the parse executor only parses
+    history = await run_in_threadpool(load_price_history, page.canonical_url)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        parse_executor, run_scan_pipeline, url, page, use_cache, history
     )
 
-    # 7. Save to DB
-    product_dict = normalized_product.model_dump()
+
+def save_scan(db: Session, url: str, result: ScanResult) -> ScanResult:
+    product_dict = result.product.model_dump()
     product_dict.pop("timestamp", None)
 
+    canonical_url = result.canonical_url or resolve_cached(url)
     db_record = ScanRecord(
         url=url,
+        canonical_url=canonical_url,
         risk_score=result.risk_score,
+        rule_version=result.rule_version,
         product_data=product_dict,
         violations_data=[v.model_dump() for v in result.violations],
     )
     db.add(db_record)
+    # Same transaction as the scan, so the series never disagrees with scans
+    record_price_point(db, product_key(canonical_url), result.product.price, result.timestamp)
     db.commit()
     db.refresh(db_record)
     result.id = db_record.id
@@ -516,6 +302,180 @@ def scan_endpoint(request: ScanRequest, db: Session = Depends(get_db)):
     return result
 
 
+@app.post("/scan", response_model=ScanResult)
+async def scan_endpoint(request: ScanRequest, db: Session = Depends(get_db)):
+    url = request.url
+
+    result = await run_scan_pipeline_async(url, use_cache=not request.refresh)
+
+    # 7. Save to DB (sync SQLAlchemy session, keep it off the event loop)
+    return await run_in_threadpool(save_scan, db, url, result)
+
+
+def _save_scan_new_session(url: str, result: ScanResult) -> ScanResult:
+    # Batch items finish concurrently, so each gets its own session
+    db = SessionLocal()
+    try:
+        return save_scan(db, url, result)
+    finally:
+        db.close()
+
+
+async def _stream_batch(urls: list[str], use_cache: bool):
+    """
+    Scan every distinct product once (inputs are grouped by canonical URL)
+    and yield one NDJSON line per product as soon as it finishes. A fixed
+    pool of BATCH_CONCURRENCY workers takes groups from a bounded queue, so
+    a 5000-URL batch never has more than a handful of scans in flight.
+    """
+    # canonicalize_url is pure string work; short links are resolved by
+    # the worker that scans them, not serially up front
+    groups: dict[str, list[str]] = {}
+    for url in urls:
+        groups.setdefault(canonicalize_url(url), []).append(url)
+
+    pending: asyncio.Queue = asyncio.Queue(maxsize=BATCH_CONCURRENCY)
+    done: asyncio.Queue = asyncio.Queue(maxsize=BATCH_CONCURRENCY)
+    domain_slots: dict[str, asyncio.Semaphore] = {}
+    # Two short links can resolve to the same product: the second one
+    # waits for the first scan instead of repeating it
+    scans: dict[str, asyncio.Future] = {}
+
+    async def scan_one(key: str, inputs: list[str]) -> dict:
+        canonical = await run_in_threadpool(resolve_cached, key)
+        if canonical in scans:
+            item = await asyncio.shield(scans[canonical])
+            return {**item, "urls": inputs}
+        scans[canonical] = asyncio.get_running_loop().create_future()
+
+        domain = bucket_for(canonical)[0]
+        if domain not in domain_slots:
+            domain_slots[domain] = asyncio.Semaphore(BATCH_PER_DOMAIN_CONCURRENCY)
+        async with domain_slots[domain]:
+            try:
+                result = await run_scan_pipeline_async(inputs[0], use_cache=use_cache)
+                result = await run_in_threadpool(_save_scan_new_session, inputs[0], result)
+                item = {
+                    "urls": inputs,
+                    "canonical_url": canonical,
+                    "result": result.model_dump(mode="json"),
+                }
+            except Exception as e:
+                item = {"urls": inputs, "canonical_url": canonical, "error": str(e)}
+        scans[canonical].set_result(item)
+        return item
+
+    async def feed():
+        for group in groups.items():
+            await pending.put(group)
+
+    async def work():
+        while True:
+            key, inputs = await pending.get()
+            try:
+                item = await scan_one(key, inputs)
+            except Exception as e:
+                item = {"urls": inputs, "canonical_url": key, "error": str(e)}
+            await done.put(item)
+
+    workers = [asyncio.create_task(feed())]
+    workers += [asyncio.create_task(work()) for _ in range(min(BATCH_CONCURRENCY, len(groups)))]
+    try:
+        for _ in range(len(groups)):
+            item = await done.get()
+            yield json.dumps(item) + "\n"
+    finally:
+        # Finished, or the client went away: stop the feeder and workers
+        for task in workers:
+            task.cancel()
+
+
+@app.post("/scan/batch")
+async def scan_batch_endpoint(request: BatchScanRequest):
+    if len(request.urls) > BATCH_MAX_URLS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {BATCH_MAX_URLS} URLs per batch.",
+        )
+    return StreamingResponse(
+        _stream_batch(request.urls, use_cache=not request.refresh),
+        media_type="application/x-ndjson",
+    )
+
+
 @app.get("/history")
-def get_history(db: Session = Depends(get_db)):
-    return db.query(ScanRecord).order_by(ScanRecord.timestamp.desc()).all()
+def get_history(url: str | None = None, db: Session = Depends(get_db)):
+    query = db.query(ScanRecord)
+    if url:
+        # Any variant of the product URL (tracking params, short link) matches
+        query = query.filter(ScanRecord.canonical_url == resolve_cached(url))
+    return query.order_by(ScanRecord.timestamp.desc()).all()
+
+
+@app.get("/price-history")
+def get_price_history(url: str, since: datetime | None = None, until: datetime | None = None,
+                      db: Session = Depends(get_db)):
+    canonical_url = resolve_cached(url)
+    end = to_ts(until) if until else to_ts(datetime.utcnow())
+    start = to_ts(since) if since else 0
+    points = price_range(db, product_key(canonical_url), start, end)
+    return {
+        "canonical_url": canonical_url,
+        "points": [{"timestamp": from_ts(ts), "mrp": mrp, "deal": deal} for ts, mrp, deal in points],
+    }
+
+
+@app.get("/rules")
+def get_rules_status():
+    """Active ruleset version and the packs it was built from."""
+    return get_rule_reloader().status()
+
+
+@app.post("/rules/reload")
+def reload_rules():
+    try:
+        get_rule_reloader().reload(force=True)
+    except RulePackError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return get_rule_reloader().status()
+
+
+@app.get("/stats/http-pool")
+def get_http_pool_stats():
+    return pool_stats()
+
+
+@app.get("/stats/rate-limit")
+def get_rate_limit_stats():
+    return get_rate_limiter().stats()
+
+
+@app.get("/stats/page-cache")
+def get_page_cache_stats():
+    return get_page_cache().stats()
+
+
+@app.get("/stats/short-links")
+def get_short_link_stats():
+    return get_short_link_cache().stats()
+
+
+@app.get("/stats/patterns")
+def get_pattern_stats():
+    return pattern_stats()
+
+
+@app.get("/stats/fast-path")
+def get_fast_path_stats():
+    return fast_path_stats.snapshot()
+
+
+@app.get("/stats/evaluation")
+def get_evaluation_stats():
+    return get_evaluation_service().stats()
+
+
+@app.get("/stats/selectors")
+def get_selector_dashboard():
+    """Fallback selectors per domain in their current try order; stale ones flagged."""
+    return get_selector_stats().dashboard()
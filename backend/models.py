@@ -121,17 +121,25 @@ class AiNormalizedProduct(BaseModel):
 
 class ScanResult(BaseModel):
     id: int | None = None
+    canonical_url: str | None = None
     timestamp: datetime
     product: ProductData
     risk_score: int
     violations: List[Violation]
     trust_index: TrustIndex
     ai_product: AiNormalizedProduct | None = None
+    rule_version: str | None = None  # ruleset the violations were evaluated against
 
 
 # API Request Model
 class ScanRequest(BaseModel):
     url: str
+    refresh: bool = False  # bypass the page cache and refetch
+
+
+class BatchScanRequest(BaseModel):
+    urls: List[str]
+    refresh: bool = False
 
 
 if __name__ == "__main__":
@@ -0,0 +1,339 @@
+import re
+import time
+
+from keyword_automaton import KeywordAutomaton
+from models import AiNormalizedProduct, ProductData
+from patterns import FIELD_NUMBERS, FIELD_PATTERNS
+
+
+# ---------- CATEGORY ----------
+
+# Title keywords for the heuristic category guess, first match in this order wins
+TITLE_CATEGORIES = KeywordAutomaton({
+    "electronics": ["laptop", "phone", "tv", "headphone", "earbud"],
+    "food": ["biscuit", "chips", "juice", "chocolate", "snack"],
+    "health": ["sunscreen", "cream", "lotion", "tablet", "capsule", "syrup"],
+})
+TITLE_CATEGORY_PRIORITY = ("electronics", "food", "health")
+
+
+# ---------- FIELD TABLE ----------
+# AiNormalizedProduct field -> (ProductData attribute used first, technical
+# details keys that carry it, best first). A field still empty after both
+# is looked for in the product text (FIELD_KEYWORDS below).
+
+FIELD_SOURCES: dict[str, tuple[str | None, tuple[str, ...]]] = {
+    "seller": ("seller", ()),
+    "seller_contact": ("seller_contact", ("customer care", "customer care number", "consumer care", "contact details")),
+    "seller_address": ("seller_address", ("seller address",)),
+    "returns": ("returns", ()),
+    "delivery": ("delivery", ()),
+    "origin": ("country_of_origin", ("country of origin", "country as labeled", "country of manufacture")),
+    "grievance": ("grievance_officer_details", ("grievance officer", "grievance redressal")),
+    "description": ("description", ()),
+    "title": ("title", ()),
+    "brand": ("brand", ("brand", "brand name")),
+    # electronics
+    "warranty": ("warranty", ("warranty", "warranty description", "warranty details")),
+    "specifications": ("technical_details", ()),
+    "voltage": (None, ("voltage", "input voltage", "rated voltage", "operating voltage")),
+    "safety": (None, ("safety certification", "certification", "bis registration number", "isi mark")),
+    "energy_rating": (None, ("energy rating", "energy efficiency", "bee rating", "star rating")),
+    "model_number": (None, ("item model number", "model number", "model name")),
+    "compatibility": (None, ("compatible devices", "compatible phone models", "compatibility")),
+    # food
+    "expiry": ("expiry_date", ("expiry date", "best before", "use by", "shelf life")),
+    "ingredients": ("ingredients", ("ingredients", "key ingredients")),
+    "fssai": (None, ("fssai", "fssai license number", "fssai licence number", "fssai license no")),
+    "allergen": (None, ("allergen information", "allergens", "allergen")),
+    "veg_nonveg": (None, ("diet type", "dietary preference", "veg/non-veg", "vegetarian")),
+    "storage": (None, ("storage instructions", "storage", "how to store")),
+    "manufacturer": ("manufacturer", ("manufacturer", "manufacturer name", "manufactured by")),
+    "nutrition": ("nutrition_info", ("nutrition information", "nutritional information", "nutrition facts")),
+    # health
+    "disclaimer": (None, ("disclaimer", "legal disclaimer")),
+    "dosage": (None, ("dosage", "recommended dosage")),
+    "guaranteed": (None, ("guarantee", "guaranteed")),
+    "usage": ("usage_instructions", ("directions for use", "how to use", "usage", "directions", "instructions")),
+    "warning": ("warnings", ("safety warning", "warning", "warnings", "caution")),
+    "age_limit": (None, ("age range", "manufacturer recommended age", "recommended age", "minimum age")),
+    "prescription_required": (None, ("prescription required", "prescription")),
+}
+
+
+def _compile_aliases(sources: dict) -> dict[str, tuple[str, int]]:
+    """Lowercase key alias -> (field, rank); lower rank wins when a product has several."""
+    aliases: dict[str, tuple[str, int]] = {}
+    for field, (_, keys) in sources.items():
+        for rank, key in enumerate(keys):
+            if key in aliases:
+                raise ValueError(f"Key alias {key!r} maps to both {aliases[key][0]} and {field}")
+            aliases[key] = (field, rank)
+    return aliases
+
+
+KEY_ALIASES = _compile_aliases(FIELD_SOURCES)
+_PRODUCT_ATTRS = [(field, attr) for field, (attr, _) in FIELD_SOURCES.items() if attr]
+
+# Amazon pads technical-details keys with direction marks ("Brand \u200f : \u200e")
+_KEY_JUNK = str.maketrans("", "", "\u200e\u200f\u200b\ufeff")
+
+
+def normalize_key(key: str) -> str:
+    return " ".join(key.translate(_KEY_JUNK).lower().split())
+
+
+# Where each FIELD_PATTERNS pattern (patterns.py) can start, lowercase.
+# One automaton pass over the text finds them all; the pattern is then
+# matched in place at each hit. Number-led fields use FIELD_NUMBERS.
+FIELD_KEYWORDS = {
+    "fssai": ["fssai"],
+    "energy_rating": ["bee "],
+    "safety": ["bis ", "isi ", "ce certified", "r-"],
+    "compatibility": ["compatible with"],
+    "expiry": ["best before", "use by", "expiry", "expires on", "shelf life"],
+    "ingredients": ["ingredient"],
+    "allergen": ["allergen", "contain"],
+    "veg_nonveg": ["non-veg", "non veg", "nonveg", "pure veg", "vegetarian", "vegan", "eggless"],
+    "storage": ["store in a", "keep refrigerated", "storage"],
+    "nutrition": ["nutrition", "energy"],
+    "dosage": ["dosage", "recommended dose"],
+    "usage": ["directions for use", "directions of use", "how to use", "usage instruction"],
+    "warning": ["warning", "caution"],
+    "disclaimer": ["disclaimer"],
+    "age_limit": ["age ", "ages ", "not suitable", "not recommended", "not for children"],
+    "prescription_required": ["prescription", "rx only", "schedule h", "require"],
+    "seller_contact": ["customer care", "helpline", "contact"],
+    "grievance": ["grievance officer"],
+}
+FIELD_AUTOMATON = KeywordAutomaton(FIELD_KEYWORDS)
+_NUMBER_FIELDS = frozenset(FIELD_NUMBERS.regex.groupindex) - {"q_amount", "q_unit"}
+_TEXT_FIELDS = frozenset(FIELD_KEYWORDS) | _NUMBER_FIELDS | {"quantity"}
+
+
+# ---------- NORMALIZER ----------
+
+def _fill_from_text(values: dict, text: str):
+    """Empty text fields from the product text (first occurrence wins)."""
+    lower = text.lower()
+    # Spans index the original text too unless lowercasing changed its length
+    source = text if len(lower) == len(text) else lower
+    for start, _, field in FIELD_AUTOMATON.search(lower).hits:
+        if field in values:
+            continue
+        m = FIELD_PATTERNS[field].match(lower, start)
+        if m:
+            values[field] = source[m.start(1):m.end(1)].strip()
+
+    if not (_NUMBER_FIELDS.issubset(values) and "quantity" in values):
+        for m in FIELD_NUMBERS.finditer(text):
+            if m.group("q_unit"):
+                # Same first match as QUANTITY over the text
+                if "quantity" not in values:
+                    values["quantity"] = f"{m.group('q_amount')} {m.group('q_unit')}"
+                continue
+            field = m.lastgroup
+            if field not in values:
+                values[field] = m.group(0).strip()
+
+
+def normalize_product(product: ProductData) -> AiNormalizedProduct:
+    """
+    Heuristic 'AI' using only scraped data. Each field comes from, in order:
+    the scraped attribute, a technical_details key (via KEY_ALIASES, one
+    pass over the 'Key: Value | ...' entries), then the product text
+    (technical details + description + title), read only if a field that
+    text can supply is still empty.
+    """
+    scraped = product.__dict__
+    values: dict[str, str] = {field: scraped[attr] for field, attr in _PRODUCT_ATTRS if scraped[attr]}
+
+    tech = product.technical_details or ""
+    ranks: dict[str, int] = {}
+    for part in tech.split("|"):
+        key, sep, value = part.partition(":")
+        if not sep:
+            continue
+        alias = KEY_ALIASES.get(normalize_key(key))
+        if alias is None:
+            continue
+        field, rank = alias
+        value = value.translate(_KEY_JUNK).strip()
+        if not value or (field in values and field not in ranks):
+            continue  # empty, or the scraped attribute already has it
+        if field not in ranks or rank < ranks[field]:
+            values[field] = value
+            ranks[field] = rank
+
+    if not _TEXT_FIELDS.issubset(values):
+        text = "\n".join((tech, product.description or "", product.title or ""))
+        _fill_from_text(values, text)
+    if "quantity" not in values and product.net_quantity:
+        values["quantity"] = f"{product.net_quantity} {product.unit or ''}".strip()
+
+    return AiNormalizedProduct(
+        category=TITLE_CATEGORIES.search((product.title or "").lower()).first(TITLE_CATEGORY_PRIORITY),
+        price=product.price.deal if product.price else None,
+        charges=", ".join(product.extra_charges) if product.extra_charges else None,
+        images=True,
+        **values,
+    )
+
+
+# ---------- BENCHMARK ----------
+
+# Benchmark baseline: main.parse_technical_details and main.ai_normalize_product
+# as they were before the field table, verbatim (renamed only). Keep them
+# that way, or the benchmark stops measuring against the original.
+
+def _legacy_parse_technical_details(tech: str) -> dict:
+    """
+    Parse 'Key: Value | Key2: Value2' style technical_details into a dict.
+    Very simple heuristic split.
+    """
+    result: dict[str, str] = {}
+    if not tech:
+        return result
+
+    # Your scraper joins entries with " | "
+    parts = [p.strip() for p in tech.split("|") if p.strip()]
+
+    for part in parts:
+        if ":" in part:
+            key, val = part.split(":", 1)
+            key = key.strip().lower()
+            val = val.strip()
+            if key and val:
+                result[key] = val
+
+    return result
+
+
+def _legacy_normalize(product: ProductData) -> AiNormalizedProduct:
+    """
+    Heuristic 'AI' using only scraped data:
+    - parses technical_details for known keys
+    - fills AiNormalizedProduct fields accordingly
+    """
+    tech_map = _legacy_parse_technical_details(product.technical_details or "")
+
+    # Brand
+    brand = product.brand
+    if not brand:
+        brand = tech_map.get("brand") or tech_map.get("brand name")
+
+    # Origin
+    origin = product.country_of_origin
+    if not origin:
+        origin = tech_map.get("country of origin") or tech_map.get("country as labeled")
+
+    # Manufacturer
+    manufacturer = product.manufacturer
+    if not manufacturer:
+        manufacturer = tech_map.get("manufacturer")
+
+    # Model number
+    model_number = tech_map.get("item model number") or tech_map.get("model number")
+
+    # Quantity: try to detect "100 ml", "50 g", etc.
+    quantity = None
+    text_for_qty = (product.technical_details or "") + " " + (product.description or "")
+    m_qty = re.search(r"(\d+(\.\d+)?)\s*(ml|g|kg|l|L)", text_for_qty)
+    if m_qty:
+        quantity = f"{m_qty.group(1)} {m_qty.group(3)}"
+
+    # Basic category guess from title
+    title_lower = (product.title or "").lower()
+    if any(w in title_lower for w in ["laptop", "phone", "tv", "headphone", "earbud"]):
+        category = "electronics"
+    elif any(w in title_lower for w in ["biscuit", "chips", "juice", "chocolate", "snack"]):
+        category = "food"
+    elif any(w in title_lower for w in ["sunscreen", "cream", "lotion", "tablet", "capsule", "syrup"]):
+        category = "health"
+    else:
+        category = "all"
+
+    return AiNormalizedProduct(
+        category=category,
+        seller=product.seller,
+        seller_contact=None,
+        seller_address=None,
+        price=product.price.deal if product.price else None,
+        charges=None,
+        returns=product.returns,
+        delivery=product.delivery,
+        origin=origin,
+        grievance=None,
+        description=product.description,
+        reviews=None,
+        title=product.title,
+        brand=brand,
+        quantity=quantity,
+        images=True,
+        warranty=product.warranty,
+        specifications=product.technical_details,
+        voltage=None,
+        safety=None,
+        energy_rating=None,
+        model_number=model_number,
+        compatibility=None,
+        expiry=None,
+        ingredients=None,
+        fssai=None,
+        allergen=None,
+        veg_nonveg=None,
+        storage=None,
+        manufacturer=manufacturer,
+        nutrition=None,
+        disclaimer=None,
+        dosage=None,
+        guaranteed=None,
+        usage=None,
+        warning=None,
+        age_limit=None,
+        prescription_required=None,
+    )
+
+
+def benchmark(products: list[ProductData], rounds: int = 5) -> dict:
+    """Products/second and fields filled, legacy vs table-driven, on the same products."""
+    result = {"products": len(products)}
+    for name, fn in (("legacy", _legacy_normalize), ("table", normalize_product)):
+        started = time.perf_counter()
+        for _ in range(rounds):
+            normalized = [fn(p) for p in products]
+        elapsed = time.perf_counter() - started
+        filled = sum(
+            sum(1 for v in n.model_dump().values() if v not in (None, "")) for n in normalized
+        )
+        result[name] = {
+            "products_per_second": round(len(products) * rounds / elapsed),
+            "fields_filled_per_product": round(filled / max(1, len(products)), 2),
+        }
+    return result
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    from sqlalchemy import text
+
+    from database import engine
+
+    parser = argparse.ArgumentParser(description="Benchmark normalize_product on stored scans.")
+    parser.add_argument("--limit", type=int, default=2000)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    with engine.connect() as conn:
+        rows = conn.execute(
+            text("SELECT product_data FROM scans ORDER BY id DESC LIMIT :n"), {"n": args.limit}
+        ).all()
+    sample = []
+    for (data,) in rows:
+        try:
+            sample.append(ProductData.model_validate(json.loads(data) if isinstance(data, str) else data))
+        except Exception:
+            continue
+    print(json.dumps(benchmark(sample, args.rounds), indent=2))
@@ -0,0 +1,242 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+
+# ---------- CONFIG ----------
+
+PAGE_CACHE_DB = os.getenv(
+    "SCRAPER_PAGE_CACHE_DB",
+    os.path.join(os.getenv("SCRAPER_CACHE_DIR", ".cache"), "pages.db"),
+)
+# Pages younger than this are served without any network request;
+# older ones are revalidated with If-None-Match / If-Modified-Since.
+PAGE_CACHE_TTL = float(os.getenv("SCRAPER_PAGE_CACHE_TTL", str(6 * 3600)))
+# Upper bound on stored (compressed) bytes; least recently used pages go first
+PAGE_CACHE_MAX_BYTES = int(os.getenv("SCRAPER_PAGE_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+COMPRESS_LEVEL = 6
+
+_META_TRIGGERS = (
+    "CREATE TRIGGER IF NOT EXISTS pages_size_insert AFTER INSERT ON pages BEGIN"
+    " UPDATE pages_meta SET total_bytes = total_bytes + new.size WHERE id = 1; END",
+    "CREATE TRIGGER IF NOT EXISTS pages_size_delete AFTER DELETE ON pages BEGIN"
+    " UPDATE pages_meta SET total_bytes = total_bytes - old.size WHERE id = 1; END",
+    "CREATE TRIGGER IF NOT EXISTS pages_size_update AFTER UPDATE OF size ON pages BEGIN"
+    " UPDATE pages_meta SET total_bytes = total_bytes + new.size - old.size WHERE id = 1; END",
+)
+
+
+class CacheEntry:
+    def __init__(self, key: str, url: str, final_url: str, status_code: int,
+                 headers: dict, content: bytes, encoding: str | None,
+                 fetched_at: float, fresh: bool = True):
+        self.key = key
+        self.url = url
+        self.final_url = final_url
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.encoding = encoding
+        self.fetched_at = fetched_at
+        # Young enough to serve without revalidating
+        self.fresh = fresh
+
+    def validators(self) -> dict:
+        """Conditional request headers for revalidating this entry."""
+        headers = {}
+        lowered = {k.lower(): v for k, v in self.headers.items()}
+        if lowered.get("etag"):
+            headers["If-None-Match"] = lowered["etag"]
+        if lowered.get("last-modified"):
+            headers["If-Modified-Since"] = lowered["last-modified"]
+        return headers
+
+
+class PageCache:
+    """
+    On-disk cache of fetched product pages (zlib-compressed bodies in
+    SQLite), with TTL freshness, ETag/Last-Modified revalidation and
+    size-bounded LRU eviction. Safe across threads and processes.
+    Keys are canonical product URLs (canonical.canonicalize_url).
+    """
+
+    def __init__(self, path: str = PAGE_CACHE_DB, ttl: float = PAGE_CACHE_TTL,
+                 max_bytes: int = PAGE_CACHE_MAX_BYTES):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._counters = {
+            "hits": 0,
+            "misses": 0,
+            "stale": 0,
+            "revalidated": 0,
+            "bypassed": 0,
+            "stores": 0,
+            "evictions": 0,
+        }
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = self._conn()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS pages ("
+            " key TEXT PRIMARY KEY,"
+            " url TEXT, final_url TEXT, status_code INTEGER,"
+            " headers TEXT, body BLOB, encoding TEXT,"
+            " fetched_at REAL, accessed_at REAL, size INTEGER)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS ix_pages_accessed ON pages (accessed_at)")
+        # Running total of stored bytes, kept by triggers so every process
+        # sharing the file sees the same number without a SUM() per store
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS pages_meta (id INTEGER PRIMARY KEY CHECK (id = 1), total_bytes INTEGER)"
+            )
+            conn.execute(
+                "INSERT OR IGNORE INTO pages_meta (id, total_bytes)"
+                " SELECT 1, COALESCE(SUM(size), 0) FROM pages"
+            )
+            for ddl in _META_TRIGGERS:
+                conn.execute(ddl)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _count(self, name: str, n: int = 1):
+        with self._lock:
+            self._counters[name] += n
+
+    def record_bypass(self):
+        self._count("bypassed")
+
+    def get(self, key: str) -> CacheEntry | None:
+        conn = self._conn()
+        row = conn.execute(
+            "SELECT url, final_url, status_code, headers, body, encoding, fetched_at"
+            " FROM pages WHERE key = ?",
+            (key,),
+        ).fetchone()
+        if row is None:
+            self._count("misses")
+            return None
+
+        conn.execute("UPDATE pages SET accessed_at = ? WHERE key = ?", (time.time(), key))
+        url, final_url, status_code, headers, body, encoding, fetched_at = row
+        fresh = time.time() - fetched_at < self.ttl
+        entry = CacheEntry(
+            key=key,
+            url=url,
+            final_url=final_url,
+            status_code=status_code,
+            headers=json.loads(headers or "{}"),
+            content=zlib.decompress(body),
+            encoding=encoding,
+            fetched_at=fetched_at,
+            fresh=fresh,
+        )
+        self._count("hits" if fresh else "stale")
+        return entry
+
+    def put(self, key: str, url: str, final_url: str, status_code: int,
+            headers: dict, content: bytes, encoding: str | None):
+        body = zlib.compress(content, COMPRESS_LEVEL)
+        now = time.time()
+        # An upsert, not INSERT OR REPLACE: REPLACE's implicit delete does
+        # not fire the size triggers
+        self._conn().execute(
+            "INSERT INTO pages"
+            " (key, url, final_url, status_code, headers, body, encoding,"
+            "  fetched_at, accessed_at, size)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+            " ON CONFLICT (key) DO UPDATE SET"
+            "  url = excluded.url, final_url = excluded.final_url,"
+            "  status_code = excluded.status_code, headers = excluded.headers,"
+            "  body = excluded.body, encoding = excluded.encoding,"
+            "  fetched_at = excluded.fetched_at, accessed_at = excluded.accessed_at,"
+            "  size = excluded.size",
+            (key, url, final_url, status_code, json.dumps(headers), body,
+             encoding, now, now, len(body)),
+        )
+        self._count("stores")
+        self._evict()
+
+    def mark_revalidated(self, key: str, headers: dict):
+        """A 304 came back: the stored body is current again."""
+        conn = self._conn()
+        row = conn.execute("SELECT headers FROM pages WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return
+        stored = json.loads(row[0] or "{}")
+        # Servers may send fresh validators with the 304
+        for name, value in headers.items():
+            if name.lower() in ("etag", "last-modified", "cache-control", "expires"):
+                stored[name] = value
+        now = time.time()
+        conn.execute(
+            "UPDATE pages SET headers = ?, fetched_at = ?, accessed_at = ? WHERE key = ?",
+            (json.dumps(stored), now, now, key),
+        )
+        self._count("revalidated")
+
+    def _total_bytes(self) -> int:
+        return self._conn().execute("SELECT total_bytes FROM pages_meta WHERE id = 1").fetchone()[0]
+
+    def _evict(self):
+        total = self._total_bytes()
+        if total <= self.max_bytes:
+            return
+
+        # Trim to 90% so we don't evict on every single store: drop the
+        # least recently used pages whose running size total (oldest
+        # first) is still short of the excess, in one statement
+        excess = total - int(self.max_bytes * 0.9)
+        cursor = self._conn().execute(
+            "DELETE FROM pages WHERE key IN ("
+            " SELECT key FROM ("
+            "  SELECT key, size, SUM(size) OVER (ORDER BY accessed_at, key) AS running FROM pages"
+            " ) WHERE running - size < ?)",
+            (excess,),
+        )
+        self._count("evictions", cursor.rowcount)
+
+    def stats(self) -> dict:
+        with self._lock:
+            counters = dict(self._counters)
+        lookups = counters["hits"] + counters["misses"] + counters["stale"]
+        counters["hit_rate"] = (
+            round((counters["hits"] + counters["revalidated"]) / lookups, 3) if lookups else 0.0
+        )
+        counters["entries"] = self._conn().execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+        counters["stored_bytes"] = self._total_bytes()
+        counters["max_bytes"] = self.max_bytes
+        return counters
+
+
+_cache: PageCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_page_cache() -> PageCache:
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = PageCache()
+    return _cache
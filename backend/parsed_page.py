@@ -0,0 +1,100 @@
+from dom import parse_document
+from text_index import TextIndex
+from structured_data import StructuredData, extract_structured_data
+
+
+class ParsedPage:
+    """
+    A product page parsed once per scan.
+    The DOM, the full visible text and its lowercased form are built on
+    first use and then shared by the scraper and the dark-pattern detector.
+    """
+
+    def __init__(self, html: str, url: str | None = None, backend: str | None = None):
+        self.html = html
+        self.url = url
+        self.backend = backend
+        self._doc = None
+        self._index = None
+        self._structured = None
+        self._prefixes: dict[int, str] = {}
+        self._visitors: list = []
+        self._text = None
+        self._text_lower = None
+
+    @classmethod
+    def ensure(cls, page_or_html) -> "ParsedPage":
+        """Accept either a ParsedPage or raw HTML (older call sites)."""
+        if isinstance(page_or_html, ParsedPage):
+            return page_or_html
+        return cls(page_or_html or "")
+
+    @property
+    def doc(self):
+        """DOM of the page (dom.LxmlDocument or dom.SoupDocument, per SCRAPER_DOM_BACKEND)."""
+        if self._doc is None:
+            self._doc = parse_document(self.html, self.backend)
+        return self._doc
+
+    @property
+    def dom_built(self) -> bool:
+        return self._doc is not None
+
+    @property
+    def structured(self) -> StructuredData:
+        """JSON-LD / meta tags read from the raw HTML, without building the DOM."""
+        if self._structured is None:
+            self._structured = extract_structured_data(self.html)
+        return self._structured
+
+    @property
+    def text_index(self) -> TextIndex:
+        """Text runs and their elements, from a single walk over the DOM."""
+        if self._index is None:
+            index = TextIndex()
+            self.doc.walk([index, *self._visitors])
+            self._visitors = []
+            self._index = index
+        return self._index
+
+    def attach(self, visitor):
+        """
+        Run a dom walk visitor in the page's one DOM walk (the one that
+        builds text_index). Attached after that walk has run, the visitor
+        gets a walk of its own, so attach before scraping.
+        """
+        if self._index is None:
+            self._visitors.append(visitor)
+        else:
+            self.doc.walk([visitor])
+        return visitor
+
+    @property
+    def text(self) -> str:
+        """Whole-page text, same as BeautifulSoup's get_text(separator=" ", strip=True)."""
+        if self._text is None:
+            self._text = self.text_index.page_text(" ")
+        return self._text
+
+    def text_prefix(self, limit: int) -> str:
+        """
+        The first `limit` characters of the visible text (script, style and
+        hidden nodes skipped). Stops walking the DOM once it has enough.
+        """
+        cached = self._prefixes.get(limit)
+        if cached is None:
+            parts, size = [], 0
+            for text in self.doc.visible_strings():
+                parts.append(text)
+                size += len(text) + 1
+                if size >= limit:
+                    break
+            cached = " ".join(parts)[:limit]
+            self._prefixes[limit] = cached
+        return cached
+
+    @property
+    def text_lower(self) -> str:
+        if self._text_lower is None:
+            self._text_lower = self.text.lower()
+        return self._text_lower
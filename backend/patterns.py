@@ -0,0 +1,323 @@
+import os
+import re
+import threading
+
+from dom import compile_css
+
+# Use/hit counting costs a lock per regex call (including hot loops), so
+# it is off unless asked for, e.g. while deciding which patterns to prune
+PATTERN_STATS = os.getenv("SCRAPER_PATTERN_STATS", "0") == "1"
+
+
+class Pattern:
+    """
+    A regex compiled once at import, counting how often it is tried and
+    how often it matches (with SCRAPER_PATTERN_STATS=1). Accepted anywhere
+    an re.Pattern is (DOM finders, BeautifulSoup string=/attrs= filters,
+    TextIndex.find_first).
+    """
+
+    def __init__(self, name: str, regex: str, flags: int = 0):
+        self.name = name
+        self.regex = re.compile(regex, flags)
+        self.uses = 0
+        self.hits = 0
+        self._lock = threading.Lock()
+        if not PATTERN_STATS:
+            # Uncounted: calls go straight to the compiled regex
+            self.search = self.regex.search
+            self.match = self.regex.match
+            self.findall = self.regex.findall
+
+    @property
+    def pattern(self) -> str:
+        return self.regex.pattern
+
+    def _record(self, found: bool):
+        with self._lock:
+            self.uses += 1
+            if found:
+                self.hits += 1
+
+    def search(self, text: str, *args):
+        m = self.regex.search(text, *args)
+        self._record(m is not None)
+        return m
+
+    def match(self, text: str, *args):
+        """Anchored at pos (re.Pattern.match), for checking a keyword hit in place."""
+        m = self.regex.match(text, *args)
+        self._record(m is not None)
+        return m
+
+    def findall(self, text: str) -> list:
+        found = self.regex.findall(text)
+        self._record(bool(found))
+        return found
+
+    def finditer(self, text: str) -> list:
+        """All match objects (for spans), counted as one use."""
+        found = list(self.regex.finditer(text))
+        if PATTERN_STATS:
+            self._record(bool(found))
+        return found
+
+    def __repr__(self):
+        return f"Pattern({self.name!r}, {self.pattern!r})"
+
+
+class Selector:
+    """A CSS selector parsed once (to XPath for the lxml backend), with hit counts."""
+
+    def __init__(self, name: str, css: str):
+        self.name = name
+        self.css = css
+        self.uses = 0
+        self.hits = 0
+        self._lock = threading.Lock()
+        # Documents and elements use different XPath prefixes; warm both
+        compile_css(css, "descendant-or-self::")
+        compile_css(css, "descendant::")
+
+    def _record(self, found: bool):
+        with self._lock:
+            self.uses += 1
+            if found:
+                self.hits += 1
+
+    def one(self, node):
+        found = node.select_one(self.css)
+        if PATTERN_STATS:
+            self._record(found is not None)
+        return found
+
+    def all(self, node) -> list:
+        found = node.select(self.css)
+        if PATTERN_STATS:
+            self._record(bool(found))
+        return found
+
+    def __repr__(self):
+        return f"Selector({self.name!r}, {self.css!r})"
+
+
+class PatternRegistry:
+    def __init__(self):
+        self.patterns: dict[str, Pattern] = {}
+        self.selectors: dict[str, Selector] = {}
+
+    def regex(self, name: str, regex: str, flags: int = 0) -> Pattern:
+        if name in self.patterns:
+            raise ValueError(f"Duplicate pattern name: {name}")
+        pattern = Pattern(name, regex, flags)
+        self.patterns[name] = pattern
+        return pattern
+
+    def selector(self, name: str, css: str) -> Selector:
+        if name in self.selectors:
+            raise ValueError(f"Duplicate selector name: {name}")
+        selector = Selector(name, css)
+        self.selectors[name] = selector
+        return selector
+
+    def stats(self) -> dict:
+        """
+        Per-entry use/hit counts; entries that never hit are pruning
+        candidates. All zero unless SCRAPER_PATTERN_STATS=1.
+        """
+
+        def entry(item, source: str) -> dict:
+            return {
+                source: item.pattern if source == "pattern" else item.css,
+                "uses": item.uses,
+                "hits": item.hits,
+            }
+
+        patterns = {name: entry(p, "pattern") for name, p in self.patterns.items()}
+        selectors = {name: entry(s, "css") for name, s in self.selectors.items()}
+        if not PATTERN_STATS:
+            return {"enabled": False, "patterns": patterns, "selectors": selectors, "never_hit": []}
+        return {
+            "enabled": True,
+            "patterns": patterns,
+            "selectors": selectors,
+            "never_hit": sorted(
+                [n for n, p in self.patterns.items() if p.hits == 0]
+                + [n for n, s in self.selectors.items() if s.hits == 0]
+            ),
+        }
+
+
+registry = PatternRegistry()
+
+
+# ---------- PRICES / DISCOUNTS ----------
+
+RUPEE_PRICE = registry.regex("rupee_price", r"₹\s*([\d,]+(?:\.\d+)?)")
+PERCENT_OFF = registry.regex("percent_off", r"(\d+)%\s*off", re.I)
+UP_TO_PERCENT_OFF = registry.regex("up_to_percent_off", r"up to\s+(\d+)%\s*off", re.I)
+AMOUNT = registry.regex("amount", r"(\d[\d,]*(?:\.\d+)?)")
+QUANTITY = registry.regex("quantity", r"(\d+(\.\d+)?)\s*(ml|g|kg|l|L)")
+
+
+# ---------- FLIPKART ----------
+
+FK_DISCOUNT = registry.regex("flipkart_discount", r"\d+% off", re.I)
+FK_SELLER_LABEL = registry.regex("flipkart_seller_label", r"Seller", re.I)
+FK_RETURNS = registry.regex(
+    "flipkart_returns", r"\b\d+\s*day[s]?\s+(Replacement|Returnable)", re.I
+)
+
+FK_TITLE = registry.selector("flipkart_title", "span.B_NuCI")
+FK_TITLE_FALLBACK = registry.selector("flipkart_title_fallback", 'span[dir="auto"]')
+FK_DEAL = registry.selector("flipkart_deal", "div._30jeq3._16Jk6d")
+FK_DEAL_FALLBACK = registry.selector("flipkart_deal_fallback", "div._30jeq3")
+FK_MRP = registry.selector("flipkart_mrp", "div._3I9_wc._2p6lqe")
+FK_HIGHLIGHTS = registry.selector("flipkart_highlights", "li._21Ahn-")
+
+
+# ---------- AMAZON ----------
+
+AMZ_DISCOUNT = registry.regex("amazon_discount", r"-?\d+%(\s*off)?", re.I)
+AMZ_RETURNS_ID = registry.regex("amazon_returns_id", r"RETURNS_POLICY|RETURNS-FEATURE", re.I)
+AMZ_RETURNS_LABEL = registry.regex("amazon_returns_label", r"Returns", re.I)
+AMZ_RETURNS = registry.regex("amazon_returns", r"\b\d+\s*-?\s*day[s]?\s+return", re.I)
+AMZ_TECH_TABLE_ID = registry.regex(
+    "amazon_tech_table_id", r"productDetails_techSpec|productDetails_detailBullets", re.I
+)
+AMZ_TECH_HEADING = registry.regex(
+    "amazon_tech_heading", r"Technical Details|Product Details", re.I
+)
+AMZ_DELIVERY_ID = registry.regex("amazon_delivery_id", r"deliveryMessage", re.I)
+AMZ_DDM_DELIVERY_ID = registry.regex("amazon_ddm_delivery_id", r"ddmDeliveryMessage", re.I)
+
+AMZ_TITLE = registry.selector("amazon_title", "#productTitle")
+AMZ_TITLE_FALLBACK = registry.selector("amazon_title_fallback", "h1 span")
+AMZ_MRP_BLOCK = registry.selector("amazon_mrp_block", "span.a-price.a-text-price")
+AMZ_PRICE_BLOCKS = registry.selector("amazon_price_blocks", "span.a-price")
+AMZ_PRICE_WHOLE = registry.selector("amazon_price_whole", "span.a-price-whole")
+AMZ_PRICE_FRACTION = registry.selector("amazon_price_fraction", "span.a-price-fraction")
+AMZ_SELLER = registry.selector("amazon_seller", "#sellerProfileTriggerId")
+AMZ_TABLE_ROWS = registry.selector("amazon_table_rows", "tr")
+AMZ_BULLETS = registry.selector(
+    "amazon_bullets", "#feature-bullets li, #feature-bullets span.a-list-item"
+)
+AMZ_DELIVERY_BLOCK = registry.selector(
+    "amazon_delivery_block", "#mir-layout-DELIVERY_BLOCK_SLOT, #deliveryBlockMessage"
+)
+
+
+# ---------- GENERIC ----------
+
+GEN_SELLER_LABEL = registry.regex("generic_seller_label", r"Brand|Seller|Sold by", re.I)
+GEN_RETURNS = registry.regex(
+    "generic_returns", r"\b\d+\s*day[s]?\s+(return|refund|replacement|returnable)", re.I
+)
+GEN_DESCRIPTION_ID = registry.regex(
+    "generic_description_id", r"productDescription|description", re.I
+)
+GEN_DESCRIPTION_CLASS = registry.regex(
+    "generic_description_class", r"description|prod-desc|product-info", re.I
+)
+
+
+# ---------- DARK PATTERNS ----------
+# Checked in place at keyword hits (Pattern.match at a position), never
+# scanned over the whole page text.
+
+SCARCITY_COUNT = registry.regex(
+    "scarcity_count", r"only\s+(\d+)\s+(?:[a-z]+\s+){0,2}left", re.I
+)
+# After "ends in" / "hurry" etc.: a clock or a duration shortly after
+COUNTDOWN_TIME = registry.regex(
+    "countdown_time",
+    r".{0,40}?(\d{1,2}\s*:\s*\d{2}(?:\s*:\s*\d{2})?|\d+\s*(?:h|hrs?|hours?|m|mins?|minutes?|s|secs?|seconds?)\b)",
+    re.I | re.S,
+)
+COUNTDOWN_ATTR = registry.regex("countdown_attr", r"count-?down|timer", re.I)
+ADDON_ATTR = registry.regex(
+    "addon_attr", r"insurance|warranty|protect|add-?on|donat|gift-?wrap", re.I
+)
+# Searched in the short text window around a checked checkbox/radio, or in
+# the buffered text of one collapsed element -- never the whole page
+ADDON_TEXT = registry.regex(
+    "addon_text",
+    r"insurance|warranty|protection(?:\s+plan)?|donat\w*|gift[\s-]?wrap\w*|add-?on",
+    re.I,
+)
+HIDDEN_FEE = registry.regex(
+    "hidden_fee",
+    r"(?:[a-z]+\s+)?(?:fee|charges?|surcharge|cess)\b",
+    re.I,
+)
+# After "automatically added" etc.: a rupee amount shortly after
+AUTO_ADDED_PRICE = registry.regex("auto_added_price", r".{0,80}?(₹\s*[\d,]+)", re.S)
+
+
+# ---------- PRODUCT FIELDS (normalizer.py) ----------
+# Matched in place (Pattern.match) at the hits of normalizer.FIELD_KEYWORDS
+# on the lowercased product text, like the dark patterns; group 1 is the
+# value. Short keywords are guarded with (?<![a-z]) so they only start
+# words. Values stop at "|" (the technical_details separator), newlines
+# (between the normalizer's text sources) and, for prose fields, at the
+# end of the sentence.
+
+_SENTENCE = r"(?:[^|\n.]|\.(?=\d))"
+
+FIELD_PATTERNS = {
+    field: registry.regex(f"field_{field}", regex)
+    for field, regex in {
+        "fssai": r"fssai\D{0,30}?(\d{14})",
+        "energy_rating": r"(?<![a-z])(bee\s+\d\s*star)",
+        "safety": r"(?<![a-z])((?:bis|isi)\s+(?:certified|marked|mark|approved|registration)[^|\n.]{0,40}|ce\s+certified|r-\d{8})",
+        "compatibility": r"compatible\s+with\s+([^|\n.]{2,80})",
+        "expiry": r"((?:best\s+before|use\s+by|expiry(?:\s+date)?|expires\s+on|shelf\s+life)\s*[:\-]?\s*[^|\n.]{1,40})",
+        "ingredients": rf"ingredients?\s*[:\-]\s*({_SENTENCE}{{3,200}})",
+        "allergen": (
+            r"((?:allergens?(?:\s+information)?\s*[:\-]|(?:may\s+)?contains?\s+(?:traces\s+of\s+)?"
+            r"(?=(?:tree\s+)?nuts?|peanuts?|milk|soy|gluten|wheat|eggs?|sesame|shellfish|mustard))[^|\n.]{1,80})"
+        ),
+        "veg_nonveg": r"(?<![a-z])(non[-\s]?veg(?:etarian)?|pure\s+veg(?:etarian)?|vegetarian|vegan|eggless)\b",
+        "storage": (
+            r"(store\s+in\s+a\s+(?:cool|dry)[^|\n.]{0,80}|keep\s+refrigerated[^|\n.]{0,60}"
+            r"|storage(?:\s+instructions?)?\s*[:\-]\s*[^|\n.]{3,80})"
+        ),
+        "nutrition": r"(nutrition(?:al)?\s+(?:information|facts|values?)[^|\n]{0,120}|energy\s*\(?kcal\)?[^|\n]{0,80})",
+        "dosage": rf"(?:dosage|recommended\s+dose)\s*[:\-]\s*({_SENTENCE}{{3,120}})",
+        "usage": rf"(?:directions\s+(?:for|of)\s+use|how\s+to\s+use|usage\s+instructions?)\s*[:\-]?\s*({_SENTENCE}{{3,160}})",
+        "warning": rf"(?:warnings?|caution)\s*[:\-]\s*({_SENTENCE}{{3,160}})",
+        "disclaimer": rf"disclaimer\s*[:\-]\s*({_SENTENCE}{{3,200}})",
+        "age_limit": (
+            r"(?<![a-z])(ages?\s+\d{1,2}\s*\+?(?:\s*(?:years?|yrs))?"
+            r"|not\s+(?:suitable|recommended|for)\s+(?:for\s+)?children\s+(?:under|below)\s+\d{1,2})"
+        ),
+        "prescription_required": (
+            r"(prescription\s+(?:required|only|needed)|rx\s+only|schedule\s+h1?\b|requires?\s+a\s+prescription)"
+        ),
+        "seller_contact": (
+            r"(?:customer\s+care|helpline|contact)(?:\s+(?:no|number|details))?\.?\s*[:\-]?\s*"
+            r"(\+?\d[\d\s-]{8,}\d|[\w.+-]+@[\w-]+\.[\w.]+)"
+        ),
+        "grievance": r"(grievance\s+officer[^|\n]{0,160})",
+    }.items()
+}
+# Fields that start with a number, in one scan of the original text. The
+# quantity branch is QUANTITY (case-sensitive, tried first); for the others
+# the named group says which field the whole match is. Matches start at the
+# first digit of a run (a start inside one can only match where that did);
+# the check sits after a leading \d so re still skips ahead to digits.
+FIELD_NUMBERS = registry.regex(
+    "field_numbers",
+    r"(?P<q_amount>\d(?<!\d\d)\d*(?:\.\d+)?)\s*(?:"
+    r"(?P<q_unit>ml|g|kg|l|L)"
+    r"|(?:-\s*\d{1,3}\s*)?(?i:"
+    r"(?P<voltage>vac|vdc|volts?|v)\b"
+    r"|(?P<age_limit>\+?\s*(?:years?|yrs)\s*(?:\+|and\s+(?:above|up|older)|&\s*(?:above|up)))"
+    r"|(?P<guaranteed>(?:day|month|year)s?\s+(?:money[-\s]?back\s+|replacement\s+)?guarantee)"
+    r"|(?P<energy_rating>star\s+(?:energy\s+|bee\s+)?(?:rating|rated))"
+    r"))",
+)
+
+
+def pattern_stats() -> dict:
+    return registry.stats()
@@ -0,0 +1,222 @@
+import argparse
+import hashlib
+import json
+import os
+import time
+from datetime import datetime, timezone
+
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+
+from canonical import resolve_cached
+from dark_patterns import DETECTORS, DarkPatternFinding, Detector
+from database import engine, init_db
+from models import Price
+
+
+# ---------- CONFIG ----------
+
+# An unchanged price is stored again only after this long, so thousands of
+# scans a day of the same catalog add a handful of rows per product
+PRICE_POINT_MIN_INTERVAL = int(os.getenv("PRICE_POINT_MIN_INTERVAL", "3600"))
+# How far back the MRP-inflation check reads, and how recent the MRP raise
+# must be (relative to the scan) to count as "just before the sale"
+PRICE_INFLATION_LOOKBACK_DAYS = int(os.getenv("PRICE_INFLATION_LOOKBACK_DAYS", "90"))
+PRICE_INFLATION_WINDOW_DAYS = int(os.getenv("PRICE_INFLATION_WINDOW_DAYS", "14"))
+# Raises smaller than this share of the earlier MRP are ignored
+PRICE_INFLATION_MIN_RAISE = float(os.getenv("PRICE_INFLATION_MIN_RAISE", "0.10"))
+
+BACKFILL_CHUNK_SIZE = 1000
+DAY = 86400
+
+_LATEST = text(
+    "SELECT ts, mrp, deal FROM price_points"
+    " WHERE product_key = :key ORDER BY ts DESC LIMIT 1"
+)
+_RANGE = text(
+    "SELECT ts, mrp, deal FROM price_points"
+    " WHERE product_key = :key AND ts BETWEEN :start AND :end ORDER BY ts"
+)
+_UPSERT = text(
+    "INSERT INTO price_points (product_key, ts, mrp, deal) VALUES (:key, :ts, :mrp, :deal)"
+    " ON CONFLICT (product_key, ts) DO UPDATE SET mrp = excluded.mrp, deal = excluded.deal"
+)
+_READ_SCANS = text(
+    "SELECT id, url, canonical_url, timestamp, product_data FROM scans"
+    " WHERE id > :after ORDER BY id LIMIT :limit"
+)
+
+
+# ---------- KEYS ----------
+
+def product_key(canonical_url: str) -> int:
+    """Signed 64-bit key for a product: fits SQLite's INTEGER, unlike the URL itself."""
+    digest = hashlib.sha256(canonical_url.encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big", signed=True)
+
+
+def to_ts(when: datetime) -> int:
+    """Unix seconds; naive datetimes are UTC (as datetime.utcnow() gives)."""
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return int(when.timestamp())
+
+
+def from_ts(ts: int) -> datetime:
+    return datetime.fromtimestamp(ts, timezone.utc).replace(tzinfo=None)
+
+
+# ---------- STORE ----------
+
+def record_price_point(conn, key: int, price: Price | None, when: datetime) -> bool:
+    """
+    Append one observation in the caller's transaction. Skipped when there
+    is no price, or when it equals the latest point and that point is
+    younger than PRICE_POINT_MIN_INTERVAL (the series is a step function,
+    so dropping repeats loses nothing). Returns whether a row was written.
+    """
+    if price is None or (price.mrp is None and price.deal is None):
+        return False
+    ts = to_ts(when)
+    latest = conn.execute(_LATEST, {"key": key}).first()
+    if latest is not None:
+        last_ts, last_mrp, last_deal = latest
+        if (last_mrp, last_deal) == (price.mrp, price.deal) and 0 <= ts - last_ts < PRICE_POINT_MIN_INTERVAL:
+            return False
+    conn.execute(_UPSERT, {"key": key, "ts": ts, "mrp": price.mrp, "deal": price.deal})
+    return True
+
+
+def price_range(conn, key: int, start: int, end: int) -> list[tuple]:
+    """(ts, mrp, deal) with start <= ts <= end, oldest first: one primary-key range scan."""
+    return [tuple(row) for row in conn.execute(_RANGE, {"key": key, "start": start, "end": end})]
+
+
+# ---------- MRP INFLATION ----------
+
+def detect_mrp_inflation(points: list[tuple], mrp: float | None, deal: float | None,
+                         now: int) -> DarkPatternFinding | None:
+    """
+    Flag a sale whose MRP was raised shortly before it: the current MRP
+    first appeared within PRICE_INFLATION_WINDOW_DAYS, is at least
+    PRICE_INFLATION_MIN_RAISE above the MRP before it, and against that
+    earlier MRP the deal is worth less than half the claimed discount.
+    points: earlier (ts, mrp, deal), oldest first.
+    """
+    if not (mrp and deal and deal < mrp):
+        return None
+
+    # Walk back over the points that already carry (about) the current MRP
+    raised_at = now
+    baseline = None
+    for ts, old_mrp, _ in reversed(points):
+        if old_mrp is None:
+            continue
+        if abs(old_mrp - mrp) <= mrp * 0.01:
+            raised_at = ts
+            continue
+        baseline = old_mrp
+        break
+    if baseline is None or mrp < baseline * (1 + PRICE_INFLATION_MIN_RAISE):
+        return None
+    if now - raised_at > PRICE_INFLATION_WINDOW_DAYS * DAY:
+        return None
+
+    claimed_pct = round((mrp - deal) / mrp * 100)
+    actual_pct = max(0, round((baseline - deal) / baseline * 100))
+    if actual_pct >= claimed_pct / 2:
+        return None
+    days = max(0, (now - raised_at) // DAY)
+    return DarkPatternFinding(
+        code="DARK_MRP_INFLATION",
+        message=(
+            f"MRP was raised from ₹{baseline:,.0f} to ₹{mrp:,.0f} {days} day(s) before this "
+            f"sale; against the earlier MRP the discount is about {actual_pct}%, "
+            f"not the {claimed_pct}% shown."
+        ),
+        severity="high",
+    )
+
+
+class PriceHistory:
+    """A product's stored points before one scan, for the MRP-inflation detector."""
+
+    def __init__(self, points: list[tuple], now: int):
+        # (ts, mrp, deal), oldest first, within PRICE_INFLATION_LOOKBACK_DAYS
+        self.points = points
+        self.now = now
+
+
+def load_price_history(canonical_url: str | None, when: datetime | None = None) -> PriceHistory | None:
+    """
+    The product's recent history, read before the page is parsed so the
+    detectors never touch the database. None when there is no URL or the
+    read fails: history is an extra signal, a scan never fails for lack of it.
+    """
+    if not canonical_url:
+        return None
+    now = to_ts(when or datetime.utcnow())
+    try:
+        with engine.connect() as conn:
+            points = price_range(
+                conn, product_key(canonical_url), now - PRICE_INFLATION_LOOKBACK_DAYS * DAY, now - 1
+            )
+    except SQLAlchemyError:
+        return None
+    return PriceHistory(points, now)
+
+
+class MrpInflation(Detector):
+    """detect_mrp_inflation() as a dark-pattern detector; needs ctx.price_history."""
+
+    code = "DARK_MRP_INFLATION"
+    severity = "high"
+
+    def detect(self, ctx):
+        history, price = ctx.price_history, ctx.product.price
+        if history is None or price is None:
+            return None
+        return detect_mrp_inflation(history.points, price.mrp, price.deal, history.now)
+
+
+DETECTORS.register(MrpInflation())
+
+
+# ---------- BACKFILL ----------
+
+def backfill_price_points(after_id: int = 0, chunk_size: int = BACKFILL_CHUNK_SIZE) -> dict:
+    """Load the prices already inside stored scans (product_data) into price_points."""
+    init_db()
+    started = time.time()
+    summary = {"scanned": 0, "recorded": 0, "last_id": after_id}
+    last_id = after_id
+    while True:
+        with engine.begin() as conn:
+            rows = conn.execute(_READ_SCANS, {"after": last_id, "limit": chunk_size}).all()
+            if not rows:
+                break
+            for scan_id, url, canonical_url, timestamp, product_data in rows:
+                if isinstance(product_data, str):
+                    product_data = json.loads(product_data)
+                price = (product_data or {}).get("price")
+                if not price or not timestamp:
+                    continue
+                if isinstance(timestamp, str):
+                    timestamp = datetime.fromisoformat(timestamp)
+                # Same URL resolution as main.save_scan
+                key = product_key(canonical_url or resolve_cached(url))
+                if record_price_point(conn, key, Price(**price), timestamp):
+                    summary["recorded"] += 1
+        last_id = rows[-1][0]
+        summary["scanned"] += len(rows)
+        summary["last_id"] = last_id
+    summary["seconds"] = round(time.time() - started, 2)
+    return summary
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Price history: backfill from stored scans.")
+    parser.add_argument("--after-id", type=int, default=0, help="resume after this scan id")
+    parser.add_argument("--chunk-size", type=int, default=BACKFILL_CHUNK_SIZE)
+    args = parser.parse_args()
+    print(json.dumps(backfill_price_points(args.after_id, args.chunk_size), indent=2))
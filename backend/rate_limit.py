@@ -0,0 +1,194 @@
+import os
+import random
+import sqlite3
+import threading
+import time
+from urllib.parse import urlparse
+
+
+# ---------- CONFIG ----------
+
+# Per-domain token buckets: suffix -> (tokens refilled per second, burst size).
+# A request only waits when its domain's bucket is empty.
+DOMAIN_LIMITS = {
+    "amazon.in": (0.5, 3),
+    "amazon.com": (0.5, 3),
+    "amzn.in": (1.0, 5),
+    "flipkart.com": (0.5, 3),
+    "myntra.com": (0.5, 3),
+    "ajio.com": (0.5, 3),
+    "limeroad.com": (0.2, 2),
+}
+DEFAULT_LIMIT = (
+    float(os.getenv("SCRAPER_RATE_DEFAULT_RPS", "1.0")),
+    float(os.getenv("SCRAPER_RATE_DEFAULT_BURST", "5")),
+)
+# Random extra delay (seconds) added only when a request has to wait,
+# so queued requests do not fire in lockstep.
+JITTER = (0.1, 0.6)
+
+# "sqlite" shares buckets across worker processes, "memory" is per process
+RATE_LIMIT_BACKEND = os.getenv("SCRAPER_RATE_LIMIT_BACKEND", "sqlite")
+RATE_LIMIT_DB = os.getenv(
+    "SCRAPER_RATE_LIMIT_DB",
+    os.path.join(os.getenv("SCRAPER_CACHE_DIR", ".cache"), "ratelimit.db"),
+)
+
+
+def bucket_for(url: str) -> tuple[str, float, float]:
+    """
+    Map a URL to (bucket key, rate, burst).
+    Configured domains share one bucket for all their subdomains.
+    """
+    host = (urlparse(url).hostname or "").lower()
+    best = None
+    for suffix in DOMAIN_LIMITS:
+        if host == suffix or host.endswith("." + suffix):
+            if best is None or len(suffix) > len(best):
+                best = suffix
+    if best:
+        rate, burst = DOMAIN_LIMITS[best]
+        return best, rate, burst
+
+    if host.startswith("www."):
+        host = host[4:]
+    rate, burst = DEFAULT_LIMIT
+    return host, rate, burst
+
+
+def _take(tokens: float, updated: float, now: float, rate: float, burst: float):
+    """
+    Refill, then take one token. Tokens may go negative: that is a
+    reservation, and the caller waits until it is paid back.
+    Returns (new_tokens, wait_seconds).
+    """
+    tokens = min(burst, tokens + max(0.0, now - updated) * rate)
+    tokens -= 1.0
+    wait = 0.0 if tokens >= 0 else -tokens / rate
+    return tokens, wait
+
+
+# ---------- BACKENDS ----------
+
+class MemoryBucketStore:
+    """Buckets shared by all threads of one process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._buckets: dict[str, tuple[float, float]] = {}
+
+    def reserve(self, key: str, rate: float, burst: float) -> float:
+        with self._lock:
+            now = time.time()
+            tokens, updated = self._buckets.get(key, (burst, now))
+            tokens, wait = _take(tokens, updated, now, rate, burst)
+            self._buckets[key] = (tokens, now)
+            return wait
+
+
+class SqliteBucketStore:
+    """
+    Buckets in a local SQLite file, shared by every worker process on the
+    host. BEGIN IMMEDIATE serialises the read-modify-write per reservation.
+    """
+
+    def __init__(self, path: str = RATE_LIMIT_DB):
+        self.path = path
+        self._local = threading.local()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = self._conn()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS buckets ("
+            " key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)"
+        )
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def reserve(self, key: str, rate: float, burst: float) -> float:
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            now = time.time()
+            row = conn.execute(
+                "SELECT tokens, updated FROM buckets WHERE key = ?", (key,)
+            ).fetchone()
+            tokens, updated = row if row else (burst, now)
+            tokens, wait = _take(tokens, updated, now, rate, burst)
+            conn.execute(
+                "INSERT INTO buckets (key, tokens, updated) VALUES (?, ?, ?)"
+                " ON CONFLICT(key) DO UPDATE SET tokens = excluded.tokens,"
+                " updated = excluded.updated",
+                (key, tokens, now),
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return wait
+
+
+# ---------- LIMITER ----------
+
+class DomainRateLimiter:
+    def __init__(self, store=None):
+        self.store = store or MemoryBucketStore()
+        self._lock = threading.Lock()
+        self._stats: dict[str, dict] = {}
+
+    def reserve(self, url: str) -> float:
+        """
+        Reserve one request for the URL's domain and return how long the
+        caller must wait before sending it (0 when the budget allows).
+        """
+        key, rate, burst = bucket_for(url)
+        wait = self.store.reserve(key, rate, burst)
+        if wait > 0:
+            wait += random.uniform(*JITTER)
+
+        with self._lock:
+            s = self._stats.setdefault(
+                key, {"requests": 0, "delayed": 0, "delay_seconds": 0.0}
+            )
+            s["requests"] += 1
+            if wait > 0:
+                s["delayed"] += 1
+                s["delay_seconds"] += wait
+        return wait
+
+    def wait(self, url: str):
+        delay = self.reserve(url)
+        if delay > 0:
+            time.sleep(delay)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                key: {**s, "delay_seconds": round(s["delay_seconds"], 3)}
+                for key, s in self._stats.items()
+            }
+
+
+_limiter: DomainRateLimiter | None = None
+_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> DomainRateLimiter:
+    global _limiter
+    if _limiter is None:
+        with _limiter_lock:
+            if _limiter is None:
+                if RATE_LIMIT_BACKEND == "memory":
+                    store = MemoryBucketStore()
+                else:
+                    store = SqliteBucketStore()
+                _limiter = DomainRateLimiter(store)
+    return _limiter
@@ -0,0 +1,205 @@
+import argparse
+import json
+import logging
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import datetime
+
+from sqlalchemy import text
+
+from database import engine, init_db
+from evaluation import get_evaluation_service, risk_score
+from models import ProductData, Violation
+from normalizer import normalize_product
+
+try:
+    import orjson
+
+    def _dumps(value) -> str:
+        return orjson.dumps(value).decode("utf-8")
+
+    _loads = orjson.loads
+except ImportError:  # plain json works, just slower on 100k-row runs
+    _dumps = json.dumps
+    _loads = json.loads
+
+logger = logging.getLogger(__name__)
+
+
+# ---------- CONFIG ----------
+
+RESCORE_CHUNK_SIZE = int(os.getenv("RESCORE_CHUNK_SIZE", "1000"))
+RESCORE_WORKERS = int(os.getenv("RESCORE_WORKERS", str(os.cpu_count() or 1)))
+# Failed scans listed in the run summary (all of them are logged and counted)
+RESCORE_REPORTED_ERRORS = 100
+
+# Violations from dark_patterns.py rather than the rules
+DARK_PATTERN_PREFIX = "DARK_"
+
+_READ_CHUNK = text(
+    "SELECT id, product_data, violations_data FROM scans"
+    " WHERE id > :after ORDER BY id LIMIT :limit"
+)
+_WRITE_RESCORE = text(
+    "INSERT INTO scan_rescores (scan_id, rule_version, risk_score, violations_data, rescored_at)"
+    " VALUES (:scan_id, :rule_version, :risk_score, :violations_data, :rescored_at)"
+    " ON CONFLICT (scan_id, rule_version) DO UPDATE SET"
+    "  risk_score = excluded.risk_score,"
+    "  violations_data = excluded.violations_data,"
+    "  rescored_at = excluded.rescored_at"
+)
+
+
+# ---------- WORKER ----------
+
+def _error(e: Exception) -> str:
+    return f"{type(e).__name__}: {e}"
+
+
+def rescore_chunk(rows: list[tuple], rule_version: str) -> tuple[list[tuple], list[tuple]]:
+    """
+    (scan_id, risk_score, violations JSON) for each stored scan, plus
+    (scan_id, error) for each one that could not be re-scored. The chunk
+    is evaluated in one check_batch() call. Runs in worker processes.
+    """
+    service = get_evaluation_service()
+    if service.ruleset.version != rule_version:
+        raise RuntimeError(
+            f"Rule packs changed during the run ({rule_version} -> {service.ruleset.version})"
+        )
+
+    parsed = []
+    errors = []
+    for scan_id, product_json, violations_json in rows:
+        try:
+            product = ProductData.model_validate_json(product_json)
+            dark = []
+            if violations_json and DARK_PATTERN_PREFIX in violations_json:
+                dark = [
+                    v for v in _loads(violations_json)
+                    if v.get("rule_id", "").startswith(DARK_PATTERN_PREFIX)
+                ]
+            parsed.append((scan_id, product, normalize_product(product), dark))
+        except Exception as e:
+            errors.append((scan_id, _error(e)))
+
+    try:
+        evaluations = service.check_batch([(product, ai) for _, product, ai, _ in parsed])
+    except Exception as e:
+        return [], errors + [(scan_id, _error(e)) for scan_id, _, _, _ in parsed]
+
+    results = []
+    for (scan_id, _, _, dark), evaluation in zip(parsed, evaluations):
+        try:
+            violations = list(evaluation.violations) + [Violation(**v) for v in dark]
+            results.append((
+                scan_id,
+                risk_score(violations),
+                _dumps(evaluation.violation_dicts() + dark),
+            ))
+        except Exception as e:
+            errors.append((scan_id, _error(e)))
+    return results, errors
+
+
+# ---------- JOB ----------
+
+def _read_chunk(after_id: int, limit: int) -> list[tuple]:
+    with engine.connect() as conn:
+        return [tuple(row) for row in conn.execute(_READ_CHUNK, {"after": after_id, "limit": limit})]
+
+
+def _write_results(results: list[tuple], rule_version: str):
+    if not results:
+        return
+    rescored_at = datetime.utcnow().isoformat(" ")
+    with engine.begin() as conn:
+        conn.execute(_WRITE_RESCORE, [
+            {
+                "scan_id": scan_id,
+                "rule_version": rule_version,
+                "risk_score": score,
+                "violations_data": violations,
+                "rescored_at": rescored_at,
+            }
+            for scan_id, score, violations in results
+        ])
+
+
+def rescore_scans(workers: int = RESCORE_WORKERS, chunk_size: int = RESCORE_CHUNK_SIZE,
+                  after_id: int = 0, progress=None) -> dict:
+    """
+    Re-score every stored scan with id > after_id against the current rule
+    packs, with no network: scans are read in id-keyset chunks, normalized
+    and evaluated in worker processes, and written to scan_rescores tagged
+    with the rule version (re-running overwrites the same rows).
+
+    Dark-pattern findings need the page HTML, which is not stored, so the
+    DARK_* violations recorded at scan time are carried over as-is. Scans
+    that fail are logged; the summary counts them and lists the first
+    RESCORE_REPORTED_ERRORS (scan_id, error).
+    """
+    init_db()
+    rule_version = get_evaluation_service().ruleset.version
+    started = time.time()
+    summary = {
+        "rule_version": rule_version, "scanned": 0, "rescored": 0, "errors": 0,
+        "failed": [], "last_id": after_id,
+    }
+
+    def collect(results, errors):
+        _write_results(results, rule_version)
+        summary["rescored"] += len(results)
+        summary["errors"] += len(errors)
+        for scan_id, error in errors:
+            logger.warning("Scan %s not re-scored: %s", scan_id, error)
+            if len(summary["failed"]) < RESCORE_REPORTED_ERRORS:
+                summary["failed"].append({"scan_id": scan_id, "error": error})
+        if progress:
+            progress(summary)
+
+    last_id = after_id
+    if workers <= 1:
+        while rows := _read_chunk(last_id, chunk_size):
+            last_id = rows[-1][0]
+            summary["scanned"] += len(rows)
+            summary["last_id"] = last_id
+            collect(*rescore_chunk(rows, rule_version))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            in_flight = set()
+            exhausted = False
+            while True:
+                while not exhausted and len(in_flight) < workers * 2:
+                    rows = _read_chunk(last_id, chunk_size)
+                    if not rows:
+                        exhausted = True
+                        break
+                    last_id = rows[-1][0]
+                    summary["scanned"] += len(rows)
+                    summary["last_id"] = last_id
+                    in_flight.add(pool.submit(rescore_chunk, rows, rule_version))
+                if not in_flight:
+                    break
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    collect(*future.result())
+
+    summary["seconds"] = round(time.time() - started, 2)
+    return summary
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Re-score stored scans against the current rule packs.")
+    parser.add_argument("--workers", type=int, default=RESCORE_WORKERS)
+    parser.add_argument("--chunk-size", type=int, default=RESCORE_CHUNK_SIZE)
+    parser.add_argument("--after-id", type=int, default=0, help="resume after this scan id")
+    args = parser.parse_args()
+
+    def report(summary: dict):
+        print(f"\r{summary['rescored']} re-scored, {summary['errors']} errors", end="", flush=True)
+
+    result = rescore_scans(args.workers, args.chunk_size, args.after_id, progress=report)
+    print()
+    print(json.dumps(result, indent=2))
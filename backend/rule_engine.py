@@ -0,0 +1,201 @@
+import random
+import time
+
+from rules import RULES
+
+try:
+    import numpy as np
+except ImportError:  # batch evaluation falls back to the per-product loop
+    np = None
+
+
+# Points a failed rule takes off the 100-point score
+SEVERITY_WEIGHTS = {"HIGH": 20, "MEDIUM": 10, "LOW": 5}
+
+
+class CompiledRule:
+    """One entry of rules.RULES with its required fields as a bitmask."""
+
+    __slots__ = ("id", "title", "law", "category", "severity", "weight", "mask", "fields", "columns")
+
+    def __init__(self, rule: dict, bits: dict[str, int]):
+        self.id = rule["id"]
+        self.title = rule["title"]
+        self.law = rule.get("law", "")
+        self.category = rule.get("category", "all")
+        self.severity = rule["severity"]
+        if self.severity.upper() not in SEVERITY_WEIGHTS:
+            raise ValueError(f"Rule {self.id}: unknown severity {self.severity!r}")
+        self.weight = SEVERITY_WEIGHTS[self.severity.upper()]
+        # (name, bit) in declared order, so missing fields are listed as written
+        self.fields = tuple((name, bits[name]) for name in rule.get("required_fields", []))
+        # Column index of each field in presence matrices (same order as fields)
+        self.columns = tuple(bit.bit_length() - 1 for _, bit in self.fields)
+        self.mask = 0
+        for _, bit in self.fields:
+            self.mask |= bit
+
+    def missing(self, present: int) -> list[str]:
+        absent = self.mask & ~present
+        return [name for name, bit in self.fields if absent & bit]
+
+    def missing_in_row(self, row) -> list[str]:
+        """missing() for one row of a presence matrix."""
+        return [name for (name, _), col in zip(self.fields, self.columns) if not row[col]]
+
+    def __repr__(self):
+        return f"CompiledRule({self.id!r}, {self.category!r})"
+
+
+class RuleEngine:
+    """
+    RULES compiled once into a rule table per category. A product is
+    reduced to one integer (a bit per field that is present), and a rule
+    fails when `rule.mask & ~present` is non-zero.
+
+    gated: categories whose rules only apply to products of that category.
+    None gates every category except "all". Rules of ungated categories
+    apply to every product.
+    """
+
+    def __init__(self, rules=RULES, gated=None):
+        self.bits: dict[str, int] = {}
+        for rule in rules:
+            for name in rule.get("required_fields", []):
+                if name not in self.bits:
+                    self.bits[name] = 1 << len(self.bits)
+        self.fields = tuple(self.bits)
+        self.rules = tuple(CompiledRule(rule, self.bits) for rule in rules)
+
+        categories = {r.category for r in self.rules} - {"all"}
+        self.gated = frozenset(categories if gated is None else gated)
+        # Rules every product gets, then one table per gated category
+        self.default_table = tuple(
+            r for r in self.rules if r.category == "all" or r.category not in self.gated
+        )
+        self.tables = {
+            category: tuple(
+                r for r in self.rules
+                if r.category == "all" or r.category not in self.gated or r.category == category
+            )
+            for category in self.gated
+        }
+        self._matrices = None
+
+    def table(self, category: str | None) -> tuple:
+        return self.tables.get(category, self.default_table)
+
+    def mask(self, field_values: dict) -> int:
+        """Presence mask from a field -> bool dict (absent keys count as missing)."""
+        present = 0
+        for name, bit in self.bits.items():
+            if field_values.get(name, False):
+                present |= bit
+        return present
+
+    def mask_of(self, obj) -> int:
+        """Presence mask from an object's attributes (falsy or absent = missing)."""
+        present = 0
+        for name, bit in self.bits.items():
+            if getattr(obj, name, None):
+                present |= bit
+        return present
+
+    def failures(self, category: str | None, present: int) -> list[CompiledRule]:
+        """Rules of the category's table that the presence mask does not satisfy."""
+        missing = ~present
+        return [r for r in self.table(category) if r.mask & missing]
+
+    @staticmethod
+    def score(failed) -> int:
+        return max(0, 100 - sum(r.weight for r in failed))
+
+    # ---------- BATCH EVALUATION ----------
+
+    def _compiled_matrices(self):
+        """
+        R x F required-field matrix, R severity weights and a C x R
+        "rule applies" matrix (row 0: default table, then one per gated
+        category), built on first batch call.
+        """
+        if self._matrices is None:
+            required = np.zeros((len(self.rules), len(self.fields)), dtype=np.float32)
+            for i, rule in enumerate(self.rules):
+                required[i, list(rule.columns)] = 1
+            weights = np.array([r.weight for r in self.rules], dtype=np.int64)
+
+            categories = {category: i + 1 for i, category in enumerate(sorted(self.gated))}
+            applies = np.zeros((len(categories) + 1, len(self.rules)), dtype=bool)
+            for i, rule in enumerate(self.rules):
+                applies[0, i] = rule in self.default_table
+                for category, row in categories.items():
+                    applies[row, i] = rule in self.tables[category]
+            self._matrices = (required, weights, categories, applies)
+        return self._matrices
+
+    def presence_matrix(self, field_values: list[dict]):
+        """N x F bool matrix from field -> bool dicts (column order: self.fields)."""
+        matrix = np.zeros((len(field_values), len(self.fields)), dtype=bool)
+        for i, values in enumerate(field_values):
+            matrix[i] = [bool(values.get(name, False)) for name in self.fields]
+        return matrix
+
+    def evaluate_batch(self, categories: list, presence) -> tuple[list[int], list[list[CompiledRule]]]:
+        """
+        Scores and failing rules (in table order) for N products at once:
+        one matrix product counts each rule's missing fields per product.
+        Same results as score(failures(category, mask)) per product.
+        """
+        if np is None:
+            results = [
+                self.failures(category, self.mask(dict(zip(self.fields, row))))
+                for category, row in zip(categories, presence)
+            ]
+            return [self.score(failed) for failed in results], results
+
+        required, weights, category_rows, applies = self._compiled_matrices()
+        presence = np.asarray(presence, dtype=bool)
+        missing_counts = (~presence).astype(np.float32) @ required.T
+        rows = np.array([category_rows.get(c, 0) for c in categories], dtype=np.intp)
+        failing = (missing_counts > 0) & applies[rows]
+
+        scores = np.maximum(0, 100 - failing.astype(np.int64) @ weights)
+        # Failing (product, rule) pairs come out row-major, i.e. in table order
+        products, rule_ids = np.nonzero(failing)
+        failed = [[] for _ in range(len(rows))]
+        rules = self.rules
+        for product, rule_id in zip(products.tolist(), rule_ids.tolist()):
+            failed[product].append(rules[rule_id])
+        return scores.tolist(), failed
+
+
+# ---------- PARITY CHECK ----------
+
+def _check_batch_parity(engine: RuleEngine, n: int = 20000, seed: int = 0):
+    """Random presence matrices through the batch and scalar paths; must agree."""
+    rng = random.Random(seed)
+    categories = [rng.choice([*engine.gated, "all", None, "other"]) for _ in range(n)]
+    rows = [[rng.random() < rng.random() for _ in engine.fields] for _ in range(n)]
+
+    masks = [engine.mask(dict(zip(engine.fields, row))) for row in rows]
+    presence = np.array(rows, dtype=bool)
+
+    start = time.perf_counter()
+    scalar_failed = [engine.failures(c, m) for c, m in zip(categories, masks)]
+    scalar_scores = [engine.score(failed) for failed in scalar_failed]
+    scalar_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    scores, failed_lists = engine.evaluate_batch(categories, presence)
+    batch_s = time.perf_counter() - start
+
+    assert scores == scalar_scores, "batch and scalar scores disagree"
+    for mask, row, a, b in zip(masks, presence, scalar_failed, failed_lists):
+        assert [(r.id, r.missing(mask)) for r in a] == [(r.id, r.missing_in_row(row)) for r in b]
+    print(f"{n} products: scalar {scalar_s * 1e3:.0f}ms, batch {batch_s * 1e3:.0f}ms (identical)")
+
+
+if __name__ == "__main__":
+    # python rule_engine.py -- both category modes used by the app
+    _check_batch_parity(RuleEngine())
+    _check_batch_parity(RuleEngine(gated=("electronics", "food", "health")))
@@ -1,43 +1,218 @@
-import time
-import random
-import re
-import json
-from urllib.parse import urlparse
-
-import requests
-from bs4 import BeautifulSoup
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+
 from fake_useragent import UserAgent
 
 from models import ProductData, Price
+from parsed_page import ParsedPage
+from dom import BACKENDS
+from structured_data import StructuredData, fast_path_stats
+import patterns
+from adapters import AdapterRegistry, FieldSpec, SiteAdapter
+from http_client import get_http_client, get_async_http_client
+from rate_limit import get_rate_limiter
+from page_cache import get_page_cache, CacheEntry
+from canonical import canonicalize_url, record_resolution, resolve_link
 
 ua = UserAgent()
 
-
-def scrape_product(url: str) -> ProductData:
-    domain = urlparse(url).netloc.lower()
-    html = _fetch_html(url)
-
-    if "flipkart.com" in domain:
-        return _scrape_flipkart(url, html)
-    elif "amazon.in" in domain or "amazon.com" in domain or "amzn.in" in domain:
-        return _scrape_amazon(url, html)
-    else:
-        # LimeRoad, Myntra, Ajio, etc.
-        return _scrape_generic(url, html)
-
-
-def _fetch_html(url: str) -> str:
-    headers = {
+# HTML parsing is CPU-bound; the async engine runs it here so the event
+# loop keeps serving other scans.
+PARSE_WORKERS = int(os.getenv("SCRAPER_PARSE_WORKERS", "4"))
+parse_executor = ThreadPoolExecutor(max_workers=PARSE_WORKERS, thread_name_prefix="parse")
+
+# Page-text fallbacks (prices, % off, description) only read this much
+# visible text, however large the page is
+TEXT_SCAN_CHARS = int(os.getenv("SCRAPER_TEXT_SCAN_CHARS", "20000"))
+
+
+class FetchedPage:
+    """
+    A single HTTP response, fetched once and shared by every scan stage
+    (scraper, dark-pattern detector, ...).
+    """
+
+    def __init__(self, url: str, final_url: str, status_code: int, headers: dict,
+                 content: bytes, encoding: str | None = None,
+                 canonical_url: str | None = None):
+        self.url = url
+        self.final_url = final_url
+        # Cache / dedup / history key for the product (see canonical.py)
+        self.canonical_url = canonical_url or final_url
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.encoding = encoding or "utf-8"
+        self._text = None
+
+    @property
+    def text(self) -> str:
+        if self._text is None:
+            self._text = self.content.decode(self.encoding, errors="replace")
+        return self._text
+
+
+def scrape_product(url: str, use_cache: bool = True) -> ProductData:
+    page = fetch_page(url, use_cache=use_cache)
+    return scrape_product_from_html(url, page.text, final_url=page.final_url)
+
+
+def scrape_product_from_html(url: str, html: str, final_url: str | None = None) -> ProductData:
+    """
+    Run the site scraper on already-fetched HTML.
+    Dispatch uses the post-redirect URL when known (e.g. amzn.in short links).
+    """
+    return scrape_product_from_page(url, ParsedPage(html, final_url or url), final_url)
+
+
+def scrape_product_from_page(url: str, page: ParsedPage, final_url: str | None = None) -> ProductData:
+    """Same as scrape_product_from_html, on a page the caller keeps using."""
+    return ADAPTERS.for_url(final_url or url).scrape(url, page)
+
+
+def compare_dom_backends(url: str, html: str) -> list[str]:
+    """
+    Parity check: scrape the same HTML with every DOM backend and list the
+    ProductData fields that differ from the BeautifulSoup result.
+    """
+    results = {}
+    for backend in BACKENDS:
+        product = scrape_product_from_page(url, ParsedPage(html, url, backend=backend))
+        results[backend] = product.model_dump(exclude={"timestamp"})
+
+    reference = results["soup"]
+    diffs = []
+    for backend, data in results.items():
+        for field, value in data.items():
+            if value != reference[field]:
+                diffs.append(f"{backend}.{field}: {value!r} != {reference[field]!r}")
+    return diffs
+
+
+def _request_headers() -> dict:
+    return {
         "User-Agent": ua.random,
         "Accept-Language": "en-IN,en;q=0.9",
         "Referer": "https://www.google.com/",
     }
 
-    time.sleep(random.uniform(1, 2))
 
-    resp = requests.get(url, headers=headers, timeout=15)
+def _lookup_cache(target: str, use_cache: bool):
+    """
+    Returns (cached entry or None, extra request headers) for a canonical
+    target URL. A fresh entry means no request is needed at all.
+    """
+    cache = get_page_cache()
+    if not use_cache:
+        cache.record_bypass()
+        return None, {}
+    entry = cache.get(target)
+    return entry, (entry.validators() if entry else {})
+
+
+def _page_from_cache(url: str, entry: CacheEntry) -> FetchedPage:
+    return FetchedPage(
+        url=url,
+        final_url=entry.final_url,
+        status_code=entry.status_code,
+        headers=entry.headers,
+        content=entry.content,
+        encoding=entry.encoding,
+        canonical_url=entry.key,
+    )
+
+
+def _store_page(page: FetchedPage):
+    get_page_cache().put(
+        page.canonical_url,
+        url=page.url,
+        final_url=page.final_url,
+        status_code=page.status_code,
+        headers=page.headers,
+        content=page.content,
+        encoding=page.encoding,
+    )
+
+
+def fetch_page(url: str, use_cache: bool = True) -> FetchedPage:
+    # Fetch the URL as given (known short links resolved); the canonical
+    # form is only the cache key
+    source = resolve_link(url)
+    target = canonicalize_url(source)
+    entry, validators = _lookup_cache(target, use_cache)
+    if entry and entry.fresh:
+        return _page_from_cache(url, entry)
+
+    headers = _request_headers()
+    headers.update(validators)
+
+    # Politeness: only waits when this domain's request budget is used up
+    get_rate_limiter().wait(source)
+
+    resp = get_http_client().get(source, headers=headers)
+    if entry and resp.status_code == 304:
+        get_page_cache().mark_revalidated(entry.key, dict(resp.headers))
+        return _page_from_cache(url, entry)
+
+    resp.raise_for_status()
+    page = FetchedPage(
+        url=url,
+        final_url=resp.url,
+        status_code=resp.status_code,
+        headers=dict(resp.headers),
+        content=resp.content,
+        encoding=resp.encoding or resp.apparent_encoding,
+        canonical_url=record_resolution(source, resp.url),
+    )
+    _store_page(page)
+    return page
+
+
+async def fetch_page_async(url: str, use_cache: bool = True) -> FetchedPage:
+    source = await asyncio.to_thread(resolve_link, url)
+    target = canonicalize_url(source)
+    entry, validators = await asyncio.to_thread(_lookup_cache, target, use_cache)
+    if entry and entry.fresh:
+        return _page_from_cache(url, entry)
+
+    headers = _request_headers()
+    headers.update(validators)
+
+    delay = await asyncio.to_thread(get_rate_limiter().reserve, source)
+    if delay > 0:
+        await asyncio.sleep(delay)
+
+    resp = await get_async_http_client().get(source, headers=headers)
+    if entry and resp.status_code == 304:
+        await asyncio.to_thread(get_page_cache().mark_revalidated, entry.key, dict(resp.headers))
+        return _page_from_cache(url, entry)
+
     resp.raise_for_status()
-    return resp.text
+    canonical_url = await asyncio.to_thread(record_resolution, source, str(resp.url))
+    page = FetchedPage(
+        url=url,
+        final_url=str(resp.url),
+        status_code=resp.status_code,
+        headers=dict(resp.headers),
+        content=resp.content,
+        encoding=resp.encoding,
+        canonical_url=canonical_url,
+    )
+    await asyncio.to_thread(_store_page, page)
+    return page
+
+
+async def scrape_product_async(url: str, use_cache: bool = True) -> ProductData:
+    page = await fetch_page_async(url, use_cache=use_cache)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        parse_executor, scrape_product_from_html, url, page.text, page.final_url
+    )
+
+
+def _fetch_html(url: str) -> str:
+    return fetch_page(url).text
 
 
 # ---------- COMMON HELPERS ----------
@@ -50,326 +225,302 @@ def _safe_float(value: str):
 
 
 def _extract_price(text: str):
-    match = re.search(r"₹\s*([\d,]+(?:\.\d+)?)", text)
+    match = patterns.RUPEE_PRICE.search(text)
     if not match:
         return None
     return _safe_float(match.group(1).replace(",", ""))
 
 
-def _extract_json_ld_product(soup: BeautifulSoup):
-    scripts = soup.find_all("script", type="application/ld+json")
-    for script in scripts:
-        try:
-            data = json.loads(script.string or script.text or "")
-        except Exception:
-            continue
-
-        candidates = []
-        if isinstance(data, dict):
-            candidates = [data]
-        elif isinstance(data, list):
-            candidates = data
-
-        for item in candidates:
-            if not isinstance(item, dict):
-                continue
-            t = item.get("@type")
-            if t == "Product" or (isinstance(t, list) and "Product" in t):
-                return item
-
-            if "@graph" in item and isinstance(item["@graph"], list):
-                for g in item["@graph"]:
-                    if isinstance(g, dict):
-                        gt = g.get("@type")
-                        if gt == "Product" or (isinstance(gt, list) and "Product" in gt):
-                            return g
-    return None
+# ---------- SHARED FIELD HELPERS ----------
 
+def _text_stripped(node) -> str:
+    return node.text.strip()
 
-# ---------- FLIPKART SCRAPER ----------
 
-def _scrape_flipkart(url: str, html: str) -> ProductData:
-    soup = BeautifulSoup(html, "lxml")
+def _spaced_text(node) -> str:
+    return node.get_text(" ", strip=True)
 
-    # TITLE
-    title_el = (
-        soup.select_one("span.B_NuCI")
-        or soup.select_one('span[dir="auto"]')
-    )
-    title = title_el.get_text(strip=True) if title_el else "No title found"
 
-    # PRICE
-    mrp = None
-    deal = None
-    discount_text = None
+def _joined(separator: str, limit: int, skip_empty: bool = False):
+    def join(items: list):
+        if skip_empty:
+            items = [item for item in items if item]
+            if not items:
+                return None
+        return separator.join(items)[:limit]
+    return join
 
-    deal_el = soup.select_one("div._30jeq3._16Jk6d") or soup.select_one("div._30jeq3")
-    if deal_el:
-        deal_str = deal_el.get_text(strip=True)
-        deal = _extract_price(deal_str)
-
-    mrp_el = soup.select_one("div._3I9_wc._2p6lqe")
-    if mrp_el:
-        mrp_str = mrp_el.get_text(strip=True)
-        possible_mrp = _extract_price(mrp_str)
-        if possible_mrp:
-            mrp = possible_mrp
-
-    if mrp is None and deal is not None:
-        mrp = deal
-    if deal is None and mrp is not None:
-        deal = mrp
-
-    discount_el = (
-        soup.find("div", string=re.compile(r"\d+% off", re.I))
-        or soup.find("span", string=re.compile(r"\d+% off", re.I))
-    )
-    if discount_el:
-        discount_text = discount_el.get_text(strip=True)
 
-    if not discount_text and mrp and deal and mrp > deal:
+def _constant(value):
+    return lambda page, values: value
+
+
+def _price_or_none(text: str):
+    return _extract_price(text) or None
+
+
+def _any_amount(text: str):
+    """Price from a price label, with or without the ₹ sign."""
+    price = _extract_price(text)
+    if price is None:
+        m = patterns.AMOUNT.search(text)
+        if m:
+            price = _safe_float(m.group(1).replace(",", ""))
+    return price
+
+
+def _percent_off(text: str):
+    m = patterns.PERCENT_OFF.search(text)
+    return f"{m.group(1)}% off" if m else text
+
+
+def _fill_missing_prices(page: ParsedPage, values: dict):
+    """Only one of MRP / deal found: use it for both."""
+    if not values.get("mrp") and values.get("deal"):
+        values["mrp"] = values["deal"]
+    if not values.get("deal") and values.get("mrp"):
+        values["deal"] = values["mrp"]
+
+
+def _computed_discount(page: ParsedPage, values: dict):
+    mrp, deal = values.get("mrp"), values.get("deal")
+    if not values.get("discount") and mrp and deal and mrp > deal:
         pct = round((mrp - deal) / mrp * 100)
-        discount_text = f"{pct}% off"
+        values["discount"] = f"{pct}% off"
 
-    # SELLER (display name)
-    seller_display = "Unknown seller"
-    seller_label = soup.find("span", string=re.compile(r"Seller", re.I))
-    if seller_label:
-        parent = seller_label.find_parent()
-        if parent:
-            seller_name_el = parent.find_next("span")
-            if seller_name_el:
-                seller_display = seller_name_el.get_text(strip=True)
-
-    # RETURNS (short)
-    returns_short = None
-    for node in soup.select("span, div, li"):
-        txt = node.get_text(strip=True)
-        if re.search(r"\b\d+\s*day[s]?\s+(Replacement|Returnable)", txt, re.I):
-            returns_short = txt[:120]
-            break
-
-    # HIGHLIGHTS as description
-    description = None
-    highlights = soup.select("li._21Ahn-")
-    if highlights:
-        items = [li.get_text(" ", strip=True) for li in highlights]
-        description = " | ".join(items)[:400]
-    else:
-        full_text = soup.get_text(separator=" ", strip=True)
-        description = full_text[:400] if full_text else None
-
-    # Build structured ProductData
-    price_obj = Price(mrp=mrp, deal=deal, discount=discount_text)
 
-    product = ProductData(
-        url=url,
-        title=title[:150],
-        brand=None,  # could be parsed from specs later
-        seller=seller_display,
-        seller_legal_name=None,
-        seller_address=None,
-        seller_contact=None,
-        importer_details=None,
-        price=price_obj,
-        total_price=deal,
-        taxes_included=None,
-        extra_charges=None,
-        description=description,
-        manufacturer=None,
-        net_quantity=None,
-        unit=None,
-        country_of_origin=None,
-        expiry_date=None,
-        ingredients=None,
-        nutrition_info=None,
-        warnings=None,
-        usage_instructions=None,
-        returns=returns_short,
-        return_policy_text=None,
-        delivery=None,
-        delivery_estimate_text=None,
-        warranty=None,
-        warranty_text=None,
-        grievance_officer_details=None,
-        technical_details=None,  # you can later fill with spec table like Amazon
+def _total_is_deal(page: ParsedPage, values: dict):
+    values["total_price"] = values.get("deal")
+
+
+def _returns_finder(names, pattern):
+    """First element whose text mentions an N-day return window (via the text index)."""
+    def extract(page: ParsedPage, values: dict):
+        found = page.text_index.find_first(names, pattern)
+        return found[1][:120] if found else None
+    return extract
+
+
+# ---------- FLIPKART ----------
+
+def _flipkart_discount(page: ParsedPage, values: dict):
+    el = (
+        page.doc.find("div", string=patterns.FK_DISCOUNT)
+        or page.doc.find("span", string=patterns.FK_DISCOUNT)
     )
+    return el.get_text(strip=True) if el else None
+
+
+def _flipkart_seller(page: ParsedPage, values: dict):
+    # The value sits in the span after the one labelled "Seller"
+    label = page.doc.find("span", string=patterns.FK_SELLER_LABEL)
+    parent = label.find_parent() if label else None
+    el = parent.find_next("span") if parent else None
+    return el.get_text(strip=True) if el else None
+
+
+def _flipkart_mutual_prices(page: ParsedPage, values: dict):
+    if values["mrp"] is None and values["deal"] is not None:
+        values["mrp"] = values["deal"]
+    if values["deal"] is None and values["mrp"] is not None:
+        values["deal"] = values["mrp"]
+
+
+FLIPKART = SiteAdapter(
+    "flipkart",
+    domains=("flipkart.com",),
+    fields={
+        "title": FieldSpec(
+            selectors=(patterns.FK_TITLE, patterns.FK_TITLE_FALLBACK),
+            fallback=_constant("No title found"),
+        ),
+        "deal": FieldSpec(
+            selectors=(patterns.FK_DEAL, patterns.FK_DEAL_FALLBACK),
+            post=(_extract_price,),
+        ),
+        "mrp": FieldSpec(selectors=(patterns.FK_MRP,), post=(_price_or_none,)),
+        "discount": FieldSpec(extract=_flipkart_discount),
+        "seller": FieldSpec(extract=_flipkart_seller, fallback=_constant("Unknown seller")),
+        "returns": FieldSpec(
+            extract=_returns_finder(("span", "div", "li"), patterns.FK_RETURNS)
+        ),
+        # Highlights, else the start of the page text
+        "description": FieldSpec(
+            selectors=(patterns.FK_HIGHLIGHTS,),
+            many=True,
+            read=_spaced_text,
+            post=(_joined(" | ", 400),),
+            fallback=lambda page, values: page.text_prefix(400) or None,
+        ),
+    },
+    finalize=(_flipkart_mutual_prices, _computed_discount, _total_is_deal),
+)
+
+
+# ---------- AMAZON ----------
+
+def _amazon_block_price(block):
+    """Whole + fraction parts of an a-price block."""
+    whole = patterns.AMZ_PRICE_WHOLE.one(block)
+    if not whole:
+        return None
+    price_str = whole.text.replace(",", "").strip()
+    frac = patterns.AMZ_PRICE_FRACTION.one(block)
+    if frac:
+        price_str = f"{price_str}.{frac.text.strip()}"
+    return _safe_float(price_str)
+
+
+def _amazon_deal(page: ParsedPage, values: dict):
+    # First a-price that is not the crossed-out MRP
+    for block in patterns.AMZ_PRICE_BLOCKS.all(page.doc):
+        if "a-text-price" not in block.classes:
+            return _amazon_block_price(block)
+    return None
 
-    return product
 
+def _amazon_discount(page: ParsedPage, values: dict):
+    el = page.doc.find("span", string=patterns.AMZ_DISCOUNT)
+    return el.get_text(strip=True) if el else None
 
-# ---------- AMAZON SCRAPER ----------
-
-def _scrape_amazon(url: str, html: str) -> ProductData:
-    soup = BeautifulSoup(html, "lxml")
-
-    # ---------- TITLE ----------
-    title_el = soup.select_one("#productTitle") or soup.select_one("h1 span")
-    if title_el:
-        title = title_el.text.strip()
-    else:
-        ttag = soup.find("title")
-        title = ttag.get_text(strip=True) if ttag else "No title found"
-
-    # ---------- PRICE BLOCK (MRP + DEAL) ----------
-    mrp_price = None
-    deal_price = None
-
-    # 1) MRP / crossed price
-    mrp_block = soup.select_one("span.a-price.a-text-price")
-    if mrp_block:
-        mrp_whole = mrp_block.select_one("span.a-price-whole")
-        mrp_frac = mrp_block.select_one("span.a-price-fraction")
-        if mrp_whole:
-            mrp_str = mrp_whole.text.replace(",", "").strip()
-            if mrp_frac:
-                mrp_str = f"{mrp_str}.{mrp_frac.text.strip()}"
-            mrp_price = _safe_float(mrp_str)
-
-    # 2) Deal price: first non-crossed a-price
-    deal_block = None
-    for block in soup.select("span.a-price"):
-        classes = block.get("class", [])
-        if "a-text-price" not in classes:
-            deal_block = block
-            break
-
-    if deal_block:
-        whole = deal_block.select_one("span.a-price-whole")
-        frac = deal_block.select_one("span.a-price-fraction")
-        if whole:
-            deal_str = whole.text.replace(",", "").strip()
-            if frac:
-                deal_str = f"{deal_str}.{frac.text.strip()}"
-            deal_price = _safe_float(deal_str)
-
-    # 3) Fallback generic ₹pattern
-    if not mrp_price and not deal_price:
-        text = soup.get_text(separator=" ", strip=True)
-        generic_price = _extract_price(text)
-        if generic_price:
-            deal_price = generic_price
-
-    if not mrp_price and deal_price:
-        mrp_price = deal_price
-    if not deal_price and mrp_price:
-        deal_price = mrp_price
-
-    # Discount text
-    discount_text = None
-    explicit_span = soup.find("span", string=re.compile(r"-?\d+%(\s*off)?", re.I))
-    if explicit_span:
-        discount_text = explicit_span.get_text(strip=True)
-    if not discount_text and mrp_price and deal_price and mrp_price > deal_price:
-        pct = round((mrp_price - deal_price) / mrp_price * 100)
-        discount_text = f"{pct}% off"
 
-    # ---------- SELLER ----------
-    seller_el = soup.select_one("#sellerProfileTriggerId")
-    seller_display = seller_el.text.strip() if seller_el else "Amazon"
+def _amazon_page_price(page: ParsedPage, values: dict):
+    """No price block at all: first ₹ amount on the page."""
+    if not values["mrp"] and not values["deal"]:
+        price = _extract_price(page.text_prefix(TEXT_SCAN_CHARS))
+        if price:
+            values["deal"] = price
 
-    # ---------- RETURNS (SHORT) ----------
-    returns_short = None
-    returns_container = soup.find(
-        id=re.compile(r"RETURNS_POLICY|RETURNS-FEATURE", re.I)
-    ) or soup.find("div", string=re.compile(r"Returns", re.I))
-
-    if returns_container:
-        returns_text = returns_container.get_text(separator=" ", strip=True)
-        returns_short = returns_text[:120]
-    else:
-        for node in soup.select("span, li, div"):
-            txt = node.get_text(strip=True)
-            if re.search(r"\b\d+\s*-?\s*day[s]?\s+return", txt, re.I):
-                returns_short = txt[:120]
-                break
 
-    # ---------- TECHNICAL DETAILS (KEY:VALUE LINES) ----------
-    technical_details = None
-    rows = []
+def _amazon_returns_container(page: ParsedPage, values: dict):
+    return page.doc.find(
+        attrs={"id": patterns.AMZ_RETURNS_ID}
+    ) or page.doc.find("div", string=patterns.AMZ_RETURNS_LABEL)
+
+
+_amazon_returns_text = _returns_finder(("span", "li", "div"), patterns.AMZ_RETURNS)
+
+
+def _amazon_returns(page: ParsedPage, values: dict):
+    container = values["_returns_container"]
+    if container:
+        return container.get_text(separator=" ", strip=True)[:120]
+    return _amazon_returns_text(page, values)
+
+
+def _amazon_policy_text(page: ParsedPage, values: dict):
+    """Returns block + delivery / shipping estimate block."""
+    chunks = []
+    if values["_returns_container"]:
+        chunks.append(values["_returns_container"].get_text(" ", strip=True))
 
-    tech_table = soup.find(
-        "table",
-        id=re.compile(r"productDetails_techSpec|productDetails_detailBullets", re.I),
-    )
-    if tech_table:
-        for row in tech_table.select("tr"):
-            cells = row.find_all(["th", "td"])
-            if len(cells) >= 2:
-                key = cells[0].get_text(" ", strip=True)
-                val = cells[1].get_text(" ", strip=True)
-                rows.append(f"{key}: {val}")
-
-    if not rows:
-        heading = soup.find(
-            lambda tag: tag.name in ["h1", "h2", "h3", "span"]
-            and re.search(r"Technical Details|Product Details", tag.get_text(), re.I)
-        )
-        if heading:
-            container = heading.find_parent()
-            next_table = container.find_next("table")
-            if next_table:
-                for row in next_table.select("tr"):
-                    cells = row.find_all(["th", "td"])
-                    if len(cells) >= 2:
-                        key = cells[0].get_text(" ", strip=True)
-                        val = cells[1].get_text(" ", strip=True)
-                        rows.append(f"{key}: {val}")
-
-    if rows:
-        technical_details = " | ".join(rows)
-
-    # ---------- DETAIL BULLETS (FEATURES) ----------
-    detail_bullets = []
-    for li in soup.select("#feature-bullets li, #feature-bullets span.a-list-item"):
-        txt = li.get_text(" ", strip=True)
-        if txt:
-            detail_bullets.append(txt)
-    detail_bullets_text = " | ".join(detail_bullets)[:2000] if detail_bullets else None
-
-    # ---------- POLICY TEXT (RETURNS + DELIVERY) ----------
-    policy_chunks = []
-
-    if returns_container:
-        policy_chunks.append(returns_container.get_text(" ", strip=True))
-
-    # Delivery / shipping estimate block (common IDs/classes)
     delivery_el = (
-        soup.find(id=re.compile(r"deliveryMessage", re.I))
-        or soup.find(id=re.compile(r"ddmDeliveryMessage", re.I))
-        or soup.select_one("#mir-layout-DELIVERY_BLOCK_SLOT, #deliveryBlockMessage")
+        page.doc.find(attrs={"id": patterns.AMZ_DELIVERY_ID})
+        or page.doc.find(attrs={"id": patterns.AMZ_DDM_DELIVERY_ID})
+        or patterns.AMZ_DELIVERY_BLOCK.one(page.doc)
     )
     if delivery_el:
-        policy_chunks.append(delivery_el.get_text(" ", strip=True))
+        chunks.append(delivery_el.get_text(" ", strip=True))
 
-    policy_text = " | ".join(policy_chunks)[:2000] if policy_chunks else None
+    return " | ".join(chunks)[:2000] if chunks else None
 
-    # ---------- FULL PAGE TEXT (FALLBACK, SHORTENED) ----------
-    full_text = soup.get_text(separator=" ", strip=True)
-    full_page_text = full_text[:4000] if full_text else None
 
-    # ---------- BUILD PRODUCT DATA ----------
-    price_obj = Price(
-        mrp=mrp_price or deal_price,
-        deal=deal_price or mrp_price,
-        discount=discount_text,
-    )
+def _table_rows(table) -> list[str]:
+    rows = []
+    for row in patterns.AMZ_TABLE_ROWS.all(table):
+        cells = row.find_all(["th", "td"])
+        if len(cells) >= 2:
+            key = cells[0].get_text(" ", strip=True)
+            val = cells[1].get_text(" ", strip=True)
+            rows.append(f"{key}: {val}")
+    return rows
+
+
+def _amazon_spec_table(page: ParsedPage, values: dict):
+    """Spec table by id, as "key: value | ..." lines."""
+    tech_table = page.doc.find("table", {"id": patterns.AMZ_TECH_TABLE_ID})
+    rows = _table_rows(tech_table) if tech_table else []
+    return " | ".join(rows) if rows else None
+
+
+def _amazon_spec_heading_table(page: ParsedPage, values: dict):
+    """First table after a "Technical Details" / "Product Details" heading."""
+    heading = page.doc.find_by_text(["h1", "h2", "h3", "span"], patterns.AMZ_TECH_HEADING)
+    if not heading:
+        return None
+    next_table = heading.find_parent().find_next("table")
+    rows = _table_rows(next_table) if next_table else []
+    return " | ".join(rows) if rows else None
+
+
+def _amazon_title_tag(page: ParsedPage, values: dict):
+    ttag = page.doc.title
+    return ttag.get_text(strip=True) if ttag else "No title found"
+
+
+AMAZON = SiteAdapter(
+    "amazon",
+    domains=("amazon.in", "amazon.com", "amzn.in"),
+    fields={
+        "title": FieldSpec(
+            selectors=(patterns.AMZ_TITLE, patterns.AMZ_TITLE_FALLBACK),
+            read=_text_stripped,
+            fallback=_amazon_title_tag,
+        ),
+        "mrp": FieldSpec(selectors=(patterns.AMZ_MRP_BLOCK,), read=_amazon_block_price),
+        "deal": FieldSpec(extract=_amazon_deal),
+        "discount": FieldSpec(extract=_amazon_discount),
+        "seller": FieldSpec(
+            selectors=(patterns.AMZ_SELLER,),
+            read=_text_stripped,
+            fallback=_constant("Amazon"),
+        ),
+        "_returns_container": FieldSpec(extract=_amazon_returns_container),
+        "returns": FieldSpec(extract=_amazon_returns),
+        "technical_details": FieldSpec(
+            selectors=(_amazon_spec_table, _amazon_spec_heading_table),
+        ),
+        # Feature bullets are the description
+        "description": FieldSpec(
+            selectors=(patterns.AMZ_BULLETS,),
+            many=True,
+            read=_spaced_text,
+            post=(_joined(" | ", 2000, skip_empty=True),),
+        ),
+        "return_policy_text": FieldSpec(extract=_amazon_policy_text),
+    },
+    finalize=(_amazon_page_price, _fill_missing_prices, _computed_discount, _total_is_deal),
+)
 
-    product = ProductData(
+
+# ---------- GENERIC SCRAPER ----------
+
+def _product_from_structured(url: str, structured: StructuredData) -> ProductData:
+    """ProductData from JSON-LD alone (every REQUIRED_FIELDS entry present)."""
+    fields = structured.fields
+    mrp = fields["list_price"]
+    deal = fields["price"]
+
+    discount_text = None
+    if mrp and deal and mrp > deal:
+        pct = round((mrp - deal) / mrp * 100)
+        discount_text = f"{pct}% off"
+
+    return ProductData(
         url=url,
-        title=title[:150],
-        brand=None,                 # brand will come later from AI / tech table
-        seller=seller_display,
-        seller_legal_name=None,
+        title=fields["title"][:150],
+        brand=fields["brand"],
+        seller=fields["seller"],
+        seller_legal_name=fields["seller"],
         seller_address=None,
         seller_contact=None,
         importer_details=None,
-        price=price_obj,
-        total_price=deal_price,
+        price=Price(mrp=mrp, deal=deal, discount=discount_text),
+        total_price=deal,
         taxes_included=None,
         extra_charges=None,
-        description=detail_bullets_text,    # use bullets as main description for now
-        manufacturer=None,
+        description=structured.description[:400],
+        manufacturer=fields["manufacturer"],
         net_quantity=None,
         unit=None,
         country_of_origin=None,
@@ -378,74 +529,46 @@ def _scrape_amazon(url: str, html: str) -> ProductData:
         nutrition_info=None,
         warnings=None,
         usage_instructions=None,
-        returns=returns_short,
-        return_policy_text=policy_text,
+        returns=f"{fields['return_days']} days return",
+        return_policy_text=None,
         delivery=None,
         delivery_estimate_text=None,
         warranty=None,
         warranty_text=None,
         grievance_officer_details=None,
-        technical_details=technical_details,  # still the key:value lines
+        technical_details=None,
     )
 
-    # If you want, you can also store full_page_text somewhere later
-    # (either add a new field to ProductData, or pass it only to AI).
 
-    return product
+def _scrape_generic(url: str, page: ParsedPage) -> ProductData:
+    page = ParsedPage.ensure(page)
 
+    # JSON-LD / OpenGraph straight from the HTML; often enough on its own
+    structured = page.structured
+    missing = structured.missing()
+    fast_path_stats.record(missing)
+    if not missing:
+        return _product_from_structured(url, structured)
 
-# ---------- GENERIC SCRAPER ----------
+    doc = page.doc
+    fields = structured.fields
 
-def _scrape_generic(url: str, html: str) -> ProductData:
-    soup = BeautifulSoup(html, "lxml")
-
-    # JSON-LD first (if present)
-    ld_product = _extract_json_ld_product(soup)
-
-    title = None
-    brand = None
-    description = None
-    seller_legal_name = None
-    manufacturer = None
-    total_price = None
-
-    if ld_product:
-        title = ld_product.get("name") or ld_product.get("headline")
-        description = ld_product.get("description")
-
-        brand_field = ld_product.get("brand")
-        if isinstance(brand_field, dict):
-            brand = brand_field.get("name")
-        elif isinstance(brand_field, str):
-            brand = brand_field
-
-        offers = ld_product.get("offers")
-        if isinstance(offers, dict):
-            price_value = offers.get("price")
-            try:
-                total_price = float(price_value)
-            except (TypeError, ValueError):
-                total_price = None
-
-            seller_obj = offers.get("seller")
-            if isinstance(seller_obj, dict):
-                seller_legal_name = seller_obj.get("name")
-
-        manufacturer_field = ld_product.get("manufacturer")
-        if isinstance(manufacturer_field, dict):
-            manufacturer = manufacturer_field.get("name")
-        elif isinstance(manufacturer_field, str):
-            manufacturer = manufacturer_field
+    title = fields["title"]
+    brand = fields["brand"]
+    description = fields["description"]
+    seller_legal_name = fields["seller"]
+    manufacturer = fields["manufacturer"]
+    total_price = fields["price"]
 
     # TITLE fallback
     if not title:
-        og_title = soup.find("meta", property="og:title")
+        og_title = doc.find("meta", {"property": "og:title"})
         if og_title and og_title.get("content"):
-            title = og_title["content"].strip()
-    if not title and soup.title and soup.title.string:
-        title = soup.title.string.strip()
+            title = og_title.get("content").strip()
+    if not title and doc.title and doc.title.string:
+        title = doc.title.string.strip()
     if not title:
-        h1 = soup.find("h1")
+        h1 = doc.find("h1")
         if h1:
             title = h1.get_text(strip=True)
     if not title:
@@ -456,12 +579,12 @@ def _scrape_generic(url: str, html: str) -> ProductData:
     deal = None
     discount_text = None
 
-    full_text = soup.get_text(separator=" ", strip=True)
+    full_text = page.text_prefix(TEXT_SCAN_CHARS)
 
     deal = _extract_price(full_text)
     mrp = deal
 
-    prices = re.findall(r"₹\s*([\d,]+(?:\.\d+)?)", full_text)
+    prices = patterns.RUPEE_PRICE.findall(full_text)
     if len(prices) >= 2:
         nums = [_safe_float(p.replace(",", "")) for p in prices]
         nums = [n for n in nums if n is not None]
@@ -470,7 +593,7 @@ def _scrape_generic(url: str, html: str) -> ProductData:
             low = min(nums)
             mrp, deal = high, low
 
-    m = re.search(r"(\d+)%\s*off", full_text, re.I)
+    m = patterns.PERCENT_OFF.search(full_text)
     if m:
         discount_text = f"{m.group(1)}% off"
 
@@ -480,38 +603,35 @@ def _scrape_generic(url: str, html: str) -> ProductData:
 
     # SELLER display
     seller_display = "Unknown seller"
-    seller_label = soup.find(string=re.compile(r"Brand|Seller|Sold by", re.I))
-    if seller_label:
-        parent = seller_label.find_parent()
-        if parent:
-            cand = parent.find_next(["strong", "span", "div"])
-            if cand:
-                seller_display = cand.get_text(strip=True)
+    # Matches script and comment text too, like BeautifulSoup's find(string=...)
+    parent = doc.find_string(patterns.GEN_SELLER_LABEL)
+    if parent:
+        cand = parent.find_next(["strong", "span", "div"])
+        if cand:
+            seller_display = cand.get_text(strip=True)
 
     # RETURNS short
     returns_short = None
-    for node in soup.select("span, div, li"):
-        txt = node.get_text(strip=True)
-        if re.search(r"\b\d+\s*day[s]?\s+(return|refund|replacement|returnable)", txt, re.I):
-            returns_short = txt[:120]
-            break
+    found = page.text_index.find_first(("span", "div", "li"), patterns.GEN_RETURNS)
+    if found:
+        returns_short = found[1][:120]
 
     # DESCRIPTION
     if not description:
-        meta_desc = soup.find("meta", attrs={"name": "description"})
+        meta_desc = doc.find("meta", {"name": "description"})
         if meta_desc and meta_desc.get("content"):
-            description = meta_desc["content"].strip()
+            description = meta_desc.get("content").strip()
 
     if not description:
         desc_div = (
-            soup.find("div", id=re.compile(r"productDescription|description", re.I))
-            or soup.find("div", class_=re.compile(r"description|prod-desc|product-info", re.I))
+            doc.find("div", {"id": patterns.GEN_DESCRIPTION_ID})
+            or doc.find("div", {"class": patterns.GEN_DESCRIPTION_CLASS})
         )
         if desc_div:
             description = desc_div.get_text(" ", strip=True)
 
     if not description:
-        for p in soup.find_all("p"):
+        for p in doc.find_all("p"):
             txt = p.get_text(" ", strip=True)
             if len(txt) > 50:
                 description = txt
@@ -561,6 +681,61 @@ def _scrape_generic(url: str, html: str) -> ProductData:
     return product
 
 
+# ---------- SITE ADAPTER REGISTRY ----------
+
+GENERIC = SiteAdapter("generic", scrape=_scrape_generic)
+
+
+# ---------- MARKETPLACE ADAPTERS ----------
+# Selectors for the server-rendered parts of these sites; anything they
+# miss keeps the generic scraper's value.
+
+MYNTRA = SiteAdapter(
+    "myntra",
+    domains=("myntra.com",),
+    base=GENERIC,
+    fields={
+        "title": FieldSpec(selectors=("h1.pdp-name",)),
+        "brand": FieldSpec(selectors=("h1.pdp-title",)),
+        "deal": FieldSpec(selectors=("span.pdp-price strong",), post=(_any_amount,)),
+        "mrp": FieldSpec(selectors=("span.pdp-mrp s",), post=(_any_amount,)),
+        "discount": FieldSpec(selectors=("span.pdp-discount",), post=(_percent_off,)),
+        "seller": FieldSpec(selectors=("span.supplier-productSellerName",)),
+    },
+    finalize=(_fill_missing_prices, _computed_discount, _total_is_deal),
+)
+
+AJIO = SiteAdapter(
+    "ajio",
+    domains=("ajio.com",),
+    base=GENERIC,
+    fields={
+        "title": FieldSpec(selectors=("h1.prod-name",)),
+        "brand": FieldSpec(selectors=("h2.brand-name",)),
+        "deal": FieldSpec(selectors=("div.prod-sp",), post=(_any_amount,)),
+        "mrp": FieldSpec(selectors=("span.prod-cp",), post=(_any_amount,)),
+        "discount": FieldSpec(selectors=("span.prod-discnt",), post=(_percent_off,)),
+    },
+    finalize=(_fill_missing_prices, _computed_discount, _total_is_deal),
+)
+
+MEESHO = SiteAdapter(
+    "meesho",
+    domains=("meesho.com",),
+    base=GENERIC,
+    fields={
+        "deal": FieldSpec(selectors=("h4",), post=(_any_amount,)),
+        "mrp": FieldSpec(selectors=("h4 ~ p del", "p del"), post=(_any_amount,)),
+        "discount": FieldSpec(selectors=("h4 ~ span",), post=(_percent_off,)),
+    },
+    finalize=(_fill_missing_prices, _computed_discount, _total_is_deal),
+)
+
+
+# Compiled once at import; LimeRoad and every other site use GENERIC
+ADAPTERS = AdapterRegistry([FLIPKART, AMAZON, MYNTRA, AJIO, MEESHO], default=GENERIC)
+
+
 if __name__ == "__main__":
     test_urls = [
         "https://amzn.in/d/9ZX3RdP",
@@ -0,0 +1,181 @@
+import os
+import sqlite3
+import threading
+import time
+
+
+# ---------- CONFIG ----------
+
+SELECTOR_STATS_DB = os.getenv(
+    "SCRAPER_SELECTOR_STATS_DB",
+    os.path.join(os.getenv("SCRAPER_CACHE_DIR", ".cache"), "selectors.db"),
+)
+# Attempts needed before a selector's success rate is trusted (stale
+# alerts); a selector with no hit in its last MIN_SAMPLES attempts on a
+# domain is skipped there while another selector matches
+MIN_SAMPLES = int(os.getenv("SCRAPER_SELECTOR_MIN_SAMPLES", "20"))
+# Every Nth lookup per (domain, field) uses the full declared order, so
+# skipped selectors keep getting measured and can win their place back
+EXPLORE_EVERY = int(os.getenv("SCRAPER_SELECTOR_EXPLORE_EVERY", "50"))
+# Success rate below which a selector is reported as stale
+STALE_RATE = float(os.getenv("SCRAPER_SELECTOR_STALE_RATE", "0.2"))
+# Write accumulated counts to disk this often (records / seconds)
+FLUSH_EVERY = 200
+FLUSH_INTERVAL = 30.0
+
+# Success-rate estimate for selectors without enough samples
+_PRIOR = 0.5
+
+
+class SelectorStats:
+    """
+    Per-domain success counts for each fallback selector of each field,
+    for the selector dashboard and stale alerts, and so extraction stops
+    trying dead selectors first (see order). Counts live in memory and are
+    flushed to SQLite in batches (additive upserts, so several worker
+    processes can share one file).
+    """
+
+    def __init__(self, path: str = SELECTOR_STATS_DB):
+        self.path = path
+        self._lock = threading.Lock()
+        # (domain, field, strategy) -> [attempts, successes, last_success_at]
+        self._totals: dict[tuple, list] = {}
+        self._pending: dict[tuple, list] = {}
+        self._pending_count = 0
+        self._last_flush = time.time()
+        self._lookups: dict[tuple, int] = {}
+        # (domain, field, strategy) -> misses since its last hit (this process)
+        self._misses: dict[tuple, int] = {}
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = self._connect()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS selector_stats ("
+            " domain TEXT, field TEXT, strategy TEXT,"
+            " attempts INTEGER, successes INTEGER, last_success_at REAL,"
+            " PRIMARY KEY (domain, field, strategy))"
+        )
+        for domain, field, strategy, attempts, successes, last_success in conn.execute(
+            "SELECT domain, field, strategy, attempts, successes, last_success_at"
+            " FROM selector_stats"
+        ):
+            self._totals[(domain, field, strategy)] = [attempts, successes, last_success]
+            if not successes:
+                self._misses[(domain, field, strategy)] = attempts
+        conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def _dead(self, key: tuple) -> bool:
+        return self._misses.get(key, 0) >= MIN_SAMPLES
+
+    def order(self, domain: str, field: str, names: list[str]) -> list[int]:
+        """
+        Indices into names in declared order, with selectors that had no hit
+        in their last MIN_SAMPLES attempts moved to the end: they are only
+        tried when nothing else matched, so rare fields are still found.
+        Every EXPLORE_EVERY-th lookup re-probes them in their declared place.
+        """
+        declared = list(range(len(names)))
+        if len(names) < 2:
+            return declared
+        with self._lock:
+            n = self._lookups.get((domain, field), 0) + 1
+            self._lookups[(domain, field)] = n
+            if n % EXPLORE_EVERY == 0:
+                return declared
+            dead = [self._dead((domain, field, name)) for name in names]
+        if not any(dead):
+            return declared
+        return [i for i in declared if not dead[i]] + [i for i in declared if dead[i]]
+
+    def record(self, domain: str, field: str, name: str, success: bool):
+        key = (domain, field, name)
+        now = time.time()
+        with self._lock:
+            for table in (self._totals, self._pending):
+                entry = table.setdefault(key, [0, 0, None])
+                entry[0] += 1
+                if success:
+                    entry[1] += 1
+                    entry[2] = now
+            self._misses[key] = 0 if success else self._misses.get(key, 0) + 1
+            self._pending_count += 1
+            due = (
+                self._pending_count >= FLUSH_EVERY
+                or now - self._last_flush >= FLUSH_INTERVAL
+            )
+        if due:
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._pending_count = 0
+            self._last_flush = time.time()
+        if not pending:
+            return
+        conn = self._connect()
+        try:
+            conn.executemany(
+                "INSERT INTO selector_stats"
+                " (domain, field, strategy, attempts, successes, last_success_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)"
+                " ON CONFLICT (domain, field, strategy) DO UPDATE SET"
+                "  attempts = attempts + excluded.attempts,"
+                "  successes = successes + excluded.successes,"
+                "  last_success_at = COALESCE(excluded.last_success_at, last_success_at)",
+                [(*key, *counts) for key, counts in pending.items()],
+            )
+        finally:
+            conn.close()
+
+    def dashboard(self) -> dict:
+        """domain -> field -> selectors, best success rate first, with stale flags."""
+        with self._lock:
+            totals = {key: list(v) for key, v in self._totals.items()}
+            dead = {key for key in totals if self._dead(key)}
+
+        domains: dict[str, dict] = {}
+        stale = []
+        for (domain, field, name), (attempts, successes, last_success) in sorted(totals.items()):
+            rate = successes / attempts if attempts else 0.0
+            is_stale = attempts >= MIN_SAMPLES and rate < STALE_RATE
+            domains.setdefault(domain, {}).setdefault(field, []).append({
+                "selector": name,
+                "attempts": attempts,
+                "successes": successes,
+                "success_rate": round(rate, 3),
+                "last_success_at": last_success,
+                "stale": is_stale,
+                "skipped": (domain, field, name) in dead,
+            })
+            if is_stale:
+                stale.append(f"{domain}:{field}:{name}")
+
+        for fields in domains.values():
+            for entries in fields.values():
+                entries.sort(key=lambda e: -(
+                    (e["successes"] + 1) / (e["attempts"] + 2)
+                    if e["attempts"] >= MIN_SAMPLES else _PRIOR
+                ))
+        return {"domains": domains, "stale": stale, "min_samples": MIN_SAMPLES}
+
+
+_stats: SelectorStats | None = None
+_stats_lock = threading.Lock()
+
+
+def get_selector_stats() -> SelectorStats:
+    global _stats
+    if _stats is None:
+        with _stats_lock:
+            if _stats is None:
+                _stats = SelectorStats()
+    return _stats
@@ -0,0 +1,223 @@
+import html as html_lib
+import json
+import re
+import threading
+
+try:
+    import orjson
+
+    def _loads(raw):
+        return orjson.loads(raw)
+except ImportError:  # plain json works, just slower on big JSON-LD blobs
+    def _loads(raw):
+        return json.loads(raw)
+
+
+# ---------- RAW-HTML SCANNERS ----------
+# These run on the page source before (and usually instead of) building a
+# DOM, so they only look for the few tags we need.
+
+_COMMENT_RE = re.compile(r"<!--.*?-->", re.S)
+_SCRIPT_RE = re.compile(r"<script\b([^>]*)>(.*?)</script\s*>", re.S | re.I)
+_META_RE = re.compile(r"<meta\b([^>]*)>", re.I)
+_TITLE_RE = re.compile(r"<title\b[^>]*>(.*?)</title\s*>", re.S | re.I)
+_ATTR_RE = re.compile(
+    r"""([^\s"'<>/=]+)\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'=<>`]+))""", re.S
+)
+
+# Fields the fast path must find before the scraper may skip the DOM.
+# Everything the DOM scraper would otherwise supply for the compliance
+# checks: list price (MRP) and returns matter as much as title and seller.
+REQUIRED_FIELDS = (
+    "title",
+    "brand",
+    "description",
+    "price",
+    "list_price",
+    "seller",
+    "manufacturer",
+    "return_days",
+)
+
+
+def _attrs(raw: str) -> dict:
+    attrs = {}
+    for m in _ATTR_RE.finditer(raw):
+        name = m.group(1).lower()
+        if name not in attrs:
+            value = next(v for v in m.group(2, 3, 4) if v is not None)
+            attrs[name] = html_lib.unescape(value)
+    return attrs
+
+
+def find_json_ld_product(data):
+    """The schema.org Product in one parsed JSON-LD block (or its @graph)."""
+    candidates = []
+    if isinstance(data, dict):
+        candidates = [data]
+    elif isinstance(data, list):
+        candidates = data
+
+    for item in candidates:
+        if not isinstance(item, dict):
+            continue
+        t = item.get("@type")
+        if t == "Product" or (isinstance(t, list) and "Product" in t):
+            return item
+
+        if "@graph" in item and isinstance(item["@graph"], list):
+            for g in item["@graph"]:
+                if isinstance(g, dict):
+                    gt = g.get("@type")
+                    if gt == "Product" or (isinstance(gt, list) and "Product" in gt):
+                        return g
+    return None
+
+
+def product_fields(ld_product: dict | None) -> dict:
+    """Product fields the scrapers use, from a JSON-LD Product (None if absent)."""
+    fields = {
+        "title": None,
+        "brand": None,
+        "description": None,
+        "price": None,
+        "list_price": None,
+        "seller": None,
+        "manufacturer": None,
+        "return_days": None,
+    }
+    if not ld_product:
+        return fields
+
+    fields["title"] = ld_product.get("name") or ld_product.get("headline")
+    fields["description"] = ld_product.get("description")
+
+    brand_field = ld_product.get("brand")
+    if isinstance(brand_field, dict):
+        fields["brand"] = brand_field.get("name")
+    elif isinstance(brand_field, str):
+        fields["brand"] = brand_field
+
+    offers = ld_product.get("offers")
+    if isinstance(offers, dict):
+        try:
+            fields["price"] = float(offers.get("price"))
+        except (TypeError, ValueError):
+            fields["price"] = None
+
+        # MRP: a ListPrice / StrikethroughPrice price specification
+        specs = offers.get("priceSpecification")
+        for spec in specs if isinstance(specs, list) else [specs]:
+            if not isinstance(spec, dict):
+                continue
+            price_type = str(spec.get("priceType") or "")
+            if price_type.endswith(("ListPrice", "StrikethroughPrice")):
+                try:
+                    fields["list_price"] = float(spec.get("price"))
+                except (TypeError, ValueError):
+                    pass
+                break
+
+        seller_obj = offers.get("seller")
+        if isinstance(seller_obj, dict):
+            fields["seller"] = seller_obj.get("name")
+
+        policy = offers.get("hasMerchantReturnPolicy")
+        if isinstance(policy, dict) and isinstance(policy.get("merchantReturnDays"), (int, str)):
+            fields["return_days"] = str(policy["merchantReturnDays"])
+
+    manufacturer_field = ld_product.get("manufacturer")
+    if isinstance(manufacturer_field, dict):
+        fields["manufacturer"] = manufacturer_field.get("name")
+    elif isinstance(manufacturer_field, str):
+        fields["manufacturer"] = manufacturer_field
+
+    return fields
+
+
+class StructuredData:
+    """JSON-LD Product, meta tags and <title>, read straight from the page source."""
+
+    def __init__(self, ld_product: dict | None, meta: dict, title: str | None):
+        self.ld_product = ld_product
+        # property/name -> content, first occurrence wins (like doc.find)
+        self.meta = meta
+        self.title = title
+        self.fields = product_fields(ld_product)
+
+    @property
+    def description(self) -> str | None:
+        return (
+            self.fields["description"]
+            or self.meta.get("description")
+            or self.meta.get("og:description")
+        )
+
+    def missing(self) -> list[str]:
+        found = dict(self.fields, description=self.description)
+        return [name for name in REQUIRED_FIELDS if not found.get(name)]
+
+
+def extract_structured_data(html: str) -> StructuredData:
+    if "<!--" in html:
+        html = _COMMENT_RE.sub("", html)
+
+    ld_product = None
+    for m in _SCRIPT_RE.finditer(html):
+        if _attrs(m.group(1)).get("type") != "application/ld+json":
+            continue
+        try:
+            data = _loads(m.group(2))
+        except Exception:
+            continue
+        ld_product = find_json_ld_product(data)
+        if ld_product:
+            break
+
+    meta = {}
+    for m in _META_RE.finditer(html):
+        attrs = _attrs(m.group(1))
+        for key in (attrs.get("property"), attrs.get("name")):
+            if key and key not in meta:
+                meta[key] = attrs.get("content")
+
+    title = None
+    m = _TITLE_RE.search(html)
+    if m:
+        title = html_lib.unescape(m.group(1))
+
+    return StructuredData(ld_product, meta, title)
+
+
+# ---------- FAST-PATH METRICS ----------
+
+class FastPathStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.pages = 0
+        self.fast_path = 0
+        self.dom_fallback = 0
+        self.missing: dict[str, int] = {name: 0 for name in REQUIRED_FIELDS}
+
+    def record(self, missing: list[str]):
+        with self._lock:
+            self.pages += 1
+            if missing:
+                self.dom_fallback += 1
+                for name in missing:
+                    self.missing[name] += 1
+            else:
+                self.fast_path += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "pages": self.pages,
+                "fast_path": self.fast_path,
+                "dom_fallback": self.dom_fallback,
+                "fast_path_rate": round(self.fast_path / self.pages, 3) if self.pages else 0.0,
+                "missing_fields": dict(self.missing),
+            }
+
+
+fast_path_stats = FastPathStats()
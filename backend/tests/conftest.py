@@ -0,0 +1,36 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+# The backend is a flat set of modules run from its own directory
+sys.path.insert(0, BACKEND_DIR)
+# database.py resolves ./scans.db against the cwd when the engine is
+# created, so leave the repo before any test module imports it
+os.chdir(tempfile.mkdtemp(prefix="backend-tests-"))
+
+
+@pytest.fixture(autouse=True)
+def _isolated_cwd(tmp_path, monkeypatch):
+    # database.py and the local caches open SQLite files relative to the cwd
+    monkeypatch.chdir(tmp_path)
+
+
+def read_fixture(name: str) -> str:
+    with open(os.path.join(FIXTURES_DIR, name), encoding="utf-8") as f:
+        return f.read()
+
+
+@pytest.fixture
+def db():
+    """Empty tables in the tests' scans.db."""
+    from database import Base, engine, init_db
+
+    Base.metadata.drop_all(bind=engine)
+    init_db()
+    yield engine
+    engine.dispose()
@@ -0,0 +1,58 @@
+from conftest import read_fixture
+from parsed_page import ParsedPage
+from scraper import FLIPKART, scrape_product_from_page
+from selector_stats import EXPLORE_EVERY, MIN_SAMPLES, SelectorStats
+
+URL = "https://www.flipkart.com/realme-narzo-60/p/itm123?pid=MOBGTEST01"
+# The broad title fallback also matches this page, before the real title
+HTML = read_fixture("flipkart.html").replace(
+    "<body>", '<body><span dir="auto">Sponsored: more phones</span>', 1
+)
+NAMES = ["primary", "fallback"]
+
+
+def _record(stats: SelectorStats, name: str, results: list[bool]):
+    for found in results:
+        stats.record("flipkart.com", "title", name, found)
+
+
+def _stats(monkeypatch, tmp_path) -> SelectorStats:
+    stats = SelectorStats(str(tmp_path / "selectors.db"))
+    monkeypatch.setattr("adapters.get_selector_stats", lambda: stats)
+    return stats
+
+
+def test_declared_order_survives_a_primary_that_still_hits(monkeypatch, tmp_path):
+    stats = _stats(monkeypatch, tmp_path)
+    primary, fallback = FLIPKART.fields["title"].names
+    # Mostly failing, but not dead: a broader fallback must not jump ahead
+    _record(stats, primary, [False] * (MIN_SAMPLES - 1) + [True] + [False] * (MIN_SAMPLES - 1))
+    _record(stats, fallback, [True] * (2 * MIN_SAMPLES))
+
+    product = scrape_product_from_page(URL, ParsedPage(HTML, URL))
+    assert product.title == "realme narzo 60 (Mars Orange, 128 GB)"
+
+
+def test_dead_selector_is_tried_last_until_it_hits_again(tmp_path):
+    stats = SelectorStats(str(tmp_path / "selectors.db"))
+    _record(stats, "primary", [False] * MIN_SAMPLES)
+    assert stats.order("flipkart.com", "title", NAMES) == [1, 0]
+    assert stats.order("flipkart.com", "price", NAMES) == [0, 1]
+
+    _record(stats, "primary", [True])
+    assert stats.order("flipkart.com", "title", NAMES) == [0, 1]
+
+
+def test_dead_selector_is_reprobed_in_place(tmp_path):
+    stats = SelectorStats(str(tmp_path / "selectors.db"))
+    _record(stats, "primary", [False] * MIN_SAMPLES)
+    orders = [stats.order("flipkart.com", "title", NAMES) for _ in range(EXPLORE_EVERY)]
+    assert orders.count([0, 1]) == 1 and orders[-1] == [0, 1]
+
+
+def test_skipped_selectors_on_the_dashboard(tmp_path):
+    stats = SelectorStats(str(tmp_path / "selectors.db"))
+    _record(stats, "primary", [False] * MIN_SAMPLES)
+    _record(stats, "fallback", [True])
+    entries = stats.dashboard()["domains"]["flipkart.com"]["title"]
+    assert {e["selector"]: e["skipped"] for e in entries} == {"primary": True, "fallback": False}
@@ -0,0 +1,49 @@
+import pytest
+
+import canonical
+from canonical import ShortLinkCache, canonicalize_url, record_resolution, resolve_cached, resolve_link
+
+
+@pytest.mark.parametrize("url, expected", [
+    ("https://www.amazon.in/boAt-Rockerz-450/dp/b0test0001/ref=sr_1_3?keywords=headphones&qid=1",
+     "https://www.amazon.in/dp/B0TEST0001"),
+    ("https://amazon.in/gp/product/B0TEST0001?tag=aff-21&utm_source=x",
+     "https://www.amazon.in/dp/B0TEST0001"),
+    ("https://www.amazon.com/gp/aw/d/B0TEST0001/", "https://www.amazon.com/dp/B0TEST0001"),
+    ("https://www.flipkart.com/realme-narzo-60/p/itm123?pid=mobgtest01&otracker=search&fm=organic",
+     "https://www.flipkart.com/realme-narzo-60/p/itm123?pid=MOBGTEST01"),
+    ("https://dl.flipkart.com/dl/realme-narzo-60/p/itm123?pid=MOBGTEST01",
+     "https://www.flipkart.com/realme-narzo-60/p/itm123?pid=MOBGTEST01"),
+])
+def test_product_id_extraction(url, expected):
+    assert canonicalize_url(url) == expected
+
+
+def test_tracking_params_are_stripped_elsewhere():
+    url = "HTTPS://Shop.Example.com:443/item/42?utm_campaign=x&gclid=abc&color=red&size=M#reviews"
+    assert canonicalize_url(url) == "https://shop.example.com/item/42?color=red&size=M"
+
+
+@pytest.mark.parametrize("url, expected", [
+    ("https://www.flipkart.com/fortune-oil/p/itm123?pid=EDOF123&lid=LSTEDOF123XYZ&marketplace=GROCERY",
+     "https://www.flipkart.com/fortune-oil/p/itm123?pid=EDOF123&lid=LSTEDOF123XYZ&marketplace=GROCERY"),
+    ("https://www.amazon.in/dp/B0TEST0001?smid=A1SELLER&psc=1&th=1&ref_=abc",
+     "https://www.amazon.in/dp/B0TEST0001?psc=1&smid=A1SELLER&th=1"),
+    ("https://shop.example.com/item/42?store=north&utm_source=x",
+     "https://shop.example.com/item/42?store=north"),
+])
+def test_listing_seller_and_variant_params_are_kept(url, expected):
+    assert canonicalize_url(url) == expected
+
+
+def test_short_links_fetch_their_redirect_target(tmp_path, monkeypatch):
+    monkeypatch.setattr(canonical, "_links", ShortLinkCache(str(tmp_path / "links.db")))
+    short = "https://amzn.in/d/abc123"
+    target = "https://www.amazon.in/dp/B0TEST0001?smid=A1SELLER&tag=aff-21"
+
+    assert resolve_link(short) == short
+    assert record_resolution(short, target) == "https://www.amazon.in/dp/B0TEST0001?smid=A1SELLER"
+    assert resolve_link(short) == target
+    assert resolve_cached(short) == "https://www.amazon.in/dp/B0TEST0001?smid=A1SELLER"
+    # Product URLs are fetched as given
+    assert resolve_link(target) == target
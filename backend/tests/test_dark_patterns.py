@@ -0,0 +1,61 @@
+import pytest
+
+from dark_patterns import Detector, StreamingDetector, detect_dark_patterns
+from dom import BACKENDS
+from models import ProductData
+from parsed_page import ParsedPage
+
+PRODUCT = ProductData(url="https://example.com/p", title="Test product")
+
+
+def _codes(body: str, backend: str) -> set[str]:
+    page = ParsedPage(f"<html><body>{body}</body></html>", PRODUCT.url, backend=backend)
+    return {f.code for f in detect_dark_patterns(PRODUCT, page)}
+
+
+@pytest.fixture(params=sorted(BACKENDS))
+def backend(request):
+    return request.param
+
+
+def test_keywords_match_visible_text(backend):
+    assert "DARK_FAKE_SCARCITY" in _codes("<p>Hurry! Only 2 left in stock.</p>", backend)
+
+
+@pytest.mark.parametrize("wrapper", [
+    '<div style="display:none">{}</div>',
+    '<div hidden><span>{}</span></div>',
+    '<section aria-hidden="true"><p>{}</p></section>',
+    "<noscript>{}</noscript>",
+])
+def test_keywords_skip_hidden_subtrees(backend, wrapper):
+    body = wrapper.format("Only 2 left in stock") + "<p>In stock.</p>"
+    assert "DARK_FAKE_SCARCITY" not in _codes(body, backend)
+
+
+def test_streaming_detectors_still_see_hidden_fees(backend):
+    body = '<p>₹499</p><div style="display:none">Convenience fee ₹49 applies</div>'
+    codes = _codes(body, backend)
+    assert "DARK_HIDDEN_COST" in codes
+    # Hidden, so not drip pricing shown to the shopper
+    assert "DARK_DRIP_PRICING" not in codes
+
+
+def test_countdown_widget_by_class(backend):
+    assert "DARK_COUNTDOWN_TIMER" in _codes('<div class="deal-countdown">02:14:33</div>', backend)
+    assert "DARK_COUNTDOWN_TIMER" not in _codes('<div class="deal-banner">Big sale</div>', backend)
+
+
+def test_detectors_must_implement_their_hooks():
+    class NoDetect(Detector):
+        code = "DARK_TEST"
+
+    class NoWalker(StreamingDetector):
+        code = "DARK_TEST"
+
+        def detect(self, ctx):
+            return None
+
+    for cls in (NoDetect, NoWalker):
+        with pytest.raises(TypeError):
+            cls()
@@ -0,0 +1,35 @@
+import pytest
+
+from conftest import read_fixture
+from dom import BACKENDS, compare_backends
+from parsed_page import ParsedPage
+from scraper import compare_dom_backends, scrape_product_from_page
+
+# fixture file -> URL it is scraped as (picks the site adapter)
+PAGES = {
+    "amazon.html": "https://www.amazon.in/dp/B0TEST0001",
+    "flipkart.html": "https://www.flipkart.com/realme-narzo-60/p/itm123?pid=MOBGTEST01",
+    "generic.html": "https://www.myntra.com/shirts/roadster/123",
+    "generic_jsonld.html": "https://www.myntra.com/shirts/roadster/456",
+}
+
+
+@pytest.mark.parametrize("name", sorted(PAGES))
+def test_backends_produce_identical_product_data(name):
+    assert compare_dom_backends(PAGES[name], read_fixture(name)) == []
+
+
+@pytest.mark.parametrize("name", sorted(PAGES))
+def test_backends_produce_identical_dom_text(name):
+    assert compare_backends(read_fixture(name), ["span", "div", "li", "td", "script", "p"]) == []
+
+
+@pytest.mark.parametrize("backend", sorted(BACKENDS))
+@pytest.mark.parametrize("name", sorted(PAGES))
+def test_fixture_exercises_the_extractors(name, backend):
+    # Parity on an empty ProductData would prove nothing
+    url = PAGES[name]
+    product = scrape_product_from_page(url, ParsedPage(read_fixture(name), url, backend=backend))
+    assert product.title
+    assert product.price is not None and product.price.deal
+    assert product.seller
@@ -0,0 +1,64 @@
+import random
+
+import pytest
+
+from evaluator import CATEGORY_KEYWORDS, PRIORITY, infer_product_category
+from keyword_automaton import KeywordAutomaton
+from models import ProductData
+
+
+def _legacy_category(product: ProductData) -> str:
+    # evaluator.infer_product_category before the automaton
+    text = " ".join(
+        filter(None, [product.title, product.description, product.technical_details])
+    ).lower()
+    for category in PRIORITY:
+        if any(k in text for k in CATEGORY_KEYWORDS[category]):
+            return category
+    return "all"
+
+
+def _brute_force(keywords: dict, text: str) -> list:
+    hits = [
+        (i, word, label)
+        for label, words in keywords.items() for word in words
+        for i in range(len(text)) if text.startswith(word, i)
+    ]
+    # KeywordMatch order: by end position, then start
+    return sorted(hits, key=lambda hit: (hit[0] + len(hit[1]), hit[0]))
+
+
+@pytest.mark.parametrize("title, description, tech, category", [
+    ("Lakme Sun Expert SPF 50 Sunscreen", "Dermatologically tested", None, "cosmetics"),
+    ("Dolo 650 Tablet", "Paracetamol. Dosage: as prescribed", None, "health"),
+    ("boAt Rockerz 450", "Bluetooth headphones", "Battery : 15 hours | Charger : USB-C", "electronics"),
+    ("Cotton Shirt", "Regular fit", "Fabric : 100% cotton | Size : M", "clothing"),
+    ("Tata Salt", "Iodised. Best before 24 months", "FSSAI : 10012345678901", "food"),
+    ("LG 260 L Refrigerator", None, None, "appliances"),
+    ("Plain steel bottle", "1 litre", None, "all"),
+])
+def test_infer_product_category(title, description, tech, category):
+    product = ProductData(url="https://example.com/p", title=title, description=description,
+                          technical_details=tech)
+    assert infer_product_category(product) == category == _legacy_category(product)
+
+
+def test_infer_product_category_matches_legacy_on_random_text():
+    rng = random.Random(18)
+    words = [w for ws in CATEGORY_KEYWORDS.values() for w in ws] + ["phone", "steel", "+", " ", "sk", "pa"]
+    for _ in range(2000):
+        title = "".join(rng.choice(words) for _ in range(rng.randint(0, 6)))
+        product = ProductData(url="https://example.com/p", title=title.upper() if rng.random() < 0.2 else title)
+        assert infer_product_category(product) == _legacy_category(product)
+
+
+@pytest.mark.parametrize("text", [
+    "pa+++ skincare with uv", "skin skincare skinskin", "ababcab", "", "no keywords here",
+])
+def test_every_overlapping_hit_in_end_order(text):
+    keywords = {"a": ["pa++", "pa+++", "skin", "skincare", "ab", "abc"], "b": ["b", "bca", "uv", "care"]}
+    assert KeywordAutomaton(keywords).search(text).hits == _brute_force(keywords, text)
+
+
+def test_no_keywords_no_hits():
+    assert KeywordAutomaton({"a": []}).search("anything").hits == []
@@ -0,0 +1,98 @@
+import pytest
+
+from models import Price, ProductData
+from normalizer import KEY_ALIASES, _fill_from_text, _legacy_normalize, normalize_product
+
+URL = "https://www.amazon.in/dp/B0TEST0002"
+
+# As Amazon renders it: direction marks around the colon, " | " between entries
+AMAZON_TECH = (
+    "Brand ‏ : ‎ boAt | Item model number ‏ : ‎ Rockerz 450 | "
+    "Country of Origin ‏ : ‎ China | Manufacturer ‏ : ‎ Imagine Marketing Ltd | "
+    "Input Voltage : 5 Volts | Compatible Devices : Smartphones, Tablets | Colour : Black"
+)
+
+
+def _product(**fields) -> ProductData:
+    return ProductData(url=URL, **{"title": "Test product", **fields})
+
+
+def test_technical_details_keys_fill_their_fields():
+    n = normalize_product(_product(title="boAt Rockerz 450 Bluetooth Headphone", technical_details=AMAZON_TECH))
+    assert n.brand == "boAt"
+    assert n.model_number == "Rockerz 450"
+    assert n.origin == "China"
+    assert n.manufacturer == "Imagine Marketing Ltd"
+    assert n.voltage == "5 Volts"
+    assert n.compatibility == "Smartphones, Tablets"
+    assert n.specifications == AMAZON_TECH
+    assert n.category == "electronics"
+
+
+def test_best_ranked_key_wins_whatever_the_order():
+    tech = "Model Name : Rockerz | Item Model Number : RKZ-450 | Model Number : R450"
+    assert normalize_product(_product(technical_details=tech)).model_number == "RKZ-450"
+    assert [KEY_ALIASES[k] for k in ("item model number", "model name")] == [
+        ("model_number", 0), ("model_number", 2),
+    ]
+
+
+def test_scraped_attribute_beats_technical_details():
+    n = normalize_product(_product(brand="Sony", country_of_origin="Japan", technical_details=AMAZON_TECH))
+    assert (n.brand, n.origin) == ("Sony", "Japan")
+
+
+def test_empty_values_and_unknown_keys_are_skipped():
+    n = normalize_product(_product(technical_details="Brand : | Brand Name : Acme | Colour : Red | no colon here"))
+    assert n.brand == "Acme"
+
+
+def test_food_fields_from_description_text():
+    description = (
+        "Crunchy wheat biscuits. Ingredients: Wheat flour, sugar, edible vegetable oil. "
+        "FSSAI Lic No. 10012345678901. Best before 9 months from packaging. "
+        "Store in a cool and dry place. 100% Vegetarian. Net weight 250 g"
+    )
+    n = normalize_product(_product(title="Acme Digestive Biscuit", description=description))
+    assert n.category == "food"
+    assert n.ingredients == "Wheat flour, sugar, edible vegetable oil"
+    assert n.fssai == "10012345678901"
+    assert n.expiry == "Best before 9 months from packaging"
+    assert n.storage == "Store in a cool and dry place"
+    assert n.veg_nonveg == "Vegetarian"
+    assert n.quantity == "250 g"
+
+
+def test_number_led_fields_from_text():
+    values: dict = {}
+    _fill_from_text(values, "Rated 5 Star Energy Rating, works on 220-240 V. For kids 3 years and above")
+    assert values["energy_rating"] == "5 Star Energy Rating"
+    assert values["voltage"] == "220-240 V"
+    assert values["age_limit"] == "3 years and above"
+
+
+def test_keyword_led_match_comes_before_number_led():
+    values: dict = {}
+    _fill_from_text(values, "Suitable for ages 3 years and above")
+    assert values["age_limit"] == "ages 3 years"
+
+
+def test_text_never_overrides_a_filled_field():
+    values = {"fssai": "from the table", "quantity": "1 kg"}
+    _fill_from_text(values, "FSSAI License No: 10012345678901, pack of 500 g")
+    assert values == {"fssai": "from the table", "quantity": "1 kg"}
+
+
+@pytest.mark.parametrize("text, quantity", [
+    ("Net Quantity: 100 ml", "100 ml"),
+    ("1.5L bottle, 2 L pack", "1.5 L"),
+    ("Model 2024 edition, weight 12345g", "12345 g"),
+])
+def test_quantity_is_the_first_match_like_legacy(text, quantity):
+    product = _product(technical_details=text)
+    assert normalize_product(product).quantity == quantity == _legacy_normalize(product).quantity
+
+
+def test_scraped_net_quantity_is_the_last_resort():
+    n = normalize_product(_product(net_quantity="6", unit="pieces", price=Price(mrp=120, deal=99)))
+    assert (n.quantity, n.price) == ("6 pieces", 99)
@@ -0,0 +1,51 @@
+from datetime import datetime, timedelta
+
+from dark_patterns import detect_dark_patterns
+from models import Price, ProductData
+from price_history import (
+    DAY,
+    PriceHistory,
+    load_price_history,
+    product_key,
+    record_price_point,
+    to_ts,
+)
+
+URL = "https://www.amazon.in/dp/B0TEST0001"
+NOW = datetime(2026, 3, 1, 12, 0)
+PAGE = "<html><body><p>Big sale today</p></body></html>"
+
+
+def _product(mrp: float, deal: float) -> ProductData:
+    return ProductData(url=URL, title="Test product", price=Price(mrp=mrp, deal=deal))
+
+
+def _codes(product: ProductData, history: PriceHistory | None) -> set[str]:
+    return {f.code for f in detect_dark_patterns(product, PAGE, price_history=history)}
+
+
+def test_mrp_raised_just_before_the_sale_is_flagged():
+    now = to_ts(NOW)
+    points = [(now - 60 * DAY, 1000.0, 950.0), (now - 3 * DAY, 2000.0, 1900.0)]
+    assert "DARK_MRP_INFLATION" in _codes(_product(2000, 1100), PriceHistory(points, now))
+
+
+def test_long_standing_mrp_is_not_flagged():
+    now = to_ts(NOW)
+    points = [(now - 60 * DAY, 2000.0, 1900.0), (now - 3 * DAY, 2000.0, 1900.0)]
+    assert "DARK_MRP_INFLATION" not in _codes(_product(2000, 1100), PriceHistory(points, now))
+
+
+def test_no_history_no_finding():
+    assert "DARK_MRP_INFLATION" not in _codes(_product(2000, 1100), None)
+
+
+def test_recorded_points_feed_the_detector(db):
+    key = product_key(URL)
+    with db.begin() as conn:
+        record_price_point(conn, key, Price(mrp=1000, deal=950), NOW - timedelta(days=60))
+        record_price_point(conn, key, Price(mrp=2000, deal=1900), NOW - timedelta(days=3))
+
+    history = load_price_history(URL, NOW)
+    assert [mrp for _, mrp, _ in history.points] == [1000, 2000]
+    assert "DARK_MRP_INFLATION" in _codes(_product(2000, 1100), history)
@@ -0,0 +1,52 @@
+import json
+
+import pytest
+
+from conftest import read_fixture
+from rule_engine import RuleEngine, _check_batch_parity
+from rules import RulePackError, load_rules
+
+
+def _write_pack(directory, name: str, pack: dict):
+    (directory / name).write_text(json.dumps(pack), encoding="utf-8")
+
+
+def _rule(rule_id: str, **extra) -> dict:
+    return {"id": rule_id, "title": rule_id, "law": "Test Act", "severity": "LOW",
+            "required_fields": ["seller"], **extra}
+
+
+def test_packs_reproduce_the_baseline_rules():
+    # The rules as hard-coded in rules.py before rule packs; editing a pack
+    # on purpose means updating this fixture in the same change
+    baseline = json.loads(read_fixture("baseline_rules.json"))
+    assert load_rules().rules == baseline
+
+
+def test_later_pack_amends_and_disables(tmp_path):
+    _write_pack(tmp_path, "01_base.json", {"pack": "base", "rules": [_rule("A-1"), _rule("A-2")]})
+    _write_pack(tmp_path, "02_amend.json", {
+        "pack": "amend",
+        "rules": [_rule("A-1", severity="HIGH")],
+        "disable": ["A-2"],
+    })
+    loaded = load_rules(str(tmp_path))
+    assert [(r["id"], r["severity"]) for r in loaded.rules] == [("A-1", "HIGH")]
+    assert [p["pack"] for p in loaded.packs] == ["base", "amend"]
+
+
+@pytest.mark.parametrize("pack", [
+    {"pack": "dupes", "rules": [_rule("A-1"), _rule("A-1")]},
+    {"pack": "repeal", "rules": [_rule("A-1")], "disable": ["A-9"]},
+    {"pack": "schema", "rules": [_rule("A-1", severity="CRITICAL")]},
+])
+def test_invalid_pack_fails_the_whole_load(tmp_path, pack):
+    _write_pack(tmp_path, "01_pack.json", pack)
+    with pytest.raises(RulePackError):
+        load_rules(str(tmp_path))
+
+
+@pytest.mark.parametrize("gated", [None, ("electronics", "food", "health")])
+def test_batch_and_scalar_paths_agree(gated):
+    pytest.importorskip("numpy")
+    _check_batch_parity(RuleEngine(gated=gated), n=3000)
@@ -0,0 +1,35 @@
+import pytest
+
+from dom import BACKENDS
+from parsed_page import ParsedPage
+from patterns import GEN_RETURNS
+
+PAGE = (
+    "<html><body><div id='outer'><span>Sold by</span><span>SuperComNet</span>"
+    "<ul><li id='policy'><b>7 days</b> Replacement Policy</li><li>Cash on Delivery</li></ul>"
+    "</div></body></html>"
+)
+
+
+@pytest.fixture(params=sorted(BACKENDS))
+def index(request):
+    return ParsedPage(PAGE, "https://example.com/p", backend=request.param).text_index
+
+
+def test_find_first_returns_innermost_wanted_element(index):
+    node, text = index.find_first(("span", "div", "li"), GEN_RETURNS)
+    assert node.get("id") == "policy"
+    assert text == "7 days Replacement Policy"
+
+
+def test_find_first_climbs_to_a_wanted_ancestor(index):
+    node, _ = index.find_first("div", GEN_RETURNS)
+    assert node.get("id") == "outer"
+
+
+def test_find_first_without_a_match(index):
+    assert index.find_first("span", GEN_RETURNS) is None
+
+
+def test_page_text_matches_get_text(index):
+    assert index.page_text(" ") == "Sold by SuperComNet 7 days Replacement Policy Cash on Delivery"
@@ -0,0 +1,75 @@
+from bisect import bisect_right
+
+
+class TextIndex:
+    """
+    Every page-text run with the elements that contain it, built in one
+    walk over the DOM (a dom walk visitor).
+
+    Element text is a slice of one concatenated string, so asking
+    "which span/div/li says '7 days replacement'?" no longer re-walks and
+    re-joins each element's subtree (quadratic on deeply nested pages).
+    """
+
+    def __init__(self):
+        self.runs: list[str] = []
+        # [node, start offset, end offset] in document order, offsets into
+        # the runs joined by single spaces (page_text(" "))
+        self.elements: list[list] = []
+        # Per element: index of its parent element (-1 at the top), and its
+        # start offset again as a flat list for bisecting
+        self._parents: list[int] = []
+        self._starts: list[int] = []
+        self._open: list[int] = []
+        self._length = 0
+        self._text = None
+
+    # ---------- visitor ----------
+
+    def start(self, node):
+        self._open.append(len(self.elements))
+        self._parents.append(self._open[-2] if len(self._open) > 1 else -1)
+        self._starts.append(self._length)
+        self.elements.append([node, self._length, None])
+
+    def end(self, node):
+        self.elements[self._open.pop()][2] = self._length
+
+    def text(self, value: str):
+        value = value.strip()
+        if value:
+            if self.runs:
+                self._length += 1  # the separating space
+            self.runs.append(value)
+            self._length += len(value)
+
+    # ---------- queries ----------
+
+    def page_text(self, separator: str = " ") -> str:
+        """Same as the document's get_text(separator, strip=True)."""
+        if separator != " ":
+            return separator.join(self.runs)
+        if self._text is None:
+            self._text = " ".join(self.runs)
+        return self._text
+
+    def find_first(self, names, pattern):
+        """
+        Innermost element named in names whose get_text(" ", strip=True)
+        contains the first match of pattern in the page text.
+        Returns (node, text) or None.
+
+        One search over the page text; each match offset is mapped to the
+        last element starting at or before it (bisect), then up its parents
+        to the first one that is wanted and spans the whole match.
+        """
+        wanted = {names} if isinstance(names, str) else set(names)
+        text = self.page_text(" ")
+        for m in pattern.finditer(text):
+            i = bisect_right(self._starts, m.start()) - 1
+            while i >= 0:
+                node, start, end = self.elements[i]
+                if start <= m.start() and m.end() <= end and node.name in wanted:
+                    return node, text[start:end].strip()
+                i = self._parents[i]
+        return None